@@ -0,0 +1,49 @@
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+class InstanceTimeout(Exception):
+    pass
+
+def _raise_timeout(signum, frame):
+    raise InstanceTimeout()
+
+def _run_instance(fn: Callable, item: Any, timeout: Optional[float]) -> Tuple[Any, Any, Optional[str]]:
+    """Runs fn(item) in the current process, interrupting it after `timeout` seconds."""
+    use_alarm = bool(timeout) and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return item, fn(item), None
+    except InstanceTimeout:
+        return item, None, "TIMEOUT"
+    except Exception as e:
+        return item, None, f"ERROR ({type(e).__name__}: {e})"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+def run_batch(fn: Callable, items: Iterable, jobs: Optional[int] = None,
+              timeout: Optional[float] = None) -> Iterator[Tuple[Any, Any, Optional[str]]]:
+    """
+    Runs fn over items on a pool of `jobs` worker processes (default: all cores).
+
+    Yields (item, result, error) in completion order, so callers can report
+    each instance as soon as it finishes. `error` is None on success,
+    "TIMEOUT" if the instance ran longer than `timeout` seconds, or a short
+    description of the exception it raised. fn must be a module-level
+    function so it can be sent to the workers. jobs=1 runs in-process.
+    """
+    items = list(items)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(items) <= 1:
+        for item in items:
+            yield _run_instance(fn, item, timeout)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(items))) as pool:
+        futures = [pool.submit(_run_instance, fn, item, timeout) for item in items]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,467 @@
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sat_node import Comparator, DynamicMemory, SatNode, StaticMemory
+from batch import run_batch
+from dimacs import clauses_to_matrix, matrix_to_clauses, write_dimacs
+from preprocess import preprocess
+from reference import satisfies
+
+# Seeded workload generators and a benchmark runner with a saved baseline.
+#
+# Every instance is fully determined by (family, size, seed), so a baseline
+# records only those plus the measurements: simulated cycles, host wall time
+# and peak Python/NumPy memory (tracemalloc, measured in a separate run so it
+# does not distort the timing). A width sweep reruns a suite at several
+# sweep_width values and sets the cycles against the comparator area; a lane
+# sweep does the same for banked memories against their block RAM.
+
+BASELINE_VERSION = 1
+MIN_TIMED_SECONDS = 0.2 # Short instances are re-run until this much time has passed
+MAX_REPEATS = 5
+MIN_WALL_CHANGE = 0.01 # Wall time changes below this many seconds are noise
+
+# --- Generators: each returns (num_vars, clauses in DIMACS form) ---
+
+def random_ksat(num_vars: int, seed: int, k: int = 3, ratio: float = 4.26) -> Tuple[int, List[List[int]]]:
+    """Uniform random k-SAT; 4.26 clauses per variable is the 3-SAT phase transition."""
+    rng = random.Random(seed)
+    clauses = []
+    for _ in range(round(ratio * num_vars)):
+        clauses.append([v if rng.random() < 0.5 else -v for v in rng.sample(range(1, num_vars + 1), k)])
+    return num_vars, clauses
+
+def pigeonhole(holes: int, seed: int = 0) -> Tuple[int, List[List[int]]]:
+    """holes+1 pigeons into `holes` holes (always UNSAT). Var p*holes+h+1: pigeon p in hole h."""
+    var = lambda p, h: p * holes + h + 1
+    clauses = [[var(p, h) for h in range(holes)] for p in range(holes + 1)]
+    for h in range(holes):
+        for p, q in itertools.combinations(range(holes + 1), 2):
+            clauses.append([-var(p, h), -var(q, h)])
+    return (holes + 1) * holes, clauses
+
+def graph_coloring(vertices: int, seed: int, colors: int = 3, degree: float = 4.0) -> Tuple[int, List[List[int]]]:
+    """Random graph with the given mean degree, colored with `colors` colors. Var v*colors+c+1: v has color c."""
+    rng = random.Random(seed)
+    var = lambda v, c: v * colors + c + 1
+    clauses = []
+    for v in range(vertices):
+        clauses.append([var(v, c) for c in range(colors)])
+        for c, d in itertools.combinations(range(colors), 2):
+            clauses.append([-var(v, c), -var(v, d)])
+    p = min(1.0, degree / max(vertices - 1, 1))
+    for u, v in itertools.combinations(range(vertices), 2):
+        if rng.random() < p:
+            clauses.extend([-var(u, c), -var(v, c)] for c in range(colors))
+    return vertices * colors, clauses
+
+def parity(num_vars: int, seed: int, ratio: float = 0.8) -> Tuple[int, List[List[int]]]:
+    """Random 3-XORSAT: round(ratio*num_vars) equations x+y+z = b, four clauses each."""
+    rng = random.Random(seed)
+    clauses = []
+    for _ in range(round(ratio * num_vars)):
+        xs = rng.sample(range(1, num_vars + 1), 3)
+        b = rng.randrange(2)
+        # Forbid every sign pattern whose parity differs from b
+        for signs in itertools.product((0, 1), repeat=3):
+            if sum(signs) % 2 != b:
+                clauses.append([-x if s else x for x, s in zip(xs, signs)])
+    return num_vars, clauses
+
+GENERATORS = {
+    "random3sat": random_ksat,
+    "pigeonhole": pigeonhole,
+    "coloring": graph_coloring,
+    "parity": parity,
+}
+
+# (family, sizes, seeds); the size is the generator's first argument
+SUITES = {
+    "quick": [
+        ("random3sat", [10, 20, 30], [1, 2]),
+        ("pigeonhole", [3, 4], [0]),
+        ("coloring", [8, 12], [1]),
+        ("parity", [8, 12], [1]),
+    ],
+    "default": [
+        ("random3sat", [10, 20, 30, 40, 50], [1, 2, 3]),
+        ("pigeonhole", [3, 4, 5], [0]),
+        ("coloring", [8, 12, 16, 20], [1, 2]),
+        ("parity", [8, 12, 16, 20], [1, 2]),
+    ],
+    "scaling": [
+        ("random3sat", [50, 75, 100, 150, 200], [1, 2]),
+        ("pigeonhole", [5, 6, 7], [0]),
+        ("coloring", [20, 30, 40, 60], [1, 2]),
+        ("parity", [20, 30, 40], [1, 2]),
+    ],
+}
+
+def suite_instances(suite: str) -> List[Tuple[str, int, int]]:
+    return [(family, size, seed) for family, sizes, seeds in SUITES[suite] for size in sizes for seed in seeds]
+
+def instance_name(family: str, size: int, seed: int) -> str:
+    return f"{family}-{size}-s{seed}"
+
+# --- Running ---
+
+def run_instance(spec: Tuple) -> Dict:
+    """
+    Generates and solves one instance. spec = (family, size, seed, options)
+    where options holds node_options, max_cycles, memory, rtl and preprocess.
+    Module-level so run_batch can send it to worker processes.
+    """
+    family, size, seed, options = spec
+    num_vars, clauses = GENERATORS[family](size, seed)
+    matrix = clauses_to_matrix(clauses)
+    solve_vars, solve_matrix, pre = num_vars, matrix, None
+    if options.get("preprocess"):
+        t = time.perf_counter()
+        solve_vars, solve_matrix, pre = preprocess(num_vars, matrix)
+        pre_wall = time.perf_counter() - t
+
+    def solve():
+        node = SatNode(solve_matrix, solve_vars, mode="fast", **options.get("node_options", {}))
+        node.max_cycles = options.get("max_cycles", 10**7)
+        t = time.perf_counter()
+        node.solve()
+        return node, time.perf_counter() - t
+
+    # Best of several runs for short instances, whose single timings are noisy
+    node, wall = solve()
+    elapsed, repeats = wall, 1
+    while elapsed < MIN_TIMED_SECONDS and repeats < MAX_REPEATS:
+        wall = min(wall, solve()[1])
+        elapsed += wall
+        repeats += 1
+    result = node.state if node.state in ("SAT", "UNSAT") else "TIMEOUT"
+    assignment = pre.extend(node.assignment_table) if pre else node.assignment_table
+    queue = node.propagation_queue.stats()
+    row = {
+        "family": family, "size": size, "seed": seed,
+        "vars": num_vars, "clauses": len(clauses), "width": int(matrix.shape[1]),
+        "result": result, "cycles": node.cycle_count, "wall_s": round(wall, 6),
+        "model_ok": satisfies(matrix, assignment) if result == "SAT" else None,
+        "queue_peak": queue["peak"], "queue_mean": queue["occupancy"]["mean"],
+        "prop_cycles": node.counters.state_cycles["PROPAGATE"], "prop_literals": queue["pops"],
+    }
+    if pre:
+        row.update(rows_out=pre.stats["rows_out"], vars_out=pre.stats["vars_out"], pre_wall_s=round(pre_wall, 6))
+    if options.get("memory", True):
+        tracemalloc.start()
+        try:
+            solve()
+            row["peak_mem_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+    if options.get("rtl"):
+        row.update(_run_rtl(solve_vars, matrix_to_clauses(solve_matrix), solve_matrix))
+    return row
+
+def _run_rtl(num_vars: int, clauses: List[List[int]], matrix: np.ndarray) -> Dict:
+    from verify_all import run_rtl_model
+    with tempfile.TemporaryDirectory(prefix="sat_bench_") as work_dir:
+        cnf = os.path.join(work_dir, "instance.cnf")
+        write_dimacs(cnf, num_vars, matrix)
+        t = time.perf_counter()
+        rtl_res, _, rtl_cycles, _ = run_rtl_model(cnf, num_vars, len(clauses), work_dir=work_dir,
+                                                  num_cols=matrix.shape[1])
+        return {"rtl_result": rtl_res, "rtl_cycles": rtl_cycles, "rtl_wall_s": round(time.perf_counter() - t, 6)}
+
+def run_suite(suite: str = "quick", jobs: Optional[int] = None, timeout: Optional[float] = None,
+              node_options: Optional[Dict] = None, max_cycles: int = 10**7, memory: bool = True,
+              rtl: bool = False, preprocess: bool = False) -> Dict[str, Dict]:
+    """
+    Runs every instance of a suite, printing one line per instance as it
+    finishes. With preprocess, each instance is simplified first (see
+    preprocess.py) and the line also shows the rows and variables left.
+    """
+    options = {"node_options": node_options or {}, "max_cycles": max_cycles, "memory": memory, "rtl": rtl,
+               "preprocess": preprocess}
+    specs = [(family, size, seed, options) for family, size, seed in suite_instances(suite)]
+    results = {}
+    print(f"{'Instance':<22} {'Vars':>5} {'Clauses':>7} {'Result':<8} {'Cycles':>10} {'Wall s':>9} {'Peak KB':>9}")
+    for spec, row, error in run_batch(run_instance, specs, jobs=jobs, timeout=timeout):
+        name = instance_name(*spec[:3])
+        if error:
+            row = {"family": spec[0], "size": spec[1], "seed": spec[2], "result": error}
+            print(f"{name:<22} {error}")
+        else:
+            flag = "" if row["model_ok"] is not False else "  INVALID MODEL"
+            if "rows_out" in row:
+                flag = f"  -> {row['vars_out']} vars, {row['rows_out']} rows{flag}"
+            print(f"{name:<22} {row['vars']:>5} {row['clauses']:>7} {row['result']:<8} {row['cycles']:>10} "
+                  f"{row['wall_s']:>9.4f} {row.get('peak_mem_kb', '-'):>9}{flag}")
+        results[name] = row
+    return dict(sorted(results.items()))
+
+# --- Baselines ---
+
+def save_baseline(path: str, suite: str, results: Dict[str, Dict], config: Dict):
+    baseline = {
+        "version": BASELINE_VERSION,
+        "suite": suite,
+        "config": config,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine()},
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+
+def load_baseline(path: str) -> Dict:
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get("version") != BASELINE_VERSION:
+        raise ValueError(f"{path} is baseline version {baseline.get('version')}, expected {BASELINE_VERSION}")
+    return baseline
+
+def compare(results: Dict[str, Dict], baseline: Dict, threshold: float = 5.0,
+            time_threshold: float = 25.0) -> List[Dict]:
+    """
+    Compares results against a baseline. A row regresses if its verdict
+    changed, or cycles / wall time grew by more than threshold /
+    time_threshold percent. Wall time is noisy, hence the looser default
+    and the MIN_WALL_CHANGE floor. Peak memory is reported, never flagged.
+    """
+    rows = []
+    for name, row in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        entry = {"instance": name, "result": row["result"], "baseline_result": base["result"], "regressions": []}
+        if row["result"] != base["result"]:
+            entry["regressions"].append("verdict")
+        for field, limit in (("cycles", threshold), ("wall_s", time_threshold), ("peak_mem_kb", None)):
+            if field not in row or not base.get(field):
+                continue
+            change = 100.0 * (row[field] - base[field]) / base[field]
+            entry[field] = round(change, 1)
+            if field == "wall_s" and row[field] - base[field] < MIN_WALL_CHANGE:
+                continue
+            if limit is not None and change > limit:
+                entry["regressions"].append(field)
+        rows.append(entry)
+    return rows
+
+def print_report(rows: List[Dict]) -> int:
+    """Prints the regression report; returns the number of regressed instances."""
+    print(f"\n{'Instance':<22} {'Verdict':<15} {'Cycles %':>9} {'Wall %':>8} {'Mem %':>8}  Status")
+    regressed = 0
+    for entry in rows:
+        verdict = entry["result"] if entry["result"] == entry["baseline_result"] else \
+            f"{entry['baseline_result']}->{entry['result']}"
+        status = "REGRESSION (" + ", ".join(entry["regressions"]) + ")" if entry["regressions"] else "ok"
+        regressed += bool(entry["regressions"])
+        print(f"{entry['instance']:<22} {verdict:<15} {entry.get('cycles', '-'):>9} {entry.get('wall_s', '-'):>8} "
+              f"{entry.get('peak_mem_kb', '-'):>8}  {status}")
+    print(f"\n{regressed} of {len(rows)} instances regressed")
+    return regressed
+
+# --- Queue sizing ---
+
+def print_queue_report(results: Dict[str, Dict]) -> Dict[str, int]:
+    """
+    Prints the propagation queue occupancy measured per family against the
+    RTL FIFO depth (2*num_vars of the largest instance) and returns the
+    depth each family needs: the next power of two at or above its peak.
+    A queue of that depth never overflows on these instances.
+    """
+    rows = [row for row in results.values() if "queue_peak" in row]
+    families = sorted({row["family"] for row in rows})
+    print(f"\n{'Family':<12} {'Max vars':>8} {'RTL depth':>9} {'Peak':>6} {'Mean':>6} {'Needed':>7} {'Of RTL':>7}")
+    needed = {}
+    for family in families:
+        group = [row for row in rows if row["family"] == family]
+        rtl_depth = 2 * max(row["vars"] for row in group)
+        peak = max(row["queue_peak"] for row in group)
+        mean = sum(row["queue_mean"] for row in group) / len(group)
+        needed[family] = 1 << max(peak - 1, 0).bit_length()
+        print(f"{family:<12} {rtl_depth // 2:>8} {rtl_depth:>9} {peak:>6} {mean:>6.2f} {needed[family]:>7} "
+              f"{needed[family] / rtl_depth:>6.0%}")
+    return needed
+
+# --- Sweep width ---
+
+def width_sweep(suite: str, widths: List[int], jobs: Optional[int] = None, timeout: Optional[float] = None,
+                node_options: Optional[Dict] = None, max_cycles: int = 10**7) -> Dict[int, Dict[str, Dict]]:
+    """Runs the suite once per sweep width; returns {width: results}."""
+    sweep = {}
+    for width in widths:
+        print(f"\nsweep_width={width}")
+        sweep[width] = run_suite(suite, jobs=jobs, timeout=timeout, node_options={**(node_options or {}),
+                                 "sweep_width": width}, max_cycles=max_cycles, memory=False)
+    return sweep
+
+def print_width_report(sweep: Dict[int, Dict[str, Dict]]) -> int:
+    """
+    Prints summed cycles per family for every width, over the instances
+    solved at all widths, next to the comparator area of an image sized for
+    the suite's largest instance. "Saved/LUT" is the marginal gain over the
+    next narrower width: cycles saved per added comparator LUT, which drops
+    off once the queue rarely holds more literals than the bank takes.
+    Returns the number of instances whose verdict depends on the width.
+    """
+    widths = sorted(sweep)
+    results = list(sweep.values())
+    names = [name for name in results[0] if all(r[name]["result"] in ("SAT", "UNSAT") for r in results)]
+    mismatched = [name for name in results[0] if len({r[name]["result"] for r in results}) > 1]
+    rows = [row for r in results for row in r.values() if "vars" in row]
+    lit_width = max((2 * row["vars"] + 1).bit_length() for row in rows)
+    num_cols = max(row["width"] for row in rows)
+    families = sorted({sweep[widths[0]][name]["family"] for name in names})
+
+    totals = {w: {f: sum(sweep[w][n]["cycles"] for n in names if sweep[w][n]["family"] == f) for f in families}
+              for w in widths}
+    luts = {w: Comparator.area_luts(lit_width, num_cols, w) for w in widths}
+    base = widths[0]
+    print(f"\nComparator area per row: {num_cols} slots x {lit_width}-bit literals ({len(names)} instances)")
+    print(f"{'W':>3} {'Cycles':>12} {'Speedup':>8} " + " ".join(f"{f:>11}" for f in families) +
+          f" {'Cmp LUTs':>9} {'Saved/LUT':>10}")
+    for prev, w in zip([None] + widths, widths):
+        cycles = sum(totals[w].values())
+        per_family = " ".join(f"{totals[base][f] / max(totals[w][f], 1):>10.2f}x" for f in families)
+        saved = "-" if prev is None else f"{(sum(totals[prev].values()) - cycles) / (luts[w] - luts[prev]):.1f}"
+        print(f"{w:>3} {cycles:>12} {sum(totals[base].values()) / max(cycles, 1):>7.2f}x {per_family} "
+              f"{luts[w]:>9} {saved:>10}")
+    for name in mismatched:
+        print(f"VERDICT MISMATCH {name}: " + ", ".join(f"W={w} {sweep[w][name]['result']}" for w in widths))
+    return len(mismatched)
+
+# --- Lane sweep ---
+
+def lane_sweep(suite: str, lanes: List[int], jobs: Optional[int] = None, timeout: Optional[float] = None,
+               node_options: Optional[Dict] = None, max_cycles: int = 10**7) -> Dict[int, Dict[str, Dict]]:
+    """Runs the suite once per lane count; returns {lanes: results}."""
+    sweep = {}
+    for count in lanes:
+        print(f"\nlanes={count}")
+        sweep[count] = run_suite(suite, jobs=jobs, timeout=timeout, node_options={**(node_options or {}),
+                                 "lanes": count}, max_cycles=max_cycles, memory=False)
+    return sweep
+
+def print_lane_report(sweep: Dict[int, Dict[str, Dict]], node_options: Optional[Dict] = None) -> int:
+    """
+    Prints PROPAGATE cycles per propagated literal per family for every lane
+    count, over the instances solved at all counts, next to the block RAM
+    and comparator area of an image sized for the suite's largest instance
+    (learned rows included). Banks shallower than a RAMB36 waste the rest of
+    it, so the BRAM count grows once rows / lanes drops below 512.
+    Returns the number of instances whose verdict depends on the lane count.
+    """
+    options = node_options or {}
+    counts = sorted(sweep)
+    results = list(sweep.values())
+    names = [name for name in results[0] if all(r[name]["result"] in ("SAT", "UNSAT") for r in results)]
+    mismatched = [name for name in results[0] if len({r[name]["result"] for r in results}) > 1]
+    rows = [row for r in results for row in r.values() if "vars" in row]
+    lit_width = max((2 * row["vars"] + 1).bit_length() for row in rows)
+    num_cols = max(row["width"] for row in rows)
+    num_rows = max(row["clauses"] for row in rows)
+    if options.get("learning"):
+        num_rows += options.get("learned_rows", 256)
+        num_cols = max(num_cols, options.get("learned_width", 16))
+    families = sorted({sweep[counts[0]][name]["family"] for name in names})
+
+    def per_literal(count: int, family: str) -> float:
+        group = [sweep[count][n] for n in names if sweep[count][n]["family"] == family]
+        return sum(row["prop_cycles"] for row in group) / max(sum(row["prop_literals"] for row in group), 1)
+
+    base = counts[0]
+    print(f"\nBanked memory: {num_rows} rows x {num_cols} slots x {lit_width}-bit literals "
+          f"({len(names)} instances); PROPAGATE cycles per literal")
+    print(f"{'B':>3} {'Cycles':>12} {'Speedup':>8} " + " ".join(f"{f:>11}" for f in families) +
+          f" {'Static BRAM':>11} {'Dyn BRAM':>8} {'Cmp LUTs':>9}")
+    for count in counts:
+        cycles = sum(sweep[count][n]["cycles"] for n in names)
+        base_cycles = sum(sweep[base][n]["cycles"] for n in names)
+        per_family = " ".join(f"{per_literal(count, f):>11.1f}" for f in families)
+        luts = count * Comparator.area_luts(lit_width, num_cols, options.get("sweep_width", 1))
+        print(f"{count:>3} {cycles:>12} {base_cycles / max(cycles, 1):>7.2f}x {per_family} "
+              f"{StaticMemory.area_brams(num_rows, num_cols, lit_width, count):>11} "
+              f"{DynamicMemory.area_brams(num_rows, num_cols, count):>8} {luts:>9}")
+    for name in mismatched:
+        print(f"VERDICT MISMATCH {name}: " + ", ".join(f"B={b} {sweep[b][name]['result']}" for b in counts))
+    return len(mismatched)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark SatNode on generated instance families.")
+    parser.add_argument("--suite", default="quick", choices=sorted(SUITES))
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--timeout", type=float, default=None, help="per-instance timeout in seconds")
+    parser.add_argument("--max-cycles", type=int, default=10**7)
+    parser.add_argument("--propagation", default="scan", choices=SatNode.PROPAGATIONS)
+    parser.add_argument("--backtrack", default="rebuild", choices=SatNode.BACKTRACKS)
+    parser.add_argument("--heuristic", default="first", choices=SatNode.HEURISTICS)
+    parser.add_argument("--phase-saving", action="store_true")
+    parser.add_argument("--learning", action="store_true", help="conflict-driven clause learning")
+    parser.add_argument("--learned-rows", type=int, default=256, help="rows reserved for learned clauses")
+    parser.add_argument("--learned-width", type=int, default=16, help="literal slots per learned row")
+    parser.add_argument("--eviction", default="lbd", choices=SatNode.EVICTIONS)
+    parser.add_argument("--sweep-width", type=int, default=1, help="literals propagated per sweep")
+    parser.add_argument("--widths", type=int, nargs="+", metavar="W",
+                        help="run the suite at each sweep width and report cycles against comparator area")
+    parser.add_argument("--lanes", type=int, nargs="+", metavar="B",
+                        help="run the suite with B memory lanes each and report cycles against block RAM")
+    parser.add_argument("--queue-depth", type=int, default=None,
+                        help="bound the propagation queue (default: unbounded)")
+    parser.add_argument("--queue-overflow", default="stall", choices=SatNode.OVERFLOWS,
+                        help="what a push into a full queue does (default: stall, which raises)")
+    parser.add_argument("--queue-report", action="store_true",
+                        help="print the queue occupancy per family and the depth it needs")
+    parser.add_argument("--preprocess", action="store_true", help="simplify each instance before solving")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak memory run")
+    parser.add_argument("--rtl", action="store_true", help="also run each instance through the RTL flow")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write the results as a new baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against this baseline")
+    parser.add_argument("--threshold", type=float, default=5.0, help="allowed cycle increase in %% (default 5)")
+    parser.add_argument("--time-threshold", type=float, default=25.0,
+                        help="allowed wall time increase in %% (default 25)")
+    args = parser.parse_args()
+
+    node_options = {"propagation": args.propagation, "backtrack": args.backtrack,
+                    "heuristic": args.heuristic, "phase_saving": args.phase_saving}
+    if args.learning:
+        node_options.update(learning=True, learned_rows=args.learned_rows,
+                            learned_width=args.learned_width, eviction=args.eviction)
+    if args.sweep_width != 1:
+        node_options["sweep_width"] = args.sweep_width
+    if args.queue_depth is not None:
+        node_options.update(queue_depth=args.queue_depth, queue_overflow=args.queue_overflow)
+    if args.widths:
+        sweep = width_sweep(args.suite, args.widths, jobs=args.jobs, timeout=args.timeout,
+                            node_options=node_options, max_cycles=args.max_cycles)
+        sys.exit(1 if print_width_report(sweep) else 0)
+    if args.lanes:
+        sweep = lane_sweep(args.suite, args.lanes, jobs=args.jobs, timeout=args.timeout,
+                           node_options=node_options, max_cycles=args.max_cycles)
+        sys.exit(1 if print_lane_report(sweep, node_options) else 0)
+    config = {"node_options": node_options, "max_cycles": args.max_cycles}
+    if args.preprocess:
+        config["preprocess"] = True
+    results = run_suite(args.suite, jobs=args.jobs, timeout=args.timeout, node_options=node_options,
+                        max_cycles=args.max_cycles, memory=not args.no_memory, rtl=args.rtl,
+                        preprocess=args.preprocess)
+    if args.queue_report:
+        print_queue_report(results)
+
+    status = 0
+    if args.baseline:
+        baseline = load_baseline(args.baseline)
+        if baseline["config"] != config:
+            print(f"\nWarning: baseline config {baseline['config']} differs from {config}")
+        status = 1 if print_report(compare(results, baseline, args.threshold, args.time_threshold)) else 0
+    if args.save_baseline:
+        save_baseline(args.save_baseline, args.suite, results, config)
+        print(f"\nBaseline written to {args.save_baseline}")
+    sys.exit(status)
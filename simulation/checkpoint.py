@@ -0,0 +1,94 @@
+import json
+import os
+from typing import Dict
+import numpy as np
+
+# Checkpoint files of SatNode (save_checkpoint / load_checkpoint).
+#
+# A checkpoint is one compressed .npz file. Every component contributes a
+# section, a flat dict from SatNode.snapshot(): NumPy arrays (memories,
+# per-variable tables, the decision stack) are stored as members named
+# "<section>.<key>", and everything else (pointers, FSM state, small lists)
+# goes into a single JSON "meta" member. Files are written to a temporary
+# name and renamed, so a run killed while saving leaves the previous
+# checkpoint intact.
+
+CHECKPOINT_VERSION = 1
+
+def _json_default(value):
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def write_checkpoint(path: str, sections: Dict[str, Dict]):
+    """Writes {section: {key: array or JSON value}} to a compressed .npz file, atomically."""
+    arrays = {}
+    meta = {"version": CHECKPOINT_VERSION}
+    for section, values in sections.items():
+        meta[section] = {}
+        for key, value in values.items():
+            if isinstance(value, np.ndarray):
+                arrays[f"{section}.{key}"] = value
+            else:
+                meta[section][key] = value
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez_compressed(f, meta=np.array(json.dumps(meta, default=_json_default)), **arrays)
+    os.replace(tmp, path)
+
+def read_checkpoint(path: str) -> Dict[str, Dict]:
+    """Inverse of write_checkpoint."""
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        if meta.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"{path} is checkpoint version {meta.get('version')}, expected {CHECKPOINT_VERSION}")
+        sections = {section: dict(values) for section, values in meta.items() if section != "version"}
+        for name in data.files:
+            if name != "meta":
+                section, key = name.split(".", 1)
+                sections.setdefault(section, {})[key] = data[name]
+    return sections
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+    from sat_node import SatNode
+
+    parser = argparse.ArgumentParser(description="Run SatNode with periodic checkpoints, resuming from the "
+                                                 "checkpoint if it exists.")
+    parser.add_argument("checkpoint", help="checkpoint file (.npz)")
+    parser.add_argument("--cnf", help="DIMACS file to start from (only needed when the checkpoint does not exist)")
+    parser.add_argument("--every", type=int, default=None, help="cycles between checkpoints (default: only at the end)")
+    parser.add_argument("--max-cycles", type=int, default=10**7, help="total cycle budget, counted from cycle 0")
+    # Node options of a new run; a resumed run keeps the checkpoint's, except the mode
+    parser.add_argument("--mode", default="fast", choices=SatNode.MODES)
+    parser.add_argument("--propagation", default="scan", choices=SatNode.PROPAGATIONS)
+    parser.add_argument("--backtrack", default="rebuild", choices=SatNode.BACKTRACKS)
+    parser.add_argument("--heuristic", default="first", choices=SatNode.HEURISTICS)
+    parser.add_argument("--learning", action="store_true")
+    args = parser.parse_args()
+
+    if os.path.exists(args.checkpoint):
+        node = SatNode.from_checkpoint(args.checkpoint, mode=args.mode)
+        print(f"Resuming {args.checkpoint} at cycle {node.cycle_count} ({node.state}, "
+              f"{len(node.decision_stack)} stack entries)")
+    elif args.cnf:
+        from dimacs import load_dimacs
+        num_vars, matrix = load_dimacs(args.cnf)
+        node = SatNode(matrix, num_vars, mode=args.mode, propagation=args.propagation, backtrack=args.backtrack,
+                       heuristic=args.heuristic, learning=args.learning)
+    else:
+        parser.error(f"{args.checkpoint} does not exist; pass --cnf to start a new run")
+    node.max_cycles = args.max_cycles
+
+    t = time.perf_counter()
+    state, assignment = node.solve(checkpoint=args.checkpoint, checkpoint_every=args.every)
+    print(f"{state} at cycle {node.cycle_count} ({time.perf_counter() - t:.3f} s); checkpoint in {args.checkpoint}")
+    if state == "SAT":
+        print("Assignment: " + " ".join(str(v if val else -v) for v, val in sorted(assignment.items())))
+    sys.exit(0 if state in ("SAT", "UNSAT") else 1)
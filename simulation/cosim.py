@@ -0,0 +1,274 @@
+import os
+import subprocess
+import tempfile
+from collections import deque
+from itertools import zip_longest
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+from sat_node import SatNode
+from dimacs import load_dimacs
+from verify_all import RTL_STATES, compiled_simulator, size_bucket, write_problem_hex
+
+# Lockstep co-simulation of SatNode against sat_node.sv.
+#
+# The RTL runs under vvp with TRACE_MODE and TRACE_STATE and its TRACE lines
+# are read from a pipe one at a time while a cycle-mode SatNode is stepped
+# alongside. The two FSMs do not take the same cycles for the same work (the
+# RTL reads a row in one cycle and writes it in the next, pops the queue in a
+# cycle of its own and flips through FLIP_DECISION and REBUILD_QUEUE), so both
+# sides are reduced to the same sequence of architectural events: decisions,
+# row visits, implications, conflicts, backtrack pops and the verdict. Event
+# pairs are compared on kind, row, literal and variable, the state before and
+# after, and the assignments and queue contents once the event has settled.
+# The run stops at the first mismatch. Only a fixed window of events and raw
+# TRACE lines is kept, so memory does not grow with the length of the run.
+
+# RTL state -> SatNode state. The flip and the queue rebuild are both part of
+# SatNode's BACKTRACK cycle that flips a decision.
+STATE_MAP = {
+    "IDLE": "IDLE", "DECIDE": "DECIDE", "PROPAGATE": "PROPAGATE", "BACKTRACK": "BACKTRACK",
+    "FLIP_DECISION": "BACKTRACK", "REBUILD_QUEUE": "BACKTRACK", "SAT": "SAT", "UNSAT": "UNSAT",
+}
+
+# Fields compared for every event kind. bcp_conflict has no RTL counterpart:
+# the RTL ignores a unit row whose variable is already assigned.
+EVENT_FIELDS = {
+    "decide": ("var", "lit"), "sat": (), "drained": (),
+    "row": ("row", "lit", "end"), "imply": ("row", "lit", "var", "end"), "conflict": ("row", "lit"),
+    "bcp_conflict": ("var",), "unassign": ("var",), "flip": ("var",), "unsat": (),
+}
+
+# TRACE events that only do bookkeeping for the event before or after them
+RTL_FLIP_SPAN = ("assign", "rebuild")
+
+class Event(NamedTuple):
+    cycle: int                    # Cycle of the event (each model's own count)
+    state: str                    # SatNode state during the event
+    kind: str                     # Key of EVENT_FIELDS
+    fields: Dict[str, int]
+    next_state: Optional[str]     # State after the event; None if the run ended first
+    assignments: Optional[Dict[int, bool]] # After the event has settled; None if unknown
+    queue: Optional[List[int]]
+
+    def describe(self) -> str:
+        return " ".join([self.kind] + [f"{k}={v}" for k, v in self.fields.items()])
+
+def python_events(node: SatNode) -> Iterator[Event]:
+    """Steps a cycle-mode SatNode and yields one Event per architectural event."""
+    while node.state not in ('SAT', 'UNSAT') and node.cycle_count < node.max_cycles:
+        state = node.state
+        top = node.decision_stack[-1] if node.decision_stack else None
+        implications = node.counters.implications
+        info = node.step()
+        if state == 'DECIDE':
+            if "decision_var" not in info:
+                continue # Multi-cycle heuristic still deciding
+            var = info["decision_var"]
+            kind, fields = ("sat", {}) if var is None else \
+                ("decide", {"var": var, "lit": 2 * var + int(node.assignment_table[var])})
+        elif state == 'PROPAGATE':
+            lit = node.current_prop_batch[0] if node.current_prop_batch else 0
+            if "row" in info:
+                end = int(node.current_prop_literal is None)
+                if node.counters.implications > implications:
+                    kind, fields = "imply", {"row": info["row"], "lit": lit, "var": node.decision_stack[-1][0],
+                                             "end": end}
+                else:
+                    kind, fields = "row", {"row": info["row"], "lit": lit, "end": end}
+            elif "conflict_row" in info:
+                kind, fields = "conflict", {"row": info["conflict_row"], "lit": lit}
+            elif "bcp_conflict_var" in info:
+                kind, fields = "bcp_conflict", {"var": info["bcp_conflict_var"]}
+            elif node.state == 'DECIDE':
+                kind, fields = "drained", {}
+            else:
+                continue # Index RAM lookup
+        elif state == 'BACKTRACK':
+            if node.state == 'UNSAT':
+                kind, fields = "unsat", {}
+            else:
+                kind, fields = ("flip" if node.state != 'BACKTRACK' else "unassign"), {"var": top[0]}
+        else:
+            continue
+        yield Event(node.cycle_count, state, kind, fields, node.state, dict(node.assignment_table),
+                    list(node.propagation_queue))
+
+def parse_trace_line(line: str) -> Dict[str, str]:
+    return dict(item.split("=", 1) for item in line.split()[1:])
+
+def _rtl_snapshot(record: Dict[str, str], num_vars: int):
+    """(assignments, queue) of a TRACE_STATE line, or (None, None) without TRACE_STATE."""
+    if "as" not in record:
+        return None, None
+    assigned, values = int(record["as"], 16), int(record["vs"], 16)
+    assignments = {v: bool(values >> (v - 1) & 1) for v in range(1, num_vars + 1) if assigned >> (v - 1) & 1}
+    return assignments, [int(lit) for lit in record["q"].split(",") if lit]
+
+def rtl_events(lines: Iterable[str], num_vars: int) -> Iterator[Event]:
+    """
+    Turns a stream of TRACE lines into Events. Commands the FSM issues take
+    effect one cycle later, so an event's next state is read from the line
+    after it and its assignments and queue from the line after that. A flip
+    ends with its last REBUILD_QUEUE line. At most three events are pending.
+    """
+    pending = deque() # [record, flip still open, next state, snapshot record]
+    for line in lines:
+        if not line.startswith("TRACE "):
+            continue
+        record = parse_trace_line(line)
+        state = STATE_MAP[RTL_STATES[int(record["st"])]]
+        for item in pending:
+            if item[1]:
+                if record["ev"] in RTL_FLIP_SPAN:
+                    break
+                item[1] = False
+            if item[2] is None:
+                item[2] = state
+            elif item[3] is None:
+                item[3] = record
+        while pending and pending[0][3] is not None:
+            yield _rtl_event(pending.popleft(), num_vars)
+        if record["ev"] in EVENT_FIELDS:
+            pending.append([record, record["ev"] == "flip", None, None])
+    while pending:
+        yield _rtl_event(pending.popleft(), num_vars)
+
+def _rtl_event(item, num_vars: int) -> Event:
+    record, _, next_state, snapshot = item
+    kind = record["ev"]
+    assignments, queue = _rtl_snapshot(snapshot, num_vars) if snapshot is not None else (None, None)
+    return Event(int(record["cyc"]), STATE_MAP[RTL_STATES[int(record["st"])]], kind,
+                 {name: int(record[name]) for name in EVENT_FIELDS[kind]}, next_state, assignments, queue)
+
+def diff_events(py: Optional[Event], rtl: Optional[Event]) -> List[str]:
+    """Names of what disagrees between two events; empty if they match."""
+    if py is None or rtl is None:
+        return ["ended"] if py is not rtl else []
+    if py.kind != rtl.kind:
+        return ["event"]
+    diff = [name for name, value in py.fields.items() if rtl.fields.get(name) != value]
+    if py.state != rtl.state:
+        diff.append("state")
+    if rtl.next_state is not None and py.next_state != rtl.next_state:
+        diff.append("next_state")
+    if rtl.assignments is not None and py.assignments != rtl.assignments:
+        diff.append("assignments")
+    if rtl.queue is not None and py.queue != rtl.queue:
+        diff.append("queue")
+    return diff
+
+def cosimulate(node: SatNode, lines: Iterable[str], before: int = 8, after: int = 4,
+               raw_lines: int = 64) -> Dict:
+    """
+    Runs node in lockstep with the RTL TRACE stream `lines` until both reach
+    a verdict or the first mismatch. The result holds the mismatch, the last
+    `before` event pairs up to it and `after` pairs past it, and the raw
+    TRACE lines of that window (at most `raw_lines`).
+    """
+    recent = deque(maxlen=raw_lines)
+    def tee(stream):
+        for line in stream:
+            if line.startswith("TRACE "):
+                recent.append(line.rstrip("\n"))
+            yield line
+
+    window = deque(maxlen=before + 1) # Up to and including the divergence
+    past = []                         # After it
+    divergence = None
+    events = 0
+    for index, (py, rtl) in enumerate(zip_longest(python_events(node), rtl_events(tee(lines), node.num_vars))):
+        if divergence is not None:
+            if len(past) >= after:
+                break
+            past.append((index, py, rtl, diff_events(py, rtl)))
+            continue
+        diff = diff_events(py, rtl)
+        window.append((index, py, rtl, diff))
+        events = index + 1
+        if diff:
+            divergence = {"index": index, "fields": diff, "python": py, "rtl": rtl}
+    window = list(window) + past
+
+    cycles = [rtl.cycle for _, _, rtl, _ in window if rtl is not None]
+    first = min(cycles, default=0)
+    shown = [line for line in recent if int(parse_trace_line(line)["cyc"]) >= first]
+    return {"match": divergence is None, "events": events, "divergence": divergence, "window": window,
+            "rtl_lines": shown, "py_state": node.state, "py_cycles": node.cycle_count}
+
+def run_cosim(path: str, before: int = 8, after: int = 4, max_cycles: int = 10**6) -> Dict:
+    """Co-simulates one CNF file: vvp's stdout is consumed through a pipe as it runs."""
+    n_vars, matrix = load_dimacs(path)
+    n_rows = len(matrix)
+    node = SatNode(matrix, n_vars) # The RTL only implements the default configuration
+    node.max_cycles = max_cycles
+    sim_exe = compiled_simulator(n_rows, n_vars, matrix.shape[1], trace=True, state=True)
+    _, _, lit_width, cols = size_bucket(n_rows, n_vars, matrix.shape[1])
+    with tempfile.TemporaryDirectory(prefix="sat_cosim_") as work_dir:
+        hex_path = write_problem_hex(path, work_dir, lit_width, cols)
+        cmd_run = ["vvp", "-n", sim_exe, f"+HEX={hex_path}", f"+ROWS={n_rows}", f"+VARS={n_vars}"]
+        with subprocess.Popen(cmd_run, stdout=subprocess.PIPE, text=True, bufsize=1) as proc:
+            try:
+                return cosimulate(node, proc.stdout, before, after)
+            finally:
+                proc.kill() # Nothing past the window is needed
+
+def replay_cosim(path: str, log_path: str, before: int = 8, after: int = 4, max_cycles: int = 10**6) -> Dict:
+    """Co-simulates against a TRACE log saved from an earlier vvp run."""
+    n_vars, matrix = load_dimacs(path)
+    node = SatNode(matrix, n_vars)
+    node.max_cycles = max_cycles
+    with open(log_path) as f:
+        return cosimulate(node, f, before, after)
+
+def _assignment_diff(py: Dict[int, bool], rtl: Dict[int, bool]) -> str:
+    def show(table, v):
+        return "-" if v not in table else ("T" if table[v] else "F")
+    return ", ".join(f"x{v} py={show(py, v)} rtl={show(rtl, v)}"
+                     for v in sorted(set(py) | set(rtl)) if py.get(v) != rtl.get(v))
+
+def print_cosim(result: Dict):
+    divergence = result["divergence"]
+    if divergence is None:
+        print(f"  Lockstep match: {result['events']} events, Python {result['py_state']} "
+              f"after {result['py_cycles']} cycles")
+        return
+    print(f"  Diverged at event {divergence['index']}: {', '.join(divergence['fields'])}")
+    print(f"  {'#':>6} {'Py cyc':>8} {'Py state':<10} {'Py event':<34} "
+          f"{'RTL cyc':>8} {'RTL state':<10} {'RTL event':<34} Diff")
+    for index, py, rtl, diff in result["window"]:
+        marker = ">" if index == divergence["index"] else " "
+        cols = []
+        for event in (py, rtl):
+            if event is None:
+                cols.append(f"{'':>8} {'(ended)':<10} {'':<34}")
+            else:
+                cols.append(f"{event.cycle:>8} {event.state:<10} {event.describe():<34}")
+        print(f" {marker}{index:>6} {cols[0]} {cols[1]} {','.join(diff)}")
+    py, rtl = divergence["python"], divergence["rtl"]
+    if py is not None and rtl is not None:
+        if "next_state" in divergence["fields"]:
+            print(f"  Next state: Python {py.next_state}, RTL {rtl.next_state}")
+        if "assignments" in divergence["fields"]:
+            print(f"  Assignments: {_assignment_diff(py.assignments, rtl.assignments)}")
+        if "queue" in divergence["fields"]:
+            print(f"  Queue: Python {py.queue}, RTL {rtl.queue}")
+    print("  RTL TRACE lines:")
+    for line in result["rtl_lines"]:
+        print(f"    {line}")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the Python model and the RTL in lockstep and report "
+                                                 "the first cycle where they diverge.")
+    parser.add_argument("cnf", help="DIMACS file")
+    parser.add_argument("--replay", help="compare against this saved TRACE_STATE log instead of running vvp")
+    parser.add_argument("--before", type=int, default=8, help="events shown up to the divergence (default 8)")
+    parser.add_argument("--after", type=int, default=4, help="events shown past the divergence (default 4)")
+    parser.add_argument("--max-cycles", type=int, default=10**6, help="Python model cycle limit")
+    args = parser.parse_args()
+    if args.replay:
+        result = replay_cosim(args.cnf, args.replay, args.before, args.after, args.max_cycles)
+    else:
+        result = run_cosim(args.cnf, args.before, args.after, args.max_cycles)
+    print(os.path.basename(args.cnf))
+    print_cosim(result)
+    raise SystemExit(0 if result["match"] else 1)
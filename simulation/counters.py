@@ -0,0 +1,133 @@
+import json
+import time
+from typing import Dict, Iterable, List, Optional
+
+class Histogram:
+    """
+    Power-of-two bucketed histogram of non-negative integers.
+    Bucket 0 holds 0, bucket k >= 1 holds values in [2^(k-1), 2^k).
+    """
+    def __init__(self):
+        self.buckets: List[int] = []
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value: int, n: int = 1):
+        k = int(value).bit_length()
+        if k >= len(self.buckets):
+            self.buckets.extend([0] * (k + 1 - len(self.buckets)))
+        self.buckets[k] += n
+        self.count += n
+        self.total += value * n
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict:
+        labels = ["0"] + [str(1 << (k - 1)) if k == 1 else f"{1 << (k - 1)}-{(1 << k) - 1}"
+                          for k in range(1, len(self.buckets))]
+        return {"count": self.count, "mean": round(self.mean, 2), "max": self.max,
+                "buckets": {label: n for label, n in zip(labels, self.buckets) if n}}
+
+class ComponentTimers:
+    """
+    Optional wall-clock timers. instrument() wraps component methods on one
+    instance, so the timers cost nothing unless they are switched on.
+    """
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+
+    def add(self, name: str, seconds: float):
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def instrument(self, component, name: str, methods: Iterable[str]):
+        for method in methods:
+            fn = getattr(component, method)
+            def timed(*args, _fn=fn, **kwargs):
+                t = time.perf_counter()
+                try:
+                    return _fn(*args, **kwargs)
+                finally:
+                    self.add(name, time.perf_counter() - t)
+            setattr(component, method, timed)
+
+    def to_dict(self) -> Dict:
+        return {name: {"seconds": round(self.seconds[name], 6), "calls": self.calls[name]}
+                for name in sorted(self.seconds, key=self.seconds.get, reverse=True)}
+
+class NodeCounters:
+    """
+    Event counters of one SAT node run, shared by the Python model and the
+    parsed RTL trace (see verify_all.py) so both report the same fields.
+
+    Every field counts something the hardware does, so the values are the
+    same whichever SatNode execution mode produced them.
+    """
+    FIELDS = ("decisions", "implications", "conflicts", "bcp_conflicts", "backtrack_pops", "flips",
+              "learned_clauses", "evictions", "backjump_levels", "peak_queue_depth", "peak_stack_depth")
+
+    def __init__(self, states: Iterable[str], timers: bool = False):
+        self.state_cycles = dict.fromkeys(states, 0)
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+        self.rows_per_literal = Histogram() # Row visits of every finished sweep
+        self.timers = ComponentTimers() if timers else None
+        self.queue = None # PropagationQueue whose stats() to_dict() includes, if any
+
+    @property
+    def cycles(self) -> int:
+        return sum(self.state_cycles.values())
+
+    def reset(self):
+        """Zeroes every counter and the queue statistics for a new run; timers keep accumulating."""
+        self.state_cycles = dict.fromkeys(self.state_cycles, 0)
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+        self.rows_per_literal = Histogram()
+        if self.queue is not None:
+            self.queue.reset_stats()
+
+    def snapshot(self) -> Dict:
+        """Counter values (not the timers), for a SatNode checkpoint."""
+        hist = self.rows_per_literal
+        return {"state_cycles": dict(self.state_cycles), **{field: getattr(self, field) for field in self.FIELDS},
+                "rows_per_literal": [hist.buckets, hist.count, hist.total, hist.max]}
+
+    def restore(self, state: Dict):
+        """Inverse of snapshot(). Timers keep accumulating host time."""
+        self.state_cycles = dict(state["state_cycles"])
+        for field in self.FIELDS:
+            setattr(self, field, state[field])
+        hist = self.rows_per_literal = Histogram()
+        hist.buckets, hist.count, hist.total, hist.max = state["rows_per_literal"]
+        hist.buckets = list(hist.buckets)
+
+    def track_depths(self, queue_depth: int, stack_depth: int):
+        if queue_depth > self.peak_queue_depth:
+            self.peak_queue_depth = queue_depth
+        if stack_depth > self.peak_stack_depth:
+            self.peak_stack_depth = stack_depth
+
+    def to_dict(self, **extra) -> Dict:
+        result = {"cycles": self.cycles, "state_cycles": dict(self.state_cycles)}
+        result.update({field: getattr(self, field) for field in self.FIELDS})
+        result["rows_per_literal"] = self.rows_per_literal.to_dict()
+        if self.queue is not None:
+            result["queue"] = self.queue.stats()
+        result.update(extra)
+        if self.timers is not None:
+            result["timers"] = self.timers.to_dict()
+        return result
+
+    def to_json(self, path: Optional[str] = None, **extra) -> str:
+        """Serializes to_dict(**extra); also writes it to `path` if given."""
+        text = json.dumps(self.to_dict(**extra), indent=2)
+        if path:
+            with open(path, "w") as f:
+                f.write(text + "\n")
+        return text
@@ -0,0 +1,315 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+# Compact cycle trace of a SatNode run (see SatNode.record_trace).
+#
+# Every executed cycle is one fixed-width record. Every run of idle PROPAGATE
+# row visits skipped by the event kernel is also a single record, a span, and
+# is expanded on demand. Assignment changes are kept as (cycle, var, value)
+# deltas, never as snapshots. Records and deltas live in preallocated NumPy
+# buffers that double when full. save() writes them to one binary file, which
+# load() memory-maps back. Indexed sweeps of several literals (sweep_width > 1)
+# also keep their literals, since the rows a span visits depend on all of them.
+
+TraceCycle = Tuple[int, str, Dict, List[Tuple[int, Optional[bool]]]]
+
+STATES = ('IDLE', 'DECIDE', 'PROPAGATE', 'BACKTRACK', 'UNDO', 'SAT', 'UNSAT', 'ANALYZE')
+STATE_CODES = {state: code for code, state in enumerate(STATES)}
+
+# Record kinds; each fixes the layout of the step() info dict it encodes
+EVENTS = ('span', 'state', 'decide', 'lookup', 'row', 'conflict', 'bcp_conflict', 'undo', 'learn')
+SPAN, STATE, DECIDE, LOOKUP, ROW, CONFLICT, BCP_CONFLICT, UNDO, LEARN = range(len(EVENTS))
+
+# row:  visited row (span: first visit position in the sweep), learned row (learn), -1 if none
+# literal: propagated literal, UIP literal (learn)
+# var:  decision var, forced var (row) or conflicting var (bcp_conflict),
+#       first batch literal (span of an indexed multi-literal sweep), -1 if none
+# aux:  skip list length (lookup), entries left (undo), 1 if the visit ends the sweep (row), LBD (learn),
+#       number of batch literals (span)
+RECORD = np.dtype([("cycle", "<i8"), ("count", "<i4"), ("prev_state", "u1"), ("state", "u1"),
+                   ("event", "u1"), ("row", "<i4"), ("literal", "<i4"), ("var", "<i4"), ("aux", "<i4")])
+DELTA = np.dtype([("cycle", "<i8"), ("var", "<i4"), ("value", "i1")]) # value -1: unassigned
+
+MAGIC = b"SATTRACE"
+BATCH = np.dtype("<i4") # Literals of indexed multi-literal sweeps, referenced by their spans
+HEADER = np.dtype([("magic", "S8"), ("version", "<i4"), ("indexed", "<i4"), ("num_rows", "<i8"),
+                   ("num_records", "<i8"), ("num_deltas", "<i8"), ("num_batch_literals", "<i8")])
+TRACE_VERSION = 1
+EXPORT_CHUNK = 1 << 16
+
+class _RecordBuffer:
+    """Append-only array of fixed-width records, grown by doubling."""
+    def __init__(self, dtype: np.dtype, capacity: int):
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.size = 0
+
+    def append(self, record: tuple):
+        if self.size == len(self.data):
+            grown = np.zeros(2 * len(self.data), dtype=self.data.dtype)
+            grown[:self.size] = self.data
+            self.data = grown
+        self.data[self.size] = record
+        self.size += 1
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+class CycleTrace:
+    """
+    Columnar, run-length encoded cycle history of a SatNode run.
+
+    `records` and `deltas` are structured arrays (RECORD / DELTA), so
+    trace.records["cycle"] etc. are plain NumPy columns. dense() and at()
+    rebuild exactly what step() returned on every cycle; dense_columns()
+    expands a cycle range into per-cycle columns without Python objects.
+    """
+    def __init__(self, static_memory=None, indexed: bool = False, num_rows: Optional[int] = None,
+                 capacity: int = 1 << 12):
+        self.static_memory = static_memory
+        self.indexed = indexed
+        self.num_rows = num_rows if num_rows is not None else static_memory.num_rows
+        self._records = _RecordBuffer(RECORD, capacity)
+        self._deltas = _RecordBuffer(DELTA, capacity)
+        self._batch_literals = _RecordBuffer(BATCH, 64)
+        self._loaded = None # (records, deltas, batch literals) memory-mapped by load()
+        self._skip_lists = {}
+
+    @property
+    def records(self) -> np.ndarray:
+        return self._loaded[0] if self._loaded else self._records.view()
+
+    @property
+    def deltas(self) -> np.ndarray:
+        return self._loaded[1] if self._loaded else self._deltas.view()
+
+    @property
+    def batch_literals(self) -> np.ndarray:
+        return self._loaded[2] if self._loaded else self._batch_literals.view()
+
+    # --- Recording ---
+
+    def add_event(self, cycle: int, prev_state: str, info: Dict, delta: List[Tuple[int, Optional[bool]]],
+                  literal: Optional[int] = None):
+        """Records one executed cycle from its step() info; `literal` is the one being propagated."""
+        row, var, aux, lit = -1, -1, 0, -1
+        if "decision_var" in info:
+            event = DECIDE
+            var = -1 if info["decision_var"] is None else info["decision_var"]
+        elif "skip_rows" in info:
+            event, lit, aux = LOOKUP, info["lit"], info["skip_rows"]
+        elif "row" in info:
+            event, row = ROW, info["row"]
+            lit = literal if info["lit"] is None else info["lit"]
+            aux = int(info["lit"] is None)
+            if delta:
+                var = delta[0][0] # Forced by this row's unit check
+        elif "conflict_row" in info:
+            event, row, lit = CONFLICT, info["conflict_row"], literal
+        elif "bcp_conflict_var" in info:
+            event, var, lit = BCP_CONFLICT, info["bcp_conflict_var"], literal
+        elif "undo_remaining" in info:
+            event, aux = UNDO, info["undo_remaining"]
+        elif "learned_row" in info:
+            event, row, lit, aux = LEARN, info["learned_row"], info["uip"], info["lbd"]
+        else:
+            event = STATE
+        self._records.append((cycle, 1, STATE_CODES[prev_state], STATE_CODES[info["state"]], event,
+                              row, -1 if lit is None else lit, var, aux))
+        for v, val in delta:
+            self._deltas.append((cycle, v, -1 if val is None else int(val)))
+
+    def add_span(self, first_cycle: int, count: int, literal: int, first_visit: int,
+                 batch: Optional[List[int]] = None):
+        """
+        Records `count` idle row visits of `literal`'s sweep, from position
+        first_visit. `batch` lists all literals of a multi-literal sweep.
+        """
+        prop = STATE_CODES['PROPAGATE']
+        first, size = -1, 0
+        if self.indexed and batch is not None and len(batch) > 1:
+            first, size = self._batch_literals.size, len(batch)
+            for lit in batch:
+                self._batch_literals.append(lit)
+        self._records.append((first_cycle, count, prop, prop, SPAN, first_visit, literal, first, size))
+
+    # --- Reading ---
+
+    def __len__(self) -> int:
+        """Number of cycles covered."""
+        records = self.records
+        if not len(records):
+            return 0
+        return int(records["cycle"][-1] + records["count"][-1] - records["cycle"][0])
+
+    @property
+    def num_events(self) -> int:
+        """Executed (non-span) cycles."""
+        return int(np.count_nonzero(self.records["event"] != SPAN))
+
+    def _sweep(self, literal: int, first: int = -1, size: int = 0):
+        """
+        (sweep length, visit -> row map or None) of a literal's sweep, or of a
+        multi-literal sweep whose literals are batch_literals[first:first+size].
+        """
+        if not self.indexed:
+            return self.num_rows, None
+        literals = (literal,) if size == 0 else tuple(self.batch_literals[first:first + size].tolist())
+        rows = self._skip_lists.get(literals)
+        if rows is None:
+            if self.static_memory is None:
+                raise ValueError("Expanding an indexed trace needs the StaticMemory it was recorded on")
+            rows = self._skip_lists[literals] = self.static_memory.batch_skip_list(list(literals))
+        return len(rows), rows
+
+    def _info(self, record, offset: int) -> Tuple[int, str, Dict]:
+        event = int(record["event"])
+        cycle = int(record["cycle"]) + offset
+        prev_state, state = STATES[record["prev_state"]], STATES[record["state"]]
+        row, lit, var, aux = int(record["row"]), int(record["literal"]), int(record["var"]), int(record["aux"])
+        if event == SPAN:
+            length, rows = self._sweep(lit, var, aux)
+            visit = row + offset
+            row = visit if rows is None else int(rows[visit])
+            info = {"state": state, "row": row, "lit": lit if visit + 1 < length else None}
+        elif event == DECIDE:
+            info = {"state": state, "decision_var": var if var >= 0 else None}
+        elif event == LOOKUP:
+            info = {"state": state, "lit": lit, "skip_rows": aux}
+        elif event == ROW:
+            info = {"state": state, "row": row, "lit": None if aux else lit}
+        elif event == CONFLICT:
+            info = {"state": state, "conflict_row": row}
+        elif event == BCP_CONFLICT:
+            info = {"state": state, "bcp_conflict_var": var}
+        elif event == UNDO:
+            info = {"state": state, "undo_remaining": aux}
+        elif event == LEARN:
+            info = {"state": state, "learned_row": row, "uip": lit, "lbd": aux}
+        else:
+            info = {"state": state}
+        return cycle, prev_state, info
+
+    def dense(self) -> Iterator[TraceCycle]:
+        """Yields (cycle, state before, step() info, assignment delta) for every cycle, in order."""
+        deltas = self.deltas
+        d = 0
+        for record in self.records:
+            for offset in range(int(record["count"])):
+                cycle, prev_state, info = self._info(record, offset)
+                delta = []
+                while d < len(deltas) and deltas[d]["cycle"] == cycle:
+                    value = int(deltas[d]["value"])
+                    delta.append((int(deltas[d]["var"]), None if value < 0 else bool(value)))
+                    d += 1
+                yield cycle, prev_state, info, delta
+
+    def at(self, cycle: int) -> TraceCycle:
+        """Random access to one cycle without expanding the rest."""
+        records = self.records
+        starts = records["cycle"]
+        i = int(np.searchsorted(starts, cycle, side="right")) - 1
+        if i < 0 or cycle >= starts[0] + len(self):
+            raise IndexError(f"cycle {cycle} not in trace")
+        cycle, prev_state, info = self._info(records[i], cycle - int(starts[i]))
+        deltas = self.deltas
+        lo, hi = np.searchsorted(deltas["cycle"], [cycle, cycle + 1])
+        delta = [(int(v), None if val < 0 else bool(val)) for v, val in zip(deltas["var"][lo:hi], deltas["value"][lo:hi])]
+        return cycle, prev_state, info, delta
+
+    def dense_columns(self, start: Optional[int] = None, stop: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Per-cycle columns (cycle, prev_state, state, event, row, literal, var)
+        for cycles [start, stop). Spans expand to 'row' events; literal is
+        the literal being propagated, also on the visit that ends its sweep.
+        """
+        records = self.records
+        if not len(records):
+            return {name: np.zeros(0, dtype=np.int64) for name in RECORD.names if name not in ("count", "aux")}
+        first = int(records["cycle"][0])
+        start = first if start is None else max(start, first)
+        stop = first + len(self) if stop is None else min(stop, first + len(self))
+        lo = max(int(np.searchsorted(records["cycle"], start, side="right")) - 1, 0)
+        hi = int(np.searchsorted(records["cycle"], stop, side="left"))
+        chunk = records[lo:hi]
+
+        counts = chunk["count"].astype(np.int64)
+        offset = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        columns = {name: np.repeat(chunk[name], counts) for name in ("prev_state", "state", "event", "row", "literal", "var")}
+        columns["cycle"] = np.repeat(chunk["cycle"], counts) + offset
+
+        in_span = columns["event"] == SPAN
+        columns["row"][in_span] += offset[in_span] # Visit positions
+        if self.indexed:
+            first = np.cumsum(counts) - counts
+            for i in np.flatnonzero(chunk["event"] == SPAN).tolist():
+                _, rows = self._sweep(int(chunk["literal"][i]), int(chunk["var"][i]), int(chunk["aux"][i]))
+                visits = columns["row"][first[i]:first[i] + counts[i]]
+                visits[:] = rows[visits]
+        columns["event"][in_span] = ROW
+        columns["var"][in_span] = -1
+
+        keep = (columns["cycle"] >= start) & (columns["cycle"] < stop)
+        return {name: column[keep] for name, column in columns.items()}
+
+    # --- Export ---
+
+    def export_csv(self, path: str, dense: bool = True):
+        """
+        Streams the trace to CSV: one line per cycle (dense) or per record.
+        Assignment deltas can be written with export_deltas_csv().
+        """
+        with open(path, "w") as f:
+            if not dense:
+                f.write(",".join(RECORD.names) + "\n")
+                for lo in range(0, len(self.records), EXPORT_CHUNK):
+                    chunk = self.records[lo:lo + EXPORT_CHUNK]
+                    f.writelines(f"{c},{n},{STATES[p]},{STATES[s]},{EVENTS[e]},{r},{l},{v},{a}\n"
+                                 for c, n, p, s, e, r, l, v, a in chunk.tolist())
+                return
+            f.write("cycle,prev_state,state,event,row,literal,var\n")
+            if not len(self):
+                return
+            first = int(self.records["cycle"][0])
+            for lo in range(first, first + len(self), EXPORT_CHUNK):
+                cols = self.dense_columns(lo, lo + EXPORT_CHUNK)
+                f.writelines(f"{c},{STATES[p]},{STATES[s]},{EVENTS[e]},{r},{l},{v}\n" for c, p, s, e, r, l, v in zip(
+                    cols["cycle"].tolist(), cols["prev_state"].tolist(), cols["state"].tolist(),
+                    cols["event"].tolist(), cols["row"].tolist(), cols["literal"].tolist(), cols["var"].tolist()))
+
+    def export_deltas_csv(self, path: str):
+        with open(path, "w") as f:
+            f.write("cycle,var,value\n")
+            for lo in range(0, len(self.deltas), EXPORT_CHUNK):
+                f.writelines(f"{c},{v},{val}\n" for c, v, val in self.deltas[lo:lo + EXPORT_CHUNK].tolist())
+
+    def save(self, path: str):
+        """Writes header, records and deltas to one binary file (see load)."""
+        header = np.zeros(1, dtype=HEADER)
+        header[0] = (MAGIC, TRACE_VERSION, int(self.indexed), self.num_rows, len(self.records), len(self.deltas),
+                     len(self.batch_literals))
+        with open(path, "wb") as f:
+            f.write(header.tobytes())
+            for array in (self.records, self.deltas, self.batch_literals):
+                for lo in range(0, len(array), EXPORT_CHUNK):
+                    f.write(array[lo:lo + EXPORT_CHUNK].tobytes())
+
+    @classmethod
+    def load(cls, path: str, static_memory=None) -> "CycleTrace":
+        """Memory-maps a saved trace. Indexed traces need their StaticMemory to expand spans."""
+        header = np.fromfile(path, dtype=HEADER, count=1)
+        if not len(header) or header[0]["magic"] != MAGIC:
+            raise ValueError(f"{path} is not a SatNode trace")
+        if header[0]["version"] != TRACE_VERSION:
+            raise ValueError(f"{path} has trace version {header[0]['version']}, expected {TRACE_VERSION}")
+        num_records, num_deltas = int(header[0]["num_records"]), int(header[0]["num_deltas"])
+        num_batch_literals = int(header[0]["num_batch_literals"])
+        trace = cls(static_memory, indexed=bool(header[0]["indexed"]), num_rows=int(header[0]["num_rows"]),
+                    capacity=1)
+        offset = HEADER.itemsize
+        arrays = []
+        for dtype, count in ((RECORD, num_records), (DELTA, num_deltas), (BATCH, num_batch_literals)):
+            arrays.append(np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+                          if count else np.zeros(0, dtype=dtype))
+            offset += count * dtype.itemsize
+        trace._loaded = tuple(arrays)
+        return trace
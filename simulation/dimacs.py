@@ -0,0 +1,227 @@
+import bz2
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import re
+import warnings
+import zipfile
+from typing import List, Optional, Tuple
+import numpy as np
+
+# Loader for DIMACS CNF files, shared by the simulation scripts.
+#
+# The file is read once, in chunks, and each chunk is tokenized in bulk by
+# NumPy. Clauses are never materialized as Python lists: the flat token stream
+# is scattered straight into the 2*var / 2*var+1 literal matrix StaticMemory
+# expects. gzip, xz and bzip2 inputs are detected from their magic bytes.
+#
+# Parsed matrices are cached as uncompressed .npz files, keyed by the input's
+# path and validated by its mtime/size or, failing that, its content hash.
+# A cache hit memory-maps the matrix instead of reading it.
+
+CHUNK_SIZE = 1 << 24
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+                                 "fpgangster", "cnf")
+
+# Comment and header lines may be indented, as the line-by-line parsers allowed
+_HEADER = re.compile(rb"^[ \t]*p\s+cnf\s+(\d+)\s+(\d+)", re.MULTILINE)
+_SKIPPED_LINES = re.compile(rb"^[ \t]*[cp].*$", re.MULTILINE)
+_CLAUSE_BYTES = b"0123456789- \t\r\n"
+
+def _open(path: str):
+    with open(path, "rb") as f:
+        magic = f.read(6)
+    if magic.startswith(b"\x1f\x8b"):
+        return gzip.open(path, "rb")
+    if magic.startswith(b"\xfd7zXZ\x00"):
+        return lzma.open(path, "rb")
+    if magic.startswith(b"BZh"):
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+def _tokenize(body: bytes) -> np.ndarray:
+    with warnings.catch_warnings():
+        # NumPy only warns when it stops at a token that is not an integer
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            return np.fromstring(body.decode("ascii"), dtype=np.int64, sep=" ")
+        except (DeprecationWarning, UnicodeDecodeError) as e:
+            raise ValueError(f"Malformed DIMACS clause data: {e}") from None
+
+def _read_tokens(path: str) -> Tuple[int, np.ndarray]:
+    """Returns (declared num_vars, flat int array of literals and 0 terminators)."""
+    num_vars = 0
+    parts = []
+    tail = b""
+    with _open(path) as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            data = tail + chunk
+            if chunk:
+                # Only tokenize complete lines; the rest waits for the next chunk
+                cut = data.rfind(b"\n") + 1
+                data, tail = data[:cut], data[cut:]
+            if data.translate(None, _CLAUSE_BYTES):
+                # Comment, header or end marker somewhere in this chunk
+                if not num_vars:
+                    header = _HEADER.search(data)
+                    if header:
+                        num_vars = int(header.group(1))
+                end = re.search(rb"^[ \t]*%", data, re.MULTILINE) # SATLIB end marker
+                if end:
+                    data, chunk = data[:end.start()], b""
+                data = _SKIPPED_LINES.sub(b"", data)
+            parts.append(_tokenize(data))
+            if not chunk:
+                break
+    return num_vars, np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+def encode_literals(dimacs_literals: np.ndarray) -> np.ndarray:
+    """DIMACS literals (x / -x) to hardware literals (2x / 2x+1)."""
+    return 2 * np.abs(dimacs_literals) + (dimacs_literals < 0)
+
+def tokens_to_matrix(tokens: np.ndarray) -> np.ndarray:
+    """Scatters a 0-terminated literal stream into a padded literal matrix."""
+    if len(tokens) and tokens[-1] != 0:
+        tokens = np.append(tokens, 0) # Last clause without terminator
+    is_end = (tokens == 0)
+    # Clause index of every token, counting only non-empty clauses
+    ends = np.flatnonzero(is_end)
+    lengths = np.diff(np.concatenate(([-1], ends))) - 1
+    keep = lengths > 0
+    literal_mask = ~is_end
+    clause_of = np.cumsum(is_end) - is_end
+    clause_id = (np.cumsum(keep) - 1)[clause_of[literal_mask]]
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    position = np.flatnonzero(literal_mask) - starts[clause_of[literal_mask]]
+
+    width = int(lengths.max()) if keep.any() else 0
+    dtype = np.int32 if len(tokens) == 0 or np.abs(tokens).max() < (1 << 29) else np.int64
+    matrix = np.zeros((int(keep.sum()), width), dtype=dtype)
+    matrix[clause_id, position] = encode_literals(tokens[literal_mask])
+    return matrix
+
+def clauses_to_matrix(clauses: List[List[int]]) -> np.ndarray:
+    """List-of-clauses form to literal matrix (clauses must be non-empty)."""
+    if not clauses:
+        return np.zeros((0, 0), dtype=np.int32)
+    flat = np.fromiter((lit for clause in clauses for lit in clause + [0]), dtype=np.int64)
+    return tokens_to_matrix(flat)
+
+def matrix_to_clauses(matrix: np.ndarray) -> List[List[int]]:
+    """Literal matrix back to DIMACS clause lists, dropping padding."""
+    signed = np.where(matrix % 2 == 1, -(matrix // 2), matrix // 2).tolist()
+    return [[lit for lit in row if lit != 0] for row in signed]
+
+def write_dimacs(path: str, num_vars: int, matrix: np.ndarray):
+    """Writes a literal matrix as a plain DIMACS CNF file."""
+    signed = np.where(matrix % 2 == 1, -(matrix // 2), matrix // 2)
+    with open(path, "w") as f:
+        f.write(f"p cnf {num_vars} {len(matrix)}\n")
+        for row in signed.tolist():
+            f.write(" ".join(str(lit) for lit in row if lit != 0) + " 0\n")
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _mmap_npz_member(path: str, name: str) -> np.ndarray:
+    """Memory-maps one array stored uncompressed inside an .npz file."""
+    with zipfile.ZipFile(path) as z:
+        info = z.getinfo(name + ".npy")
+        if info.compress_type != zipfile.ZIP_STORED:
+            return np.load(path)[name]
+    with open(path, "rb") as f:
+        f.seek(info.header_offset)
+        local_header = f.read(30)
+        name_len = int.from_bytes(local_header[26:28], "little")
+        extra_len = int.from_bytes(local_header[28:30], "little")
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if 0 in shape:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape,
+                     order="F" if fortran_order else "C")
+
+def _cache_path(path: str, cache_dir: str) -> str:
+    key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+    return os.path.join(cache_dir, key + ".npz")
+
+def _load_cached(path: str, cache_file: str) -> Optional[Tuple[int, np.ndarray]]:
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        with np.load(cache_file) as cached:
+            meta = json.loads(str(cached["meta"]))
+    except (OSError, ValueError, KeyError):
+        return None
+    if meta.get("version") != CACHE_VERSION:
+        return None
+    st = os.stat(path)
+    if (meta["mtime_ns"], meta["size"]) != (st.st_mtime_ns, st.st_size):
+        # Touched or copied: still valid if the content is unchanged
+        if meta["sha256"] != _file_digest(path):
+            return None
+        _write_cache(cache_file, meta["num_vars"], _mmap_npz_member(cache_file, "matrix").copy(),
+                     st, meta["sha256"])
+    return meta["num_vars"], _mmap_npz_member(cache_file, "matrix")
+
+def _write_cache(cache_file: str, num_vars: int, matrix: np.ndarray, st, digest: str):
+    meta = {"version": CACHE_VERSION, "num_vars": num_vars, "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size, "sha256": digest}
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    tmp = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, matrix=matrix, meta=np.array(json.dumps(meta)))
+    os.replace(tmp, cache_file) # Atomic, so parallel workers never see half a file
+
+def load_dimacs(path: str, cache: bool = True, cache_dir: Optional[str] = None) -> Tuple[int, np.ndarray]:
+    """
+    Loads a (possibly compressed) DIMACS CNF file.
+    Returns (num_vars, literal_matrix) with one clause per row, literals
+    encoded as 2*var / 2*var+1 and 0 padding. With cache=True the matrix is
+    memory-mapped (read-only) from the .npz cache when it is up to date.
+    """
+    cache_file = _cache_path(path, cache_dir or DEFAULT_CACHE_DIR) if cache else None
+    if cache_file:
+        hit = _load_cached(path, cache_file)
+        if hit is not None:
+            return hit
+
+    num_vars, tokens = _read_tokens(path)
+    matrix = tokens_to_matrix(tokens)
+    if len(tokens):
+        num_vars = max(num_vars, int(np.abs(tokens).max()))
+
+    if cache_file:
+        try:
+            _write_cache(cache_file, num_vars, matrix, os.stat(path), _file_digest(path))
+        except OSError:
+            pass # A read-only cache location only costs speed
+    return num_vars, matrix
+
+def parse_dimacs(path: str, cache: bool = True) -> Tuple[int, List[List[int]]]:
+    """Loads a DIMACS file as (num_vars, list of clauses in DIMACS form)."""
+    num_vars, matrix = load_dimacs(path, cache=cache)
+    return num_vars, matrix_to_clauses(matrix)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Load DIMACS files and print their size.")
+    parser.add_argument("cnf", nargs="+")
+    args = parser.parse_args()
+
+    for path in args.cnf:
+        num_vars, matrix = load_dimacs(path)
+        print(f"{os.path.basename(path):<28} {num_vars:>8} vars {matrix.shape[0]:>9} clauses {matrix.shape[1]:>4} wide")
@@ -0,0 +1,329 @@
+import sys
+import multiprocessing as mp
+from typing import Dict, List, Optional, Tuple
+from sat_node import SatNode
+
+# Message kinds exchanged between tiles
+STEAL_REQUEST = 'STEAL_REQUEST' # payload: thief node id
+GRANT = 'GRANT'                 # payload: assignment prefix of the donated subtree
+DENY = 'DENY'                   # payload: None
+
+class Mesh:
+    """
+    Topology: 2D mesh of rows x cols tiles with 4-neighbor links.
+    Node ids are row-major. Messages are routed along the Manhattan distance.
+    """
+    def __init__(self, rows: int, cols: int):
+        self.rows = rows
+        self.cols = cols
+        self.num_nodes = rows * cols
+
+    def neighbors(self, node_id: int) -> List[int]:
+        r, c = divmod(node_id, self.cols)
+        result = []
+        for dr, dc in ((-1, 0), (0, 1), (1, 0), (0, -1)):
+            if 0 <= r + dr < self.rows and 0 <= c + dc < self.cols:
+                result.append((r + dr) * self.cols + (c + dc))
+        return result
+
+    def hops(self, a: int, b: int) -> int:
+        (ra, ca), (rb, cb) = divmod(a, self.cols), divmod(b, self.cols)
+        return abs(ra - rb) + abs(ca - cb)
+
+class FabricNode:
+    """
+    One tile: a SatNode plus the controller that answers steal requests and
+    asks its neighbors for work while idle.
+
+    status is 'busy' (solving a subtree), 'idle' (about to ask a neighbor),
+    'waiting' (steal request in flight) or 'sat'. Messages are handled on the
+    exact cycle they arrive: the SatNode is stopped there through max_cycles.
+    """
+    def __init__(self, node_id: int, literal_matrix, num_vars: int, neighbors: List[int],
+                 retry_cycles: int, node_options: Dict):
+        self.node_id = node_id
+        self.node = SatNode(literal_matrix, num_vars, mode='fast', **node_options)
+        self.neighbors = neighbors
+        self.retry_cycles = retry_cycles
+        self.status = 'idle'
+        self.time = 0
+        self.busy_cycles = 0
+        self.last_busy = 0    # Time the last subtree was exhausted
+        self.sat_time = None
+        self.next_request = 0 # Earliest time of the next steal request
+        self.victim = 0       # Round-robin index into neighbors
+        self.inbox = []       # (arrival, seq, kind, payload)
+        self.steals = 0
+
+    def start(self):
+        """Makes this tile the root: it owns the whole search tree."""
+        self.status = 'busy'
+
+    def advance(self, until: int) -> List[Tuple]:
+        """Runs this tile up to cycle `until`. Returns (dst, send_time, kind, payload) messages."""
+        out = []
+        self.inbox.sort()
+        while self.time < until and self.status != 'sat':
+            while self.inbox and self.inbox[0][0] <= self.time:
+                _, _, kind, payload = self.inbox.pop(0)
+                self._handle(kind, payload, out)
+
+            next_arrival = self.inbox[0][0] if self.inbox else until
+            if self.status == 'busy':
+                self._run(min(until, max(next_arrival, self.time + 1)))
+            elif self.status == 'idle' and self.neighbors and self.time >= self.next_request:
+                out.append((self.neighbors[self.victim], self.time, STEAL_REQUEST, self.node_id))
+                self.status = 'waiting'
+            else:
+                wake = self.next_request if self.status == 'idle' and self.neighbors else until
+                self.time = max(self.time + 1, min(until, next_arrival, wake))
+        return out
+
+    def _run(self, stop: int):
+        node = self.node
+        start = node.cycle_count
+        node.max_cycles = start + (stop - self.time)
+        while node.state not in ('SAT', 'UNSAT') and node.cycle_count < node.max_cycles:
+            node.step_fast()
+        elapsed = node.cycle_count - start
+        self.time += elapsed
+        self.busy_cycles += elapsed
+        if node.state == 'SAT':
+            self.status = 'sat'
+            self.sat_time = self.time
+        elif node.state == 'UNSAT':
+            # Subtree exhausted: become a thief
+            self.status = 'idle'
+            self.last_busy = self.time
+            self.next_request = self.time
+
+    def _handle(self, kind: str, payload, out: List[Tuple]):
+        if kind == STEAL_REQUEST:
+            prefix = self.node.donate_subtree() if self.status == 'busy' else None
+            if prefix is None:
+                out.append((payload, self.time, DENY, None))
+            else:
+                self.steals += 1
+                out.append((payload, self.time, GRANT, prefix))
+        elif kind == GRANT and self.status == 'waiting':
+            self.node.load_subtree(payload)
+            self.status = 'busy'
+        elif kind == DENY and self.status == 'waiting':
+            self.status = 'idle'
+            self.victim = (self.victim + 1) % len(self.neighbors)
+            if self.victim == 0:
+                # Every neighbor said no: back off before asking again
+                self.next_request = self.time + self.retry_cycles
+
+    def report(self) -> Dict:
+        return {
+            "status": self.status,
+            "time": self.time,
+            "busy_cycles": self.busy_cycles,
+            "last_busy": self.last_busy,
+            "sat_time": self.sat_time,
+            "steals": self.steals,
+            "assignment": dict(self.node.assignment_table) if self.status == 'sat' else None,
+        }
+
+class _TileSet:
+    """A partition of the fabric's tiles, advanced together between sync points."""
+    def __init__(self, literal_matrix, num_vars: int, specs: List[Tuple], retry_cycles: int,
+                 node_options: Dict):
+        self.tiles = {}
+        for node_id, neighbors, is_root in specs:
+            self.tiles[node_id] = FabricNode(node_id, literal_matrix, num_vars, neighbors,
+                                             retry_cycles, node_options)
+            if is_root:
+                self.tiles[node_id].start()
+
+    def advance(self, until: int, inbox: Dict[int, List[Tuple]]):
+        out = []
+        for node_id, messages in inbox.items():
+            self.tiles[node_id].inbox.extend(messages)
+        for node_id, tile in self.tiles.items():
+            out.extend((node_id,) + m for m in tile.advance(until))
+        return out, {node_id: tile.report() for node_id, tile in self.tiles.items()}
+
+def _worker_loop(conn, *tile_set_args):
+    """Process-pool worker: owns one _TileSet for the whole run."""
+    tile_set = _TileSet(*tile_set_args)
+    while True:
+        command = conn.recv()
+        if command is None:
+            break
+        conn.send(tile_set.advance(*command))
+    conn.close()
+
+class Fabric:
+    """
+    Top-Level Model: Tiled Fabric
+
+    Runs one SatNode per tile of a Mesh. Tile 0 starts with the whole problem;
+    every other tile starts idle and asks its neighbors, round robin, for work.
+    A busy tile answers a steal request by donating the untried branch of its
+    lowest open decision (SatNode.donate_subtree), which the thief explores
+    with that prefix pinned (SatNode.load_subtree).
+
+    Latency model: a message sent at cycle t arrives at
+        t + hop_latency * hops + cycles_per_word * len(prefix)
+    Tiles run independently between synchronization points every
+    sync_interval cycles, where messages are exchanged. A message never
+    arrives before the next synchronization point, so the model is exact when
+    sync_interval <= hop_latency and larger intervals trade accuracy for speed.
+    Because tiles only interact at synchronization points, running them in a
+    process pool gives exactly the same result as running them in-process.
+
+    The answer is SAT as soon as one tile finds a model, and UNSAT once no tile
+    is busy and no donated subtree is in flight.
+    """
+    def __init__(self, literal_matrix, num_vars: int, mesh_rows: int, mesh_cols: int,
+                 hop_latency: int = 8, cycles_per_word: int = 1, sync_interval: int = 64,
+                 retry_cycles: int = 32, node_options: Optional[Dict] = None):
+        self.literal_matrix = literal_matrix
+        self.num_vars = num_vars
+        self.mesh = Mesh(mesh_rows, mesh_cols)
+        self.hop_latency = hop_latency
+        self.cycles_per_word = cycles_per_word
+        self.sync_interval = sync_interval
+        self.retry_cycles = retry_cycles
+        self.node_options = node_options or {}
+
+    def latency(self, src: int, dst: int, payload) -> int:
+        words = len(payload) if isinstance(payload, list) else 1
+        return self.hop_latency * self.mesh.hops(src, dst) + self.cycles_per_word * words
+
+    def run(self, max_cycles: int = 10**7, workers: int = 1) -> Dict:
+        """
+        Simulates the fabric until it answers or reaches max_cycles.
+        workers > 1 spreads the tiles over that many processes.
+        """
+        specs = [(i, self.mesh.neighbors(i), i == 0) for i in range(self.mesh.num_nodes)]
+        workers = max(1, min(workers, len(specs)))
+        partitions = [specs[w::workers] for w in range(workers)]
+        owner = {node_id: w for w, part in enumerate(partitions) for node_id, _, _ in part}
+
+        if workers == 1:
+            backend = _InProcessBackend(self, specs)
+        else:
+            backend = _PoolBackend(self, partitions)
+
+        in_flight = [] # (arrival, seq, dst, kind, payload)
+        seq = 0
+        now = 0
+        messages = 0
+        reports = {}
+        try:
+            while now < max_cycles:
+                until = min(now + self.sync_interval, max_cycles)
+                inboxes = [{} for _ in partitions]
+                pending = []
+                for message in in_flight:
+                    arrival, s, dst, kind, payload = message
+                    if arrival < until:
+                        inboxes[owner[dst]].setdefault(dst, []).append((max(arrival, now), s, kind, payload))
+                    else:
+                        pending.append(message)
+                in_flight = pending
+
+                out, reports = backend.advance(until, inboxes)
+                now = until
+                # Keep message order independent of how tiles are partitioned
+                out.sort(key=lambda m: (m[2], m[0]))
+                for src, dst, send_time, kind, payload in out:
+                    seq += 1
+                    in_flight.append((send_time + self.latency(src, dst, payload), seq, dst, kind, payload))
+                messages += len(out)
+
+                sat = [(r["sat_time"], i) for i, r in reports.items() if r["status"] == 'sat']
+                if sat:
+                    sat_time, winner = min(sat)
+                    return self._summary('SAT', sat_time, reports, messages, winner)
+                busy = any(r["status"] == 'busy' for r in reports.values())
+                if not busy and not any(m[3] == GRANT for m in in_flight):
+                    unsat_time = max(r["last_busy"] for r in reports.values())
+                    return self._summary('UNSAT', unsat_time, reports, messages)
+            return self._summary('TIMEOUT', now, reports, messages)
+        finally:
+            backend.close()
+
+    def _summary(self, result: str, cycles: int, reports: Dict, messages: int,
+                 winner: Optional[int] = None) -> Dict:
+        total = max(cycles, 1)
+        return {
+            "result": result,
+            "cycles": cycles,
+            "winner": winner,
+            "assignment": reports[winner]["assignment"] if winner is not None else {},
+            "utilization": [min(reports[i]["busy_cycles"], total) / total for i in sorted(reports)],
+            "steals": sum(r["steals"] for r in reports.values()),
+            "messages": messages,
+        }
+
+class _InProcessBackend:
+    def __init__(self, fabric: Fabric, specs: List[Tuple]):
+        self.tile_set = _TileSet(fabric.literal_matrix, fabric.num_vars, specs,
+                                 fabric.retry_cycles, fabric.node_options)
+
+    def advance(self, until: int, inboxes: List[Dict]):
+        return self.tile_set.advance(until, inboxes[0])
+
+    def close(self):
+        pass
+
+class _PoolBackend:
+    def __init__(self, fabric: Fabric, partitions: List[List[Tuple]]):
+        ctx = mp.get_context()
+        self.conns = []
+        self.procs = []
+        for part in partitions:
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker_loop, daemon=True,
+                               args=(child, fabric.literal_matrix, fabric.num_vars, part,
+                                     fabric.retry_cycles, fabric.node_options))
+            proc.start()
+            self.conns.append(parent)
+            self.procs.append(proc)
+
+    def advance(self, until: int, inboxes: List[Dict]):
+        for conn, inbox in zip(self.conns, inboxes):
+            conn.send((until, inbox))
+        out, reports = [], {}
+        for conn in self.conns:
+            part_out, part_reports = conn.recv()
+            out.extend(part_out)
+            reports.update(part_reports)
+        return out, reports
+
+    def close(self):
+        for conn in self.conns:
+            conn.send(None)
+        for proc in self.procs:
+            proc.join()
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    from dimacs import load_dimacs
+
+    parser = argparse.ArgumentParser(description="Simulate a tiled fabric of SAT nodes on one CNF.")
+    parser.add_argument("cnf")
+    parser.add_argument("--mesh", default="4x4", help="ROWSxCOLS (default 4x4)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="processes to spread tiles over (default: all cores)")
+    parser.add_argument("--hop-latency", type=int, default=8)
+    parser.add_argument("--sync-interval", type=int, default=64)
+    parser.add_argument("--max-cycles", type=int, default=10**7)
+    args = parser.parse_args()
+
+    rows, cols = (int(x) for x in args.mesh.lower().split("x"))
+    num_vars, matrix = load_dimacs(args.cnf)
+    fabric = Fabric(matrix, num_vars, rows, cols,
+                    hop_latency=args.hop_latency, sync_interval=args.sync_interval)
+    summary = fabric.run(max_cycles=args.max_cycles, workers=args.workers)
+
+    print(f"Result: {summary['result']} after {summary['cycles']} cycles "
+          f"(winner: {summary['winner']}, steals: {summary['steals']}, messages: {summary['messages']})")
+    for r in range(rows):
+        print("  " + " ".join(f"{u:5.1%}" for u in summary["utilization"][r * cols:(r + 1) * cols]))
+    sys.exit(0 if summary['result'] != 'TIMEOUT' else 1)
@@ -1,43 +1,61 @@
 import numpy as np
 import pandas as pd
 from sat_node import SatNode
+from cycle_trace import STATES, EVENTS
 
-def generate_ground_truth():
+def generate_ground_truth(cnf=None, max_cycles=None, csv_path=None, binary_path=None, show=200, **node_options):
     print("Generating Cycle-Accurate Ground Truth for SAT Node RTL Verification")
     print("===================================================================")
-    
-    # Simple problem: (x1 or x2) and (not x1 or x3) and (not x2 or not x3)
-    # Literals: x1:2, ~x1:3, x2:4, ~x2:5, x3:6, ~x3:7
-    problem_matrix = np.array([
-        [2, 4, 0, 0],
-        [3, 6, 0, 0],
-        [5, 7, 0, 0]
-    ])
-    
-    num_vars = 3
-    node = SatNode(problem_matrix, num_vars)
-    
+
+    if cnf:
+        from dimacs import load_dimacs
+        num_vars, problem_matrix = load_dimacs(cnf)
+    else:
+        # Simple problem: (x1 or x2) and (not x1 or x3) and (not x2 or not x3)
+        # Literals: x1:2, ~x1:3, x2:4, ~x2:5, x3:6, ~x3:7
+        problem_matrix = np.array([
+            [2, 4, 0, 0],
+            [3, 6, 0, 0],
+            [5, 7, 0, 0]
+        ])
+        num_vars = 3
+
+    node = SatNode(problem_matrix, num_vars, **node_options)
+    if max_cycles:
+        node.max_cycles = max_cycles
+
+    print(f"Solving SAT problem with {num_vars} variables and {len(problem_matrix)} clauses.\n")
+
+    # Event-driven run into a columnar trace; nothing is kept per cycle
+    trace = node.record_trace()
+    if csv_path:
+        trace.export_csv(csv_path)
+        trace.export_deltas_csv(csv_path + ".deltas.csv")
+        print(f"Wrote {len(trace)} cycles to {csv_path} (assignment deltas: {csv_path}.deltas.csv)")
+    if binary_path:
+        trace.save(binary_path)
+        print(f"Wrote {len(trace.records)} trace records to {binary_path}")
+
+    # Only the first `show` cycles are expanded for display
     history = []
-    
-    print(f"Solving simple SAT problem with {num_vars} variables.\n")
-    
-    while node.state not in ['SAT', 'UNSAT'] and node.cycle_count < 100:
-        prev_state = node.state
-        prev_assignments = node.assignment_table.copy()
-        
-        step_data = node.step()
-        
-        curr_state = node.state
-        curr_assignments = node.assignment_table.copy()
-        
+    assignments = {}
+    for cycle, prev_state, step_data, delta in trace.dense():
+        if len(history) >= show:
+            break
+        for var, val in delta:
+            if val is None:
+                del assignments[var]
+            else:
+                assignments[var] = val
+
         # Format assignments for display
-        assign_str = ", ".join([f"x{v}:{'T' if val else 'F'}" for v, val in curr_assignments.items()])
-        
+        assign_str = ", ".join([f"x{v}:{'T' if val else 'F'}" for v, val in assignments.items()])
+
         history.append({
-            "Cycle": node.cycle_count,
+            "Cycle": cycle,
             "State": prev_state,
             "Assignments": assign_str,
-            "Next State": curr_state,
+            "Next State": step_data["state"],
             "Info": str(step_data)
         })
 
@@ -48,9 +66,30 @@ def generate_ground_truth():
     pd.set_option('display.max_colwidth', 50)
 
     print(df.to_string(index=False))
-    
+    if len(trace) > show:
+        print(f"... {len(trace) - show} more cycles")
+
+    # Per-state cycle totals straight from the record columns
+    records = trace.records
+    per_state = np.bincount(records["prev_state"], weights=records["count"], minlength=len(STATES))
+    per_event = np.bincount(records["event"], minlength=len(EVENTS))
+    print(f"\nTrace: {len(trace)} cycles in {len(records)} records "
+          f"({per_event[EVENTS.index('span')]} idle spans), {len(trace.deltas)} assignment deltas")
+    print("Cycles per state: " + ", ".join(f"{s}={int(n)}" for s, n in zip(STATES, per_state) if n))
+
     print(f"\nFinal Result: {node.state}")
     print(f"Final Assignments: {node.assignment_table}")
 
 if __name__ == "__main__":
-    generate_ground_truth()
+    import argparse
+    parser = argparse.ArgumentParser(description="Record the cycle-accurate SatNode trace for RTL comparison.")
+    parser.add_argument("cnf", nargs="?", help="DIMACS file (default: built-in 3-variable example)")
+    parser.add_argument("--max-cycles", type=int, default=None, help="cycle limit (default: SatNode.max_cycles)")
+    parser.add_argument("--csv", help="write the dense per-cycle trace to this CSV file")
+    parser.add_argument("--binary", help="write the compact binary trace (CycleTrace.load) to this file")
+    parser.add_argument("--show", type=int, default=200, help="cycles to print (default 200)")
+    parser.add_argument("--propagation", default="scan", choices=SatNode.PROPAGATIONS)
+    parser.add_argument("--backtrack", default="rebuild", choices=SatNode.BACKTRACKS)
+    args = parser.parse_args()
+    generate_ground_truth(args.cnf, args.max_cycles, args.csv, args.binary, args.show,
+                          propagation=args.propagation, backtrack=args.backtrack)
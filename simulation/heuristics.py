@@ -0,0 +1,212 @@
+import heapq
+import math
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Decision heuristics for SatNode's DECIDE state.
+#
+# Every heuristic orders the variables by a priority key and keeps the
+# unassigned ones on a binary heap with lazy deletion: assigned variables and
+# entries whose key has since changed are left in place and discarded when they
+# reach the top, and a variable is pushed again when backtracking unassigns it.
+# A decision is therefore O(log n) instead of a scan over all variables.
+#
+# decide_cycles is the DECIDE latency of a hardware version of the same
+# ordering, so cycle counts of different heuristics can be compared.
+#
+# polarity picks the value a fresh decision tries first: 'false' (the RTL),
+# 'true', or 'random', a fixed per-variable bit drawn from `seed`. A seed
+# also breaks ordering ties with a random renumbering of the variables
+# instead of the index. Both are fixed at load time, so they cost no cycles.
+
+POLARITIES = ('false', 'true', 'random')
+
+class HeuristicEngine:
+    """
+    Component: Heuristic Engine
+
+    Predicts which variable assignment to make next. This base engine picks
+    the lowest-index unassigned variable: in hardware, a priority encoder over
+    the assigned bitmap that resolves within the DECIDE cycle.
+
+    With phase_saving, a decision reuses the value the variable held when it
+    was last unassigned instead of always trying the polarity first. The
+    phase bits are written on backtrack pops and read alongside the
+    decision, so they cost no cycles.
+    """
+    name = 'first'
+
+    def __init__(self, num_vars: int, phase_saving: bool = False, polarity: str = 'false',
+                 seed: Optional[int] = None):
+        if polarity not in POLARITIES:
+            raise ValueError(f"Unknown polarity '{polarity}', expected one of {POLARITIES}")
+        self.num_vars = num_vars
+        self.forced_next = None
+        self.phase_saving = phase_saving
+        rng = np.random.default_rng(0 if seed is None else seed)
+        if polarity == 'random':
+            self.polarity = rng.integers(0, 2, num_vars + 1).astype(bool)
+        else:
+            self.polarity = np.full(num_vars + 1, polarity == 'true')
+        self.saved_phase = self.polarity.copy()
+        # Tie-break rank of each variable: its index, or a seeded renumbering
+        self.rank = list(range(num_vars + 1)) if seed is None else rng.permutation(num_vars + 1).tolist()
+        self.in_heap = np.ones(num_vars + 1, dtype=bool)
+        self.in_heap[0] = False
+        self._rebuild_heap()
+
+    @property
+    def decide_cycles(self) -> int:
+        """Cycles spent in DECIDE per decision."""
+        return 1
+
+    def key(self, var: int) -> Tuple:
+        """Heap key; the smallest key is decided first."""
+        return (self.rank[var],)
+
+    def _rebuild_heap(self):
+        self.heap = [(self.key(v), v) for v in np.flatnonzero(self.in_heap).tolist()]
+        heapq.heapify(self.heap)
+
+    def _push(self, var: int):
+        heapq.heappush(self.heap, (self.key(var), var))
+        if len(self.heap) > 4 * self.num_vars + 16:
+            self._rebuild_heap() # Drop the stale entries
+
+    def set_next_decision(self, var_id: int):
+        self.forced_next = var_id
+
+    def predict(self, values: np.ndarray) -> Optional[int]:
+        """Next decision variable; `values` is the assignment array (0: unassigned)."""
+        if self.forced_next is not None:
+            d = self.forced_next
+            self.forced_next = None
+            return d
+
+        heap = self.heap
+        while heap:
+            key, var = heap[0]
+            if key != self.key(var):
+                heapq.heappop(heap) # Stale: a newer entry for var is in the heap
+            elif values[var]:
+                heapq.heappop(heap)
+                self.in_heap[var] = False
+            else:
+                return var
+        return None
+
+    def phase(self, var: int) -> bool:
+        """Value to try first when deciding var."""
+        return bool(self.saved_phase[var] if self.phase_saving else self.polarity[var])
+
+    def unassign(self, var: int, val: bool):
+        """Backtracking removed var's assignment: it becomes a candidate again."""
+        self.saved_phase[var] = val
+        if not self.in_heap[var]:
+            self.in_heap[var] = True
+            self._push(var)
+
+    def on_conflict(self, static_row: np.ndarray):
+        """Called with the literals of the row that caused a conflict."""
+        pass
+
+    def snapshot(self) -> Dict:
+        """Decision order and phase state, for a SatNode checkpoint."""
+        return {"forced_next": self.forced_next, "polarity": self.polarity.copy(),
+                "saved_phase": self.saved_phase.copy(), "rank": np.array(self.rank, dtype=np.int64),
+                "in_heap": self.in_heap.copy()}
+
+    def restore(self, state: Dict):
+        """Inverse of snapshot(). Only stale heap entries are lost, so decisions are unchanged."""
+        self.forced_next = state["forced_next"]
+        self.polarity = state["polarity"].astype(bool)
+        self.saved_phase = state["saved_phase"].astype(bool)
+        self.rank = state["rank"].tolist()
+        self.in_heap = state["in_heap"].astype(bool)
+        self._rebuild_heap()
+
+class OccurrenceHeuristic(HeuristicEngine):
+    """
+    Component: Heuristic Engine (static occurrence order)
+
+    Decides the unassigned variable occurring in the most clauses first, ties
+    to the lowest index (or rank, with a seed). The order is fixed at load time, so hardware can
+    renumber the variables once and reuse the priority encoder: one cycle.
+    """
+    name = 'occurrence'
+
+    def __init__(self, num_vars: int, literal_matrix: np.ndarray, phase_saving: bool = False,
+                 polarity: str = 'false', seed: Optional[int] = None):
+        vars_ = literal_matrix[literal_matrix != 0] // 2
+        self.occurrences = np.bincount(vars_[vars_ <= num_vars], minlength=num_vars + 1)
+        super().__init__(num_vars, phase_saving, polarity, seed)
+
+    def key(self, var: int) -> Tuple:
+        return (-int(self.occurrences[var]), self.rank[var])
+
+class VSIDSHeuristic(HeuristicEngine):
+    """
+    Component: Heuristic Engine (VSIDS activity)
+
+    Every conflict bumps the activity counter of each variable in the
+    conflict row by one, and every decay_interval conflicts all counters are
+    halved, so recent conflicts dominate. The most active unassigned variable
+    is decided first, ties to the lowest index (or rank, with a seed).
+
+    Hardware model: one counter per variable. The conflict row is still in
+    the row registers when BACKTRACK starts, so its bumps are applied in
+    parallel with the first pop, and the halving is a parallel shift; neither
+    costs a cycle. The arg-max is a tree of comparators over all counters,
+    pipelined at levels_per_cycle tree levels per clock, so DECIDE takes
+    ceil(ceil(log2(num_vars)) / levels_per_cycle) cycles.
+    """
+    name = 'vsids'
+
+    def __init__(self, num_vars: int, phase_saving: bool = False, polarity: str = 'false',
+                 seed: Optional[int] = None, decay_interval: int = 64, levels_per_cycle: int = 4):
+        self.activity = np.zeros(num_vars + 1, dtype=np.int64)
+        self.decay_interval = decay_interval
+        self.levels_per_cycle = levels_per_cycle
+        self.num_conflicts = 0
+        super().__init__(num_vars, phase_saving, polarity, seed)
+
+    @property
+    def decide_cycles(self) -> int:
+        levels = math.ceil(math.log2(max(self.num_vars, 2)))
+        return max(1, math.ceil(levels / self.levels_per_cycle))
+
+    def key(self, var: int) -> Tuple:
+        return (-int(self.activity[var]), self.rank[var])
+
+    def on_conflict(self, static_row: np.ndarray):
+        vars_ = np.unique(static_row[static_row != 0] // 2)
+        vars_ = vars_[vars_ <= self.num_vars]
+        self.activity[vars_] += 1
+        self.num_conflicts += 1
+        if self.num_conflicts % self.decay_interval == 0:
+            self.activity >>= 1
+            self._rebuild_heap() # Every key changed
+            return
+        for var in vars_[self.in_heap[vars_]].tolist():
+            self._push(var) # The old entry is now stale
+
+    def snapshot(self) -> Dict:
+        return {**super().snapshot(), "activity": self.activity.copy(), "num_conflicts": self.num_conflicts}
+
+    def restore(self, state: Dict):
+        self.activity = state["activity"].astype(np.int64)
+        self.num_conflicts = state["num_conflicts"]
+        super().restore(state)
+
+HEURISTICS = ('first', 'occurrence', 'vsids')
+
+def make_heuristic(name: str, num_vars: int, literal_matrix: np.ndarray, phase_saving: bool = False,
+                   polarity: str = 'false', seed: Optional[int] = None, **options) -> HeuristicEngine:
+    """Builds the heuristic engine called `name` (one of HEURISTICS)."""
+    if name == 'first':
+        return HeuristicEngine(num_vars, phase_saving, polarity, seed)
+    if name == 'occurrence':
+        return OccurrenceHeuristic(num_vars, literal_matrix, phase_saving, polarity, seed)
+    if name == 'vsids':
+        return VSIDSHeuristic(num_vars, phase_saving, polarity, seed, **options)
+    raise ValueError(f"Unknown heuristic '{name}', expected one of {HEURISTICS}")
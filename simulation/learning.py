@@ -0,0 +1,148 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+
+# Conflict-driven clause learning for SatNode (learning=True).
+#
+# Implied assignments remember the row that forced them. On a conflict the
+# ConflictAnalyzer derives a first-UIP clause from those reason rows, the
+# clause is written into a reserved region of rows after the problem clauses,
+# and BACKTRACK jumps straight to the clause's assertion level, where the new
+# row forces the UIP literal. LearnedRegion keeps the region within a fixed
+# row budget, like a BRAM allocated for learned clauses.
+
+EVICTIONS = ('lbd', 'activity')
+
+class Analysis(NamedTuple):
+    literals: List[int] # Learned clause as False literal codes, UIP literal first
+    level: int          # Assertion level: the highest level below the conflict level
+    lbd: int            # Distinct decision levels in the clause
+    cycles: int         # ANALYZE cycles, including the learned row write
+    rows: List[int]     # Conflict row and every reason row resolved
+
+class ConflictAnalyzer:
+    """
+    Component: Conflict Analyzer
+
+    First-UIP analysis. Starting from the conflict row, walks the decision
+    stack down from the top, one entry per cycle, and resolves every marked
+    entry with the reason row stored in it until a single literal of the conflict level is left.
+    The reason row read overlaps the walk, and writing the learned row costs
+    one more cycle. Level 0 literals are always False and are dropped.
+    """
+    def analyze(self, conflict_row: int, memory: np.ndarray, stack: np.ndarray,
+                var_level: np.ndarray) -> Optional[Analysis]:
+        """
+        Returns the learned clause, or None if the conflict is at level 0
+        (UNSAT). `stack` holds the decision stack entries (var, value, forced,
+        reason), bottom first.
+        """
+        literals = memory[conflict_row]
+        literals = literals[literals != 0].tolist()
+        conflict_level = max(int(var_level[lit >> 1]) for lit in literals)
+        if conflict_level == 0:
+            return None
+
+        seen = set()
+        learned = []
+        rows = [conflict_row]
+        pending = 0 # Marked literals of the conflict level not yet resolved
+        stack_vars = stack['var'].tolist()
+        i = len(stack_vars)
+        while True:
+            for lit in literals:
+                var = lit >> 1
+                if var in seen or var_level[var] == 0:
+                    continue
+                seen.add(var)
+                if var_level[var] == conflict_level:
+                    pending += 1
+                else:
+                    learned.append(lit)
+            i -= 1
+            while stack_vars[i] not in seen:
+                i -= 1
+            var = stack_vars[i]
+            pending -= 1
+            if pending == 0:
+                break
+            row = int(stack['reason'][i])
+            rows.append(row)
+            literals = [lit for lit in memory[row].tolist() if lit != 0 and lit >> 1 != var]
+
+        # The UIP's literal is False now and becomes True after the backjump
+        learned.insert(0, 2 * var + int(stack['value'][i]))
+        levels = {int(var_level[lit >> 1]) for lit in learned}
+        level = max(levels - {conflict_level}, default=0)
+        return Analysis(learned, level, len(levels), len(stack_vars) - i + 1, rows)
+
+class LearnedRegion:
+    """
+    Component: Learned Clause Region
+
+    Slot bookkeeping for the `capacity` learned rows reserved after the
+    problem rows. Slots are filled in order; once all are in use, a new
+    clause replaces an unlocked one. policy 'lbd' evicts the highest LBD,
+    'activity' the row least often used by conflict analysis; ties go to the
+    oldest. A row is locked while it is the reason of an assignment.
+    """
+    def __init__(self, first_row: int, capacity: int, policy: str = 'lbd'):
+        if policy not in EVICTIONS:
+            raise ValueError(f"Unknown eviction '{policy}', expected one of {EVICTIONS}")
+        self.first_row = first_row
+        self.capacity = capacity
+        self.policy = policy
+        self.lbd = np.zeros(capacity, dtype=np.int32)
+        self.activity = np.zeros(capacity, dtype=np.int64)
+        self.born = np.zeros(capacity, dtype=np.int64)
+        self.used = 0
+        self.clock = 0
+
+    def allocate(self, lbd: int, locked_rows: np.ndarray) -> Tuple[Optional[int], Optional[int]]:
+        """Returns (row for a new clause, row evicted for it or None); the row is None if all are locked."""
+        evicted = None
+        if self.used < self.capacity:
+            slot = self.used
+            self.used += 1
+        else:
+            free = np.ones(self.capacity, dtype=bool)
+            free[locked_rows - self.first_row] = False
+            candidates = np.flatnonzero(free)
+            if not len(candidates):
+                return None, None
+            if self.policy == 'lbd':
+                order = np.lexsort((self.born[candidates], self.activity[candidates], -self.lbd[candidates]))
+            else:
+                order = np.lexsort((self.born[candidates], -self.lbd[candidates], self.activity[candidates]))
+            slot = int(candidates[order[0]])
+            evicted = self.first_row + slot
+        self.lbd[slot] = lbd
+        self.activity[slot] = 0
+        self.born[slot] = self.clock
+        self.clock += 1
+        return self.first_row + slot, evicted
+
+    def bump(self, rows: List[int]):
+        """Counts a use in conflict analysis for every learned row in rows."""
+        slots = np.asarray(rows, dtype=np.int64) - self.first_row
+        slots = slots[(slots >= 0) & (slots < self.used)]
+        np.add.at(self.activity, slots, 1)
+
+    def rows(self) -> np.ndarray:
+        return np.arange(self.first_row, self.first_row + self.used)
+
+    def reset(self):
+        self.used = 0
+        self.clock = 0
+
+    def snapshot(self) -> Dict:
+        """Slot bookkeeping, for a SatNode checkpoint."""
+        return {"lbd": self.lbd.copy(), "activity": self.activity.copy(), "born": self.born.copy(),
+                "used": self.used, "clock": self.clock}
+
+    def restore(self, state: Dict):
+        """Inverse of snapshot()."""
+        self.lbd[:] = state["lbd"]
+        self.activity[:] = state["activity"]
+        self.born[:] = state["born"]
+        self.used = state["used"]
+        self.clock = state["clock"]
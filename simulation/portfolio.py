@@ -0,0 +1,176 @@
+import json
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+import numpy as np
+from sat_node import SatNode
+
+# Portfolio solving: several differently-configured SatNodes race on the
+# same CNF in separate processes. The first SAT/UNSAT verdict wins and the
+# other processes are terminated. One configuration is fast on some families
+# and slow on others, so the race cuts the tail latency on a multi-core host.
+#
+# Every race can be appended to a JSON-lines log. tally() counts the wins
+# per configuration over such a log, so the default configuration can be
+# chosen from data.
+
+POLL_SECONDS = 0.5 # How often the race checks for crashed workers
+
+# Configurations raced by default: SatNode options, by name
+PORTFOLIO = {
+    "default":      {},
+    "true-first":   {"polarity": "true"},
+    "occurrence":   {"heuristic": "occurrence"},
+    "random-1":     {"polarity": "random", "seed": 1},
+    "random-2":     {"polarity": "random", "seed": 2, "heuristic": "occurrence"},
+    "vsids-phase":  {"heuristic": "vsids", "phase_saving": True, "backtrack": "trail"},
+    "cdcl":         {"learning": True, "heuristic": "vsids", "backtrack": "trail", "propagation": "indexed"},
+    "cdcl-random":  {"learning": True, "heuristic": "vsids", "phase_saving": True, "polarity": "random",
+                     "seed": 3, "backtrack": "trail", "propagation": "indexed"},
+}
+
+def _race_worker(name: str, options: Dict, matrix: np.ndarray, num_vars: int, max_cycles: int,
+                 results) -> None:
+    """Solves in a child process and reports (name, result, assignment, cycles, wall seconds)."""
+    try:
+        t = time.perf_counter()
+        node = SatNode(matrix, num_vars, mode="fast", **options)
+        node.max_cycles = max_cycles
+        state, assignment = node.solve()
+        result = state if state in ("SAT", "UNSAT") else "TIMEOUT"
+        results.put((name, result, {int(v): bool(val) for v, val in assignment.items()}, node.cycle_count,
+                     time.perf_counter() - t))
+    except Exception as e:
+        results.put((name, f"ERROR ({type(e).__name__}: {e})", {}, 0, 0.0))
+
+def race(matrix: np.ndarray, num_vars: int, configs: Optional[Dict[str, Dict]] = None,
+         jobs: Optional[int] = None, timeout: Optional[float] = None, max_cycles: int = 10**7) -> Dict:
+    """
+    Races the SatNode configurations `configs` (default PORTFOLIO) on one
+    problem. All of them start at once unless `jobs` caps the processes; then
+    a configuration that finishes without a verdict frees its slot for the
+    next one.
+
+    Returns the winner's name, result, assignment, cycles and wall seconds,
+    plus the outcome of every other configuration: a result if it finished
+    first without a verdict, else "CANCELLED" (or "NOT STARTED"). The result
+    is "TIMEOUT" if no configuration reached a verdict within `timeout`
+    seconds or max_cycles.
+    """
+    configs = PORTFOLIO if configs is None else configs
+    jobs = min(jobs or len(configs), len(configs))
+    ctx = mp.get_context()
+    results = ctx.Queue()
+    waiting = list(configs.items())
+    running = {}
+    outcomes = {name: "NOT STARTED" for name in configs}
+    race_result = {"result": "TIMEOUT", "winner": None, "assignment": {}, "cycles": None, "wall_s": None}
+    start = time.perf_counter()
+    deadline = None if timeout is None else start + timeout
+
+    def launch():
+        while waiting and len(running) < jobs:
+            name, options = waiting.pop(0)
+            proc = ctx.Process(target=_race_worker, daemon=True,
+                               args=(name, options, matrix, num_vars, max_cycles, results))
+            proc.start()
+            running[name] = proc
+            outcomes[name] = "CANCELLED"
+
+    try:
+        launch()
+        while running:
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                break
+            try:
+                name, result, assignment, cycles, wall = results.get(timeout=min(remaining or POLL_SECONDS,
+                                                                                 POLL_SECONDS))
+            except queue.Empty:
+                for name, proc in list(running.items()):
+                    if proc.exitcode not in (None, 0): # Died without reporting
+                        outcomes[name] = f"ERROR (exit code {proc.exitcode})"
+                        running.pop(name)
+                launch()
+                continue
+            running.pop(name).join()
+            outcomes[name] = result
+            if result in ("SAT", "UNSAT"):
+                race_result.update(result=result, winner=name, assignment=assignment, cycles=cycles,
+                                   wall_s=round(time.perf_counter() - start, 6))
+                break
+            launch()
+    finally:
+        for proc in running.values():
+            proc.terminate() # Cancel the losers
+        for proc in running.values():
+            proc.join()
+        results.close()
+    race_result["outcomes"] = outcomes
+    return race_result
+
+def record_race(path: str, instance: str, race_result: Dict):
+    """Appends one race (without the assignment) to a JSON-lines win log."""
+    entry = {"instance": instance, **{k: v for k, v in race_result.items() if k != "assignment"}}
+    with open(path, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+def tally(path: str) -> Counter:
+    """Wins per configuration over a win log (races without a verdict are skipped)."""
+    wins = Counter()
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                if entry.get("winner"):
+                    wins[entry["winner"]] += 1
+    return wins
+
+def print_tally(wins: Counter, configs: List[str]):
+    total = sum(wins.values())
+    print(f"\n{'Configuration':<14} {'Wins':>5} {'Share':>6}")
+    for name in sorted(set(configs) | set(wins), key=lambda n: (-wins[n], n)):
+        print(f"{name:<14} {wins[name]:>5} {wins[name] / max(total, 1):>6.0%}")
+
+if __name__ == "__main__":
+    import argparse
+    from dimacs import load_dimacs
+
+    parser = argparse.ArgumentParser(description="Race several SatNode configurations on each CNF.")
+    parser.add_argument("cnf", nargs="*")
+    parser.add_argument("--configs", nargs="+", metavar="NAME", choices=sorted(PORTFOLIO),
+                        help=f"configurations to race (default: all of {', '.join(PORTFOLIO)})")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="concurrent processes (default: one per configuration)")
+    parser.add_argument("--timeout", type=float, default=None, help="per-instance race timeout in seconds")
+    parser.add_argument("--max-cycles", type=int, default=10**7)
+    parser.add_argument("--record", metavar="LOG", help="append every race to this JSON-lines win log")
+    parser.add_argument("--tally", metavar="LOG", help="print the wins per configuration in a win log")
+    args = parser.parse_args()
+
+    configs = {name: PORTFOLIO[name] for name in args.configs} if args.configs else PORTFOLIO
+    status = 0
+    wins = Counter()
+    for path in args.cnf:
+        num_vars, matrix = load_dimacs(path)
+        race_result = race(matrix, num_vars, configs, jobs=args.jobs, timeout=args.timeout,
+                           max_cycles=args.max_cycles)
+        if race_result["winner"]:
+            wins[race_result["winner"]] += 1
+            print(f"{os.path.basename(path):<28} {race_result['result']:<6} winner {race_result['winner']:<12} "
+                  f"{race_result['cycles']:>10} cycles {race_result['wall_s']:>9.3f} s")
+        else:
+            status = 1
+            print(f"{os.path.basename(path):<28} TIMEOUT " +
+                  ", ".join(f"{name}: {outcome}" for name, outcome in race_result["outcomes"].items()))
+        if args.record:
+            record_race(args.record, path, race_result)
+    if args.cnf:
+        print_tally(wins, list(configs))
+    if args.tally:
+        print(f"\nWin log {args.tally}:")
+        print_tally(tally(args.tally), list(configs))
+    sys.exit(status)
@@ -0,0 +1,331 @@
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from dimacs import clauses_to_matrix, matrix_to_clauses
+
+# CNF preprocessing between the DIMACS loader and SatNode / write_hex.
+#
+# Every clause is a static memory row that PROPAGATE visits for every
+# propagated literal, and every variable costs a decision, so rows and
+# variables removed up front save cycles and BRAM on every run. The
+# Preprocessor simplifies the formula to an equisatisfiable one with
+#   - top-level unit propagation
+#   - pure literal elimination
+#   - subsumption and self-subsuming resolution (clause strengthening)
+#   - bounded variable elimination (resolve a variable away if that does
+#     not add clauses, keeping every resolvent within the row width)
+# and renumbers the surviving variables 1..k. extend() turns a model of the
+# reduced formula into a model of the original: removed variables are set
+# from the top-level units and a reconstruction stack of (witness literal,
+# clause) pairs, replayed in reverse.
+
+class Preprocessor:
+    """
+    Simplifies a literal matrix (see dimacs.load_dimacs) in place of the
+    original formula. Clauses are kept as sorted DIMACS literal lists with
+    per-literal occurrence sets. Techniques can be switched off one by one.
+
+    max_width bounds resolvent length (default: the input row width, so the
+    reduced matrix never needs wider rows); max_occurrences skips variables
+    occurring in more clauses than that during elimination.
+    """
+    def __init__(self, num_vars: int, matrix: np.ndarray, units: bool = True, pure: bool = True,
+                 subsumption: bool = True, elimination: bool = True, max_width: Optional[int] = None,
+                 max_occurrences: int = 16, max_rounds: int = 10):
+        self.num_vars = num_vars
+        self.techniques = {"units": units, "pure": pure, "subsumption": subsumption, "elimination": elimination}
+        self.max_width = max_width if max_width is not None else (matrix.shape[1] if matrix.ndim == 2 else 0)
+        self.max_occurrences = max_occurrences
+        self.max_rounds = max_rounds
+
+        self.clauses: List[Optional[List[int]]] = [] # None: removed
+        self.signatures: List[int] = [] # 64-bit variable hash of each clause, to reject subsumption fast
+        self.occ: Dict[int, Set[int]] = {}
+        self.fixed: Dict[int, bool] = {}  # Top-level assignments
+        self.eliminated: Set[int] = set() # Variables removed by pure literal or elimination
+        self.stack: List[Tuple[int, List[int]]] = [] # (witness literal, clause) for extend()
+        self.unsat = False
+        self._units: List[int] = []
+        self._touched: Set[int] = set() # Clauses to check in the next subsumption pass
+        self.stats = dict.fromkeys(("tautologies", "duplicates", "units", "pure", "subsumed", "strengthened",
+                                    "eliminated", "resolvents"), 0)
+
+        clauses = matrix_to_clauses(matrix)
+        self.stats["rows_in"], self.stats["vars_in"] = len(clauses), num_vars
+        seen = set()
+        for clause in clauses:
+            key = frozenset(clause)
+            if key in seen:
+                self.stats["duplicates"] += 1
+                continue
+            seen.add(key)
+            if any(-lit in key for lit in key):
+                self.stats["tautologies"] += 1
+                continue
+            self._add(sorted(key))
+        self.var_map: Dict[int, int] = {}  # Original -> reduced variable
+        self.inverse: List[int] = [0]      # Reduced -> original variable
+
+    # --- Clause database ---
+
+    def _add(self, clause: List[int]) -> int:
+        cid = len(self.clauses)
+        self.clauses.append(clause)
+        self.signatures.append(self._signature(clause))
+        for lit in clause:
+            self.occ.setdefault(lit, set()).add(cid)
+        if not clause:
+            self.unsat = True
+        elif len(clause) == 1:
+            self._units.append(cid)
+        self._touched.add(cid)
+        return cid
+
+    def _remove(self, cid: int):
+        for lit in self.clauses[cid]:
+            self.occ[lit].discard(cid)
+        self.clauses[cid] = None
+
+    def _strengthen(self, cid: int, lit: int):
+        """Drops a False literal from a clause."""
+        clause = self.clauses[cid]
+        clause.remove(lit)
+        self.occ[lit].discard(cid)
+        self.signatures[cid] = self._signature(clause)
+        if not clause:
+            self.unsat = True
+        elif len(clause) == 1:
+            self._units.append(cid)
+        self._touched.add(cid)
+
+    @staticmethod
+    def _signature(clause: List[int]) -> int:
+        signature = 0
+        for lit in clause:
+            signature |= 1 << (abs(lit) & 63)
+        return signature
+
+    def _occurrences(self, lit: int) -> Set[int]:
+        return self.occ.get(lit, set())
+
+    def _live_vars(self) -> List[int]:
+        return sorted({abs(lit) for lit, cids in self.occ.items() if cids})
+
+    # --- Techniques ---
+
+    def propagate_units(self) -> bool:
+        """Assigns every unit clause's literal and simplifies, until no unit is left."""
+        changed = False
+        while self._units and not self.unsat:
+            cid = self._units.pop()
+            clause = self.clauses[cid]
+            if clause is None or len(clause) != 1:
+                continue
+            lit = clause[0]
+            self.fixed[abs(lit)] = lit > 0
+            self.stats["units"] += 1
+            changed = True
+            for other in list(self._occurrences(lit)):
+                self._remove(other)
+            for other in list(self._occurrences(-lit)):
+                self._strengthen(other, -lit)
+        return changed
+
+    def eliminate_pure(self) -> bool:
+        """Removes the clauses of every literal whose negation occurs nowhere."""
+        changed = False
+        progress = True
+        while progress:
+            progress = False
+            for var in self._live_vars():
+                for lit in (var, -var):
+                    if self._occurrences(lit) and not self._occurrences(-lit):
+                        self.stack.append((lit, [lit]))
+                        self.eliminated.add(var)
+                        for cid in list(self._occurrences(lit)):
+                            self._remove(cid)
+                        self.stats["pure"] += 1
+                        progress = changed = True
+        return changed
+
+    def subsume(self) -> bool:
+        """
+        Backward subsumption and self-subsuming resolution from every touched
+        clause C: a clause D containing all of C is removed, and a clause D
+        containing all of C but one literal, negated, loses that literal.
+        """
+        changed = False
+        while self._touched and not self.unsat:
+            cid = self._touched.pop()
+            clause = self.clauses[cid]
+            if clause is None:
+                continue
+            # Candidates share C's rarest variable, in either polarity
+            occ = self.occ
+            pivot = min(clause, key=lambda lit: len(occ.get(lit, ())) + len(occ.get(-lit, ())))
+            signature = self.signatures[cid]
+            for other in [*occ.get(pivot, ()), *occ.get(-pivot, ())]:
+                target = self.clauses[other]
+                if other == cid or target is None or len(target) < len(clause) \
+                        or signature & ~self.signatures[other]:
+                    continue
+                members = set(target)
+                missing = [lit for lit in clause if lit not in members]
+                if not missing:
+                    self._remove(other)
+                    self.stats["subsumed"] += 1
+                    changed = True
+                elif len(missing) == 1 and -missing[0] in members:
+                    self._strengthen(other, -missing[0])
+                    self.stats["strengthened"] += 1
+                    changed = True
+            if self._units and self.techniques["units"]:
+                changed |= self.propagate_units()
+        return changed
+
+    def eliminate_variables(self) -> bool:
+        """
+        Bounded variable elimination: replaces the clauses of a variable by all
+        their non-tautological resolvents if there are no more of them, and
+        none is wider than max_width.
+        """
+        changed = False
+        candidates = sorted(self._live_vars(), key=lambda v: len(self._occurrences(v)) + len(self._occurrences(-v)))
+        for var in candidates:
+            if self.unsat:
+                break
+            pos, neg = self._occurrences(var), self._occurrences(-var)
+            if not pos or not neg or len(pos) + len(neg) > self.max_occurrences:
+                continue
+            resolvents = self._resolvents(var, pos, neg, len(pos) + len(neg))
+            if resolvents is None:
+                continue
+            for cid in sorted(pos) + sorted(neg):
+                clause = self.clauses[cid]
+                self.stack.append((var if var in clause else -var, clause))
+                self._remove(cid)
+            for clause in resolvents:
+                self._add(clause)
+            self.eliminated.add(var)
+            self.stats["eliminated"] += 1
+            self.stats["resolvents"] += len(resolvents)
+            changed = True
+            if self._units and self.techniques["units"]:
+                self.propagate_units()
+        return changed
+
+    def _resolvents(self, var: int, pos: Set[int], neg: Set[int], limit: int) -> Optional[List[List[int]]]:
+        """Resolvents on var, or None if there are more than `limit` or one is too wide."""
+        resolvents = set()
+        for p in pos:
+            left = [lit for lit in self.clauses[p] if lit != var]
+            for n in neg:
+                merged = set(left)
+                merged.update(lit for lit in self.clauses[n] if lit != -var)
+                if any(-lit in merged for lit in merged):
+                    continue # Tautology
+                if len(merged) > self.max_width:
+                    return None
+                resolvents.add(frozenset(merged))
+                if len(resolvents) > limit:
+                    return None
+        return [sorted(clause) for clause in resolvents]
+
+    # --- Pipeline ---
+
+    def run(self) -> Tuple[int, np.ndarray]:
+        """Simplifies until nothing changes (or max_rounds) and returns the reduced (num_vars, matrix)."""
+        steps = [(self.techniques["units"], self.propagate_units), (self.techniques["pure"], self.eliminate_pure),
+                 (self.techniques["subsumption"], self.subsume),
+                 (self.techniques["elimination"], self.eliminate_variables)]
+        for _ in range(self.max_rounds):
+            changed = False
+            for enabled, step in steps:
+                if enabled and not self.unsat:
+                    changed |= step()
+            if self.unsat or not changed:
+                break
+        return self.reduced()
+
+    def reduced(self) -> Tuple[int, np.ndarray]:
+        """
+        The current formula with its variables renumbered 1..k. An
+        unsatisfiable formula becomes the contradiction x1, not x1.
+        """
+        if self.unsat:
+            self.var_map, self.inverse = {}, [0]
+            self.stats["rows_out"], self.stats["vars_out"] = 2, 1
+            return 1, clauses_to_matrix([[1], [-1]])
+        live = [clause for clause in self.clauses if clause is not None]
+        self.inverse = [0] + self._live_vars()
+        self.var_map = {var: new for new, var in enumerate(self.inverse) if new}
+        renumbered = [[self.var_map[abs(lit)] * (1 if lit > 0 else -1) for lit in clause] for clause in live]
+        self.stats["rows_out"], self.stats["vars_out"] = len(live), len(self.inverse) - 1
+        return len(self.inverse) - 1, clauses_to_matrix(renumbered)
+
+    def extend(self, assignment: Dict[int, bool]) -> Dict[int, bool]:
+        """
+        Maps a model of the reduced formula back to the original variables
+        and completes it: top-level units first, then the reconstruction stack
+        in reverse, setting each witness literal whose clause is not yet
+        satisfied. Variables that never mattered are False.
+        """
+        model = dict.fromkeys(range(1, self.num_vars + 1), False)
+        for var, val in assignment.items():
+            if 0 < var < len(self.inverse):
+                model[self.inverse[var]] = val
+        model.update(self.fixed)
+        for witness, clause in reversed(self.stack):
+            if not any(model.get(abs(lit), False) == (lit > 0) for lit in clause):
+                model[abs(witness)] = witness > 0
+        return model
+
+    def report(self) -> str:
+        s = self.stats
+        return (f"rows {s['rows_in']} -> {s['rows_out']} (-{s['rows_in'] - s['rows_out']}), "
+                f"vars {s['vars_in']} -> {s['vars_out']} (-{s['vars_in'] - s['vars_out']}); "
+                f"{s['duplicates']} duplicate, {s['tautologies']} tautological, {s['subsumed']} subsumed, "
+                f"{s['strengthened']} strengthened; {s['units']} units, {s['pure']} pure, "
+                f"{s['eliminated']} eliminated ({s['resolvents']} resolvents)"
+                + ("; UNSAT" if self.unsat else ""))
+
+def preprocess(num_vars: int, matrix: np.ndarray, **options) -> Tuple[int, np.ndarray, Preprocessor]:
+    """Runs a Preprocessor; returns (reduced num_vars, reduced matrix, preprocessor for extend())."""
+    pre = Preprocessor(num_vars, matrix, **options)
+    reduced_vars, reduced = pre.run()
+    return reduced_vars, reduced, pre
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from dimacs import load_dimacs, write_dimacs
+    from sat_node import SatNode
+    parser = argparse.ArgumentParser(description="Simplify a DIMACS CNF before loading it into SatNode.")
+    parser.add_argument("cnf")
+    parser.add_argument("-o", "--output", help="write the reduced formula as DIMACS (e.g. for cnf_to_hex.py)")
+    parser.add_argument("--no-units", action="store_true")
+    parser.add_argument("--no-pure", action="store_true")
+    parser.add_argument("--no-subsumption", action="store_true")
+    parser.add_argument("--no-elimination", action="store_true")
+    parser.add_argument("--solve", action="store_true",
+                        help="solve original and reduced formula with SatNode and compare cycles")
+    args = parser.parse_args()
+
+    num_vars, matrix = load_dimacs(args.cnf)
+    t = time.perf_counter()
+    reduced_vars, reduced, pre = preprocess(num_vars, matrix, units=not args.no_units, pure=not args.no_pure,
+                                            subsumption=not args.no_subsumption,
+                                            elimination=not args.no_elimination)
+    print(f"{pre.report()} in {time.perf_counter() - t:.3f} s")
+    if args.output:
+        write_dimacs(args.output, reduced_vars, reduced)
+        print(f"Reduced formula written to {args.output}")
+    if args.solve:
+        for label, n, m in (("original", num_vars, matrix), ("reduced", reduced_vars, reduced)):
+            node = SatNode(m, n, mode="fast")
+            node.max_cycles = 10**8
+            result, assignment = node.solve()
+            print(f"{label:<9} {result:<6} {node.cycle_count:>10} cycles")
+        if result == "SAT":
+            model = pre.extend(assignment)
+            ok = all(any(model[abs(lit)] == (lit > 0) for lit in clause) for clause in matrix_to_clauses(matrix))
+            print(f"Extended model satisfies the original formula: {ok}")
@@ -0,0 +1,169 @@
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional
+import numpy as np
+from counters import Histogram
+
+# Propagation queue of SatNode, modelled on rtl/propagation_queue.sv: a
+# circular FIFO of False literals with head/tail pointers, so push and pop
+# are O(1) and the occupancy can be bounded like the hardware's.
+#
+# A per-literal "enqueued" bitmap answers membership in O(1) and, with
+# dedup, suppresses pushes of a literal that is already waiting. When a
+# bounded queue is full, the overflow policy decides what happens to a push:
+# - 'stall': the producer would have to wait for a pop, but pops only happen
+#            between sweeps, so the FSM deadlocks; QueueOverflow is raised.
+# - 'drop':  the push is discarded, like the RTL FIFO (push && !full).
+# - 'spill': the literal goes to a spill buffer (a slower secondary memory)
+#            and moves into the ring in order as pops free slots.
+
+OVERFLOWS = ('stall', 'drop', 'spill')
+
+class QueueOverflow(RuntimeError):
+    """A push hit a full queue under the 'stall' policy."""
+
+class PropagationQueue:
+    """
+    Component: Propagation Queue
+
+    Ring buffer of `depth` literals (None: unbounded, the ring doubles when
+    full). Statistics count pushes, pops, suppressed duplicates, drops and
+    spills, and sample the occupancy after every accepted push.
+    """
+    def __init__(self, num_vars: int, depth: Optional[int] = None, overflow: str = 'stall', dedup: bool = True):
+        if overflow not in OVERFLOWS:
+            raise ValueError(f"Unknown overflow policy '{overflow}', expected one of {OVERFLOWS}")
+        if depth is not None and depth < 1:
+            raise ValueError(f"Queue depth must be at least 1, got {depth}")
+        self.depth = depth
+        self.overflow = overflow
+        self.dedup = dedup
+        self._ring = [0] * (depth or 16)
+        self._head = 0
+        self._count = 0
+        self._spill = deque()
+        self._enqueued = [0] * (2 * num_vars + 2) # Copies of each literal in the queue
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.pushes = 0
+        self.pops = 0
+        self.duplicates = 0
+        self.drops = 0
+        self.spills = 0
+        self.peak = len(self)
+        self._occupancy = [0] # Pushes that left the queue holding n literals, by n
+
+    def __len__(self) -> int:
+        return self._count + len(self._spill)
+
+    def __contains__(self, literal: int) -> bool:
+        return literal < len(self._enqueued) and self._enqueued[literal] > 0
+
+    def __iter__(self) -> Iterator[int]:
+        """Literals from head to tail, spilled ones last."""
+        ring, size = self._ring, len(self._ring)
+        for i in range(self._count):
+            yield ring[(self._head + i) % size]
+        yield from self._spill
+
+    def push(self, literal: int) -> bool:
+        """Enqueues a literal; returns False if it was suppressed or dropped."""
+        enqueued = self._enqueued
+        if literal >= len(enqueued):
+            enqueued.extend([0] * (literal + 1 - len(enqueued)))
+        if self.dedup and enqueued[literal]:
+            self.duplicates += 1
+            return False
+        ring = self._ring
+        if self._count == len(ring) or self._spill:
+            if self.depth is None:
+                self._grow()
+                ring = self._ring
+            elif self.overflow == 'stall':
+                raise QueueOverflow(f"Propagation queue full ({self.depth} literals) pushing literal {literal}")
+            elif self.overflow == 'drop':
+                self.drops += 1
+                return False
+            else:
+                self._spill.append(literal)
+                self.spills += 1
+                enqueued[literal] += 1
+                self._sample()
+                return True
+        ring[(self._head + self._count) % len(ring)] = literal
+        self._count += 1
+        enqueued[literal] += 1
+        self._sample()
+        return True
+
+    def _sample(self):
+        self.pushes += 1
+        n = len(self)
+        if n >= len(self._occupancy):
+            self._occupancy.extend([0] * (n + 1 - len(self._occupancy)))
+        self._occupancy[n] += 1
+        if n > self.peak:
+            self.peak = n
+
+    def _grow(self):
+        self._ring = list(self) + [0] * len(self._ring)
+        self._head = 0
+
+    def pop_batch(self, n: int) -> List[int]:
+        """Dequeues up to n literals from the head; spilled literals move up as slots free."""
+        ring, size = self._ring, len(self._ring)
+        batch = []
+        while len(batch) < n and self._count:
+            take = min(n - len(batch), self._count)
+            batch += [ring[(self._head + i) % size] for i in range(take)]
+            self._head = (self._head + take) % size
+            self._count -= take
+            while self._spill and self._count < size:
+                # Refill freed slots from the spill buffer, oldest first
+                ring[(self._head + self._count) % size] = self._spill.popleft()
+                self._count += 1
+        self.pops += len(batch)
+        for literal in batch:
+            self._enqueued[literal] -= 1
+        return batch
+
+    def clear(self):
+        """Empties the queue (the RTL's pq_rst); statistics are kept."""
+        for literal in self:
+            self._enqueued[literal] = 0
+        self._head = 0
+        self._count = 0
+        self._spill.clear()
+
+    def reset(self, literals: Iterable[int]):
+        """Empties the queue and pushes `literals` in order."""
+        self.clear()
+        for literal in literals:
+            self.push(literal)
+
+    def snapshot(self) -> Dict:
+        """Ring, spill buffer and statistics, for a SatNode checkpoint."""
+        return {"ring": np.array(self._ring, dtype=np.int64), "head": self._head, "count": self._count,
+                "spill": list(self._spill), "enqueued": np.array(self._enqueued, dtype=np.int64),
+                "pushes": self.pushes, "pops": self.pops, "duplicates": self.duplicates, "drops": self.drops,
+                "spills": self.spills, "peak": self.peak, "occupancy": list(self._occupancy)}
+
+    def restore(self, state: Dict):
+        """Inverse of snapshot()."""
+        self._ring = state["ring"].tolist()
+        self._head = state["head"]
+        self._count = state["count"]
+        self._spill = deque(state["spill"])
+        self._enqueued = state["enqueued"].tolist()
+        for key in ("pushes", "pops", "duplicates", "drops", "spills", "peak"):
+            setattr(self, key, state[key])
+        self._occupancy = list(state["occupancy"])
+
+    def stats(self) -> Dict:
+        occupancy = Histogram()
+        for n, pushes in enumerate(self._occupancy):
+            if pushes:
+                occupancy.add(n, pushes)
+        return {"depth": self.depth, "overflow": self.overflow, "pushes": self.pushes, "pops": self.pops,
+                "duplicates": self.duplicates, "drops": self.drops, "spills": self.spills, "peak": self.peak,
+                "occupancy": occupancy.to_dict()}
@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Try to import a standard solver, fall back to the built-in one if not available
+try:
+    from pysat.solvers import Glucose3
+    USE_PYSAT = True
+except ImportError:
+    USE_PYSAT = False
+
+# Reference verdicts for checking SatNode, independent of its cycle model.
+#
+# solve_reference() is an iterative DPLL solver with two watched literals per
+# clause: assigning a literal only visits the clauses watching its negation,
+# and backtracking never touches the watch lists. Decisions and the trail are
+# explicit stacks, so the depth of the search is not limited by Python's
+# recursion limit. It is the fallback when pysat is not installed.
+#
+# Verdicts and models are cached as small JSON files keyed by a hash of the
+# literal matrix (not the file path), so a copied, renamed or recompressed
+# CNF still hits. A cached model is checked against the clauses before it is
+# trusted.
+
+VERDICT_VERSION = 1
+DEFAULT_VERDICT_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+                                   "fpgangster", "verdicts")
+REFERENCE_NAME = "pysat" if USE_PYSAT else "watched-literal DPLL"
+
+def solve_reference(num_vars: int, clauses: List[List[int]]) -> Tuple[str, Dict[int, bool]]:
+    """
+    Solves DIMACS clauses. Returns ("SAT", model of every variable) or
+    ("UNSAT", {}).
+    """
+    # Literals as in StaticMemory: 2v is x_v, 2v+1 is ~x_v, so lit ^ 1 negates
+    value = [-1] * (2 * num_vars + 2) # Per literal: 1 True, 0 False, -1 unassigned
+    watches = [[] for _ in range(2 * num_vars + 2)] # Clauses to visit when the literal turns False
+    rows = []
+    trail = []
+    occurrences = [0] * (2 * num_vars + 2)
+
+    def assign(lit: int) -> bool:
+        if value[lit] != -1:
+            return value[lit] == 1
+        value[lit], value[lit ^ 1] = 1, 0
+        trail.append(lit)
+        return True
+
+    for clause in clauses:
+        row = list(dict.fromkeys(2 * abs(lit) + (lit < 0) for lit in clause))
+        if any(lit ^ 1 in row for lit in row):
+            continue # Tautology
+        if not row:
+            return "UNSAT", {}
+        for lit in row:
+            occurrences[lit] += 1
+        if len(row) == 1:
+            if not assign(row[0]):
+                return "UNSAT", {}
+            continue
+        watches[row[0]].append(len(rows))
+        watches[row[1]].append(len(rows))
+        rows.append(row)
+
+    def propagate(head: int) -> bool:
+        """Propagates trail[head:]; False on a conflict."""
+        while head < len(trail):
+            false_lit = trail[head] ^ 1
+            head += 1
+            watching = watches[false_lit]
+            kept = 0
+            i = 0
+            while i < len(watching):
+                r = watching[i]
+                i += 1
+                row = rows[r]
+                if row[0] == false_lit:
+                    row[0], row[1] = row[1], false_lit
+                other = row[0]
+                if value[other] == 1:
+                    watching[kept] = r
+                    kept += 1
+                    continue
+                for k in range(2, len(row)):
+                    if value[row[k]] != 0: # Move the watch to a non-False literal
+                        row[1], row[k] = row[k], false_lit
+                        watches[row[1]].append(r)
+                        break
+                else:
+                    watching[kept] = r
+                    kept += 1
+                    if value[other] == 0: # Conflict: keep the rest of the list
+                        while i < len(watching):
+                            watching[kept] = watching[i]
+                            kept += 1
+                            i += 1
+                        del watching[kept:]
+                        return False
+                    assign(other) # Unit
+            del watching[kept:]
+        return True
+
+    # Static decision order: most frequent variable first, on its more frequent polarity
+    order = sorted(range(1, num_vars + 1), key=lambda v: -(occurrences[2 * v] + occurrences[2 * v + 1]))
+    decisions = [] # [trail position, decision literal, flipped, order position]
+    position = 0
+    if not propagate(0):
+        return "UNSAT", {}
+    while True:
+        while position < len(order) and value[2 * order[position]] != -1:
+            position += 1
+        if position == len(order):
+            return "SAT", {v: value[2 * v] == 1 for v in range(1, num_vars + 1)}
+        var = order[position]
+        lit = 2 * var + (occurrences[2 * var + 1] > occurrences[2 * var])
+        decisions.append([len(trail), lit, False, position])
+        assign(lit)
+        head = len(trail) - 1
+        while not propagate(head):
+            # Chronological backtracking: flip the deepest untried decision
+            while decisions and decisions[-1][2]:
+                decisions.pop()
+            if not decisions:
+                return "UNSAT", {}
+            start, lit, _, position = decisions[-1]
+            for undone in trail[start:]:
+                value[undone] = value[undone ^ 1] = -1
+            del trail[start:]
+            decisions[-1][1:3] = [lit ^ 1, True]
+            assign(lit ^ 1)
+            head = start
+
+def satisfies(matrix: np.ndarray, assignment: Dict[int, bool]) -> bool:
+    """True if every clause has a literal made true by the assignment."""
+    values = np.zeros(max(int(np.max(matrix, initial=0)) // 2, max(assignment, default=0)) + 1,
+                      dtype=np.int8) # 0: unassigned
+    for var, val in assignment.items():
+        values[var] = 1 if val else -1
+    lit_values = values[matrix // 2] * np.where(matrix % 2 == 1, -1, 1)
+    return bool(((lit_values == 1) & (matrix != 0)).any(axis=1).all())
+
+def formula_digest(num_vars: int, matrix: np.ndarray) -> str:
+    """Content hash of a formula, independent of its file name, format and row padding."""
+    matrix = np.ascontiguousarray(matrix, dtype=np.int64)
+    width = int(np.count_nonzero(matrix, axis=1).max()) if len(matrix) else 0
+    h = hashlib.sha256(f"{num_vars}:{len(matrix)}:{width}\n".encode())
+    h.update(matrix[:, :width].tobytes())
+    return h.hexdigest()
+
+def _verdict_path(digest: str, cache_dir: Optional[str]) -> str:
+    return os.path.join(cache_dir or DEFAULT_VERDICT_DIR, digest + ".json")
+
+def load_verdict(digest: str, cache_dir: Optional[str] = None) -> Optional[Tuple[str, Dict[int, bool]]]:
+    """Returns the cached (result, model) of a formula, or None."""
+    try:
+        with open(_verdict_path(digest, cache_dir)) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("version") != VERDICT_VERSION or entry.get("result") not in ("SAT", "UNSAT"):
+        return None
+    return entry["result"], {abs(lit): lit > 0 for lit in entry.get("model", [])}
+
+def store_verdict(digest: str, result: str, model: Dict[int, bool], solver: str,
+                  cache_dir: Optional[str] = None):
+    """Caches the verdict and model (as DIMACS literals) of a formula."""
+    path = _verdict_path(digest, cache_dir)
+    entry = {"version": VERDICT_VERSION, "result": result, "solver": solver,
+             "model": [v if val else -v for v, val in sorted(model.items())]}
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path) # Atomic, so parallel workers never see half a file
+    except OSError:
+        pass # A read-only cache location only costs speed
+
+def reference_verdict(num_vars: int, matrix: np.ndarray, cache: bool = True,
+                      cache_dir: Optional[str] = None) -> Tuple[str, Dict[int, bool], str]:
+    """
+    Reference (result, model, source) for a literal matrix. source is "cache"
+    when the verdict was cached, else the solver that produced it. UNSAT
+    models are empty.
+    """
+    digest = formula_digest(num_vars, matrix) if cache else None
+    if digest:
+        hit = load_verdict(digest, cache_dir)
+        if hit is not None and (hit[0] == "UNSAT" or satisfies(matrix, hit[1])):
+            return hit[0], hit[1], "cache"
+
+    from dimacs import matrix_to_clauses
+    clauses = matrix_to_clauses(matrix)
+    if USE_PYSAT:
+        with Glucose3() as solver:
+            for clause in clauses:
+                solver.add_clause(clause)
+            sat = solver.solve()
+            result = "SAT" if sat else "UNSAT"
+            model = {abs(lit): lit > 0 for lit in solver.get_model()} if sat else {}
+    else:
+        result, model = solve_reference(num_vars, clauses)
+
+    if digest:
+        store_verdict(digest, result, model, REFERENCE_NAME, cache_dir)
+    return result, model, REFERENCE_NAME
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+    from dimacs import load_dimacs
+
+    parser = argparse.ArgumentParser(description="Print the reference verdict of each CNF.")
+    parser.add_argument("cnf", nargs="+")
+    parser.add_argument("--no-cache", action="store_true", help="always solve; do not read or write the verdict cache")
+    parser.add_argument("--cache-dir", default=None, help=f"verdict cache directory (default: {DEFAULT_VERDICT_DIR})")
+    args = parser.parse_args()
+
+    status = 0
+    for path in args.cnf:
+        num_vars, matrix = load_dimacs(path)
+        t = time.perf_counter()
+        result, model, source = reference_verdict(num_vars, matrix, cache=not args.no_cache, cache_dir=args.cache_dir)
+        if result == "SAT" and not satisfies(matrix, model):
+            result, status = "SAT (invalid model)", 1
+        print(f"{os.path.basename(path):<28} {result:<6} {time.perf_counter() - t:>9.3f} s  ({source})")
+    sys.exit(status)
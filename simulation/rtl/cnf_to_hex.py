@@ -1,48 +1,84 @@
 import sys
 import os
+import numpy as np
 
-def parse_dimacs(file_path):
-    with open(file_path, 'r') as f:
-        content = f.read()
-    clauses = []
-    num_vars = 0
-    for line in content.splitlines():
-        line = line.strip()
-        if not line or line.startswith('c'): continue
-        if line.startswith('p cnf'):
-            parts = line.split()
-            num_vars = int(parts[2])
-            continue
-        parts = [int(x) for x in line.split()]
-        if parts and parts[-1] == 0: parts.pop()
-        if parts: clauses.append(parts)
-    return num_vars, clauses
-
-def write_hex(clauses, num_vars, filename, cols=4, lit_width=6):
+# Share the simulation's DIMACS loader (and its parse cache)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dimacs import clauses_to_matrix, load_dimacs
+
+# Defaults of tb_sat_node.sv; smaller problems are padded up to them
+MIN_COLS = 4
+MIN_LIT_WIDTH = 6
+HEX_DIGITS = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+
+def hex_geometry(matrix, num_vars, cols=None, lit_width=None):
+    """
+    (COLS_PER_ROW, LIT_WIDTH) for a literal matrix. Unset values are chosen to
+    fit: the widest clause and the largest literal 2*num_vars+1, but never
+    below the testbench defaults. Explicit values that are too small raise
+    ValueError instead of truncating clauses or literals.
+    """
+    width = matrix.shape[1] if matrix.ndim == 2 else 0
+    max_lit = max(int(matrix.max(initial=0)), 2 * num_vars + 1)
+    if cols is None:
+        cols = max(MIN_COLS, width)
+    if lit_width is None:
+        lit_width = max(MIN_LIT_WIDTH, max_lit.bit_length())
+    if width > cols and np.count_nonzero(matrix[:, cols:]):
+        raise ValueError(f"A clause has {width} literals but rows hold COLS_PER_ROW={cols}")
+    if max_lit >= 1 << lit_width:
+        raise ValueError(f"Literal {max_lit} does not fit in LIT_WIDTH={lit_width} bits")
+    return cols, lit_width
+
+def pack_hex(matrix, cols, lit_width):
+    """
+    Packs every row into one COLS_PER_ROW*LIT_WIDTH-bit word, column 0 in the
+    lowest bits, and returns the $readmemh text: one line of
+    ceil(cols*lit_width/4) hex digits per row. Fully vectorized: the literals
+    are unpacked into a bit matrix, regrouped into nibbles and mapped to ASCII.
+    """
+    rows = len(matrix)
+    padded = np.zeros((rows, cols), dtype="<u8")
+    padded[:, :matrix.shape[1]] = matrix
+    bits = np.unpackbits(padded.view(np.uint8).reshape(rows, cols, 8), axis=2, bitorder="little")
+    bits = bits[:, :, :lit_width].reshape(rows, cols * lit_width)
+    digits = -(-cols * lit_width // 4)
+    bits = np.pad(bits, ((0, 0), (0, 4 * digits - bits.shape[1])))
+    nibbles = bits.reshape(rows, digits, 4) @ np.array([1, 2, 4, 8], dtype=np.uint8)
+    text = np.empty((rows, digits + 1), dtype=np.uint8)
+    text[:, :digits] = HEX_DIGITS[nibbles[:, ::-1]] # Most significant digit first
+    text[:, digits] = ord("\n")
+    return text.tobytes().decode("ascii")
+
+def write_hex(clauses, num_vars, filename, cols=None, lit_width=None):
+    """
+    Writes a problem as the static memory hex file. `clauses` is a literal
+    matrix (see dimacs.load_dimacs) or a list of DIMACS clauses. Returns the
+    (COLS_PER_ROW, LIT_WIDTH) the image must be compiled with (see hex_geometry).
+    """
+    matrix = clauses if isinstance(clauses, np.ndarray) else clauses_to_matrix(clauses)
+    if matrix.ndim != 2:
+        matrix = matrix.reshape(len(matrix), -1)
+    cols, lit_width = hex_geometry(matrix, num_vars, cols, lit_width)
     with open(filename, 'w') as f:
-        for clause in clauses:
-            row_val = 0
-            for i in range(cols):
-                lit_val = 0
-                if i < len(clause):
-                    raw_lit = clause[i]
-                    if raw_lit > 0:
-                        lit_val = 2 * raw_lit
-                    else:
-                        lit_val = 2 * abs(raw_lit) + 1
-                row_val |= (lit_val << (i * lit_width))
-            
-            # Format as hex (24 bits = 6 hex digits)
-            f.write(f"{row_val:06X}\n")
+        f.write(pack_hex(matrix, cols, lit_width))
+    return cols, lit_width
 
 if __name__ == "__main__":
     if len(sys.argv) < 3:
-        print("Usage: python3 cnf_to_hex.py <input.cnf> <output.hex>")
+        print("Usage: python3 cnf_to_hex.py <input.cnf> <output.hex> [lit_width] [cols_per_row]")
         sys.exit(1)
-    
+
     input_file = sys.argv[1]
     output_file = sys.argv[2]
-    
-    n_vars, cls = parse_dimacs(input_file)
-    write_hex(cls, n_vars, output_file)
-    print(f"Converted {input_file} ({n_vars} vars, {len(cls)} clauses) to {output_file}")
+    lit_width = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    cols = int(sys.argv[4]) if len(sys.argv) > 4 else None
+
+    n_vars, matrix = load_dimacs(input_file)
+    try:
+        cols, lit_width = write_hex(matrix, n_vars, output_file, cols=cols, lit_width=lit_width)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Converted {input_file} ({n_vars} vars, {len(matrix)} clauses) to {output_file} "
+          f"(COLS_PER_ROW={cols}, LIT_WIDTH={lit_width})")
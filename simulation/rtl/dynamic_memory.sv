@@ -1,28 +1,36 @@
 module dynamic_memory #(
     parameter NUM_ROWS = 32,
-    parameter COLS_PER_ROW = 4
+    parameter COLS_PER_ROW = 4,
+    parameter LANES = 1,
+    // Rows per bank; row r is word r / LANES of bank r % LANES, as in static_memory
+    parameter BANK_ROWS = (NUM_ROWS + LANES - 1) / LANES
 ) (
-    input  logic                        clk,
-    input  logic                        rst,
-    input  logic [$clog2(NUM_ROWS)-1:0] addr,
-    input  logic                        we,
-    input  logic [COLS_PER_ROW-1:0]     wdata,
-    output logic [COLS_PER_ROW-1:0]     rdata
+    input  logic                                  clk,
+    input  logic                                  rst,
+    input  logic [$clog2(NUM_ROWS)-1:0]           addr, // First row of the beat, a multiple of LANES
+    input  logic [LANES-1:0]                      we,   // Per slot, gated by lane_arbiter's commit mask
+    input  logic [LANES-1:0][COLS_PER_ROW-1:0]    wdata,
+    output logic [LANES-1:0][COLS_PER_ROW-1:0]    rdata
 );
 
-    logic [COLS_PER_ROW-1:0] memory [0:NUM_ROWS-1];
+    logic [COLS_PER_ROW-1:0] bank [0:LANES-1][0:BANK_ROWS-1];
 
-    // Async Read with reset override
-    assign rdata = rst ? {COLS_PER_ROW{1'b0}} : memory[addr];
+    genvar l;
+    generate
+        for (l = 0; l < LANES; l++) begin : g_bank
+            // Async Read with reset override
+            assign rdata[l] = rst ? {COLS_PER_ROW{1'b0}} : bank[l][addr / LANES];
 
-    always_ff @(posedge clk) begin
-        if (rst) begin
-            for (int i = 0; i < NUM_ROWS; i++) begin
-                memory[i] <= {COLS_PER_ROW{1'b0}};
+            always_ff @(posedge clk) begin
+                if (rst) begin
+                    for (int i = 0; i < BANK_ROWS; i++) begin
+                        bank[l][i] <= {COLS_PER_ROW{1'b0}};
+                    end
+                end else if (we[l]) begin
+                    bank[l][addr / LANES] <= wdata[l];
+                end
             end
-        end else if (we) begin
-            memory[addr] <= wdata;
         end
-    end
+    endgenerate
 
-endmodule
\ No newline at end of file
+endmodule
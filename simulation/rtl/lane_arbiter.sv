@@ -0,0 +1,53 @@
+module lane_arbiter #(
+    parameter LANES = 1,
+    parameter NUM_VARS = 16,
+    parameter LIT_WIDTH = 6,
+    parameter SLOT_WIDTH = (LANES > 1) ? $clog2(LANES) : 1
+) (
+    // Slot i is row row_ptr + i of the beat, read from bank i, with its own
+    // comparator, clause evaluator and unit detector.
+    input  logic [LANES-1:0]                 valid,
+    input  logic [LANES-1:0]                 conflict,
+    input  logic [LANES-1:0]                 unit,
+    input  logic [LANES-1:0][LIT_WIDTH-1:0]  forced_lit, // Literal a unit row forces True
+    input  logic [NUM_VARS:1]                assigned,
+
+    output logic [LANES-1:0]                 commit,     // Dynamic memory write enables
+    output logic [LANES-1:0]                 imply,      // New implications, pushed in slot order
+    output logic                             stop,       // Conflict: the sweep ends at stop_slot
+    output logic [SLOT_WIDTH-1:0]            stop_slot
+);
+
+    // Merges the events of a beat exactly as if its visits ran one per cycle
+    // (SatNode lanes model): slots commit in order up to and including the
+    // first conflict, and later slots are squashed. A unit row implies its
+    // literal unless the variable is assigned or implied by an earlier slot,
+    // just as the one-lane FSM skips a unit row whose variable is assigned.
+
+    always_comb begin
+        commit = '0;
+        imply = '0;
+        stop = 1'b0;
+        stop_slot = '0;
+
+        for (int i = 0; i < LANES; i++) begin
+            logic [$clog2(NUM_VARS+1)-1:0] u_var;
+            logic taken;
+            if (valid[i] && !stop) begin
+                commit[i] = 1'b1;
+                if (conflict[i]) begin
+                    stop = 1'b1;
+                    stop_slot = i;
+                end else if (unit[i]) begin
+                    u_var = forced_lit[i] >> 1;
+                    taken = assigned[u_var];
+                    for (int j = 0; j < i; j++) begin
+                        if (imply[j] && (forced_lit[j] >> 1) == u_var) taken = 1'b1;
+                    end
+                    imply[i] = !taken;
+                end
+            end
+        end
+    end
+
+endmodule
@@ -3,12 +3,19 @@ module sat_node #(
     parameter COLS_PER_ROW = 4,
     parameter NUM_VARS = 16,
     parameter LIT_WIDTH = 6,
-    parameter INIT_FILE = "problem.hex"
+    parameter INIT_FILE = "problem.hex",
+    // Rows visited per PROPAGATE beat, each from its own memory bank
+    parameter LANES = 1,
+    parameter SLOT_WIDTH = (LANES > 1) ? $clog2(LANES) : 1
 ) (
     input  logic        clk,
     input  logic        rst_n,
     input  logic        start,
     
+    // Problem size at runtime; must not exceed NUM_ROWS / NUM_VARS
+    input  logic [$clog2(NUM_ROWS+1)-1:0] active_rows,
+    input  logic [$clog2(NUM_VARS+1)-1:0] active_vars,
+    
     output logic        done,
     output logic        result_sat, // 1=SAT, 0=UNSAT
     output logic [NUM_VARS:1] assigned,
@@ -37,9 +44,9 @@ module sat_node #(
 
     // --- Sub-modules ---
 
-    // Static Memory (Async Read)
-    logic [COLS_PER_ROW*LIT_WIDTH-1:0] static_row;
-    static_memory #(NUM_ROWS, COLS_PER_ROW, LIT_WIDTH, INIT_FILE) static_mem (
+    // Static Memory (Async Read), slot i holding row row_ptr + i
+    logic [LANES-1:0][COLS_PER_ROW*LIT_WIDTH-1:0] static_row;
+    static_memory #(NUM_ROWS, COLS_PER_ROW, LIT_WIDTH, INIT_FILE, LANES) static_mem (
         .clk(clk),
         .addr(row_ptr),
         .row_out(static_row)
@@ -47,15 +54,15 @@ module sat_node #(
 
     // Dynamic Memory (Async Read)
     logic dyn_rst;
-    logic dyn_we;
-    logic [COLS_PER_ROW-1:0] dyn_wdata;
-    logic [COLS_PER_ROW-1:0] dyn_rdata;
+    logic [LANES-1:0] dyn_we;
+    logic [LANES-1:0][COLS_PER_ROW-1:0] dyn_wdata;
+    logic [LANES-1:0][COLS_PER_ROW-1:0] dyn_rdata;
     
     always_ff @(posedge clk) begin 
         delayed_row_ptr <= row_ptr;
     end
 
-    dynamic_memory #(NUM_ROWS, COLS_PER_ROW) dyn_mem (
+    dynamic_memory #(NUM_ROWS, COLS_PER_ROW, LANES) dyn_mem (
         .clk(clk),
         .rst(dyn_rst | rst),
         .addr(row_ptr),
@@ -91,7 +98,13 @@ module sat_node #(
     
     assign assigned = am_out_assigned;
     assign values   = am_out_values;
-    assign h_assigned = am_out_assigned;
+    
+    // Variables above active_vars look assigned so they are never decided
+    logic [NUM_VARS:1] var_unused;
+    always_comb begin
+        for (int i = 1; i <= NUM_VARS; i++) var_unused[i] = (i > active_vars);
+    end
+    assign h_assigned = am_out_assigned | var_unused;
     
     assignment_manager #(NUM_VARS) am (
         .clk(clk),
@@ -134,31 +147,78 @@ module sat_node #(
     logic [LIT_WIDTH-1:0] current_prop_literal;
     logic                 prop_lit_valid; 
 
-    logic [COLS_PER_ROW-1:0] match_mask;
-    comparator #(COLS_PER_ROW, LIT_WIDTH) comp (
-        .static_row(static_row),
-        .target_literal(current_prop_literal),
-        .match_mask(match_mask)
-    );
-    
-    assign dyn_wdata = dyn_rdata | match_mask;
-    
-    logic conflict_detected;
-    clause_evaluator #(COLS_PER_ROW, LIT_WIDTH) evaluator (
-        .static_row(static_row),
-        .dynamic_row(dyn_wdata), 
-        .conflict(conflict_detected)
-    );
-    
-    logic [LIT_WIDTH-1:0] unit_forced_lit;
-    logic unit_detected;
-    unit_detector #(COLS_PER_ROW, LIT_WIDTH) u_det (
-        .static_row(static_row),
-        .dynamic_row(dyn_wdata), 
-        .forced_literal(unit_forced_lit),
-        .is_unit(unit_detected)
+    // One comparator, clause evaluator and unit detector per slot
+    logic [LANES-1:0] slot_valid;
+    logic [LANES-1:0] conflict_detected;
+    logic [LANES-1:0] unit_detected;
+    logic [LANES-1:0][LIT_WIDTH-1:0] unit_forced_lit;
+
+    genvar g;
+    generate
+        for (g = 0; g < LANES; g++) begin : g_slot
+            logic [COLS_PER_ROW-1:0] match_mask;
+            comparator #(COLS_PER_ROW, LIT_WIDTH) comp (
+                .static_row(static_row[g]),
+                .target_literal(current_prop_literal),
+                .match_mask(match_mask)
+            );
+
+            assign dyn_wdata[g] = dyn_rdata[g] | match_mask;
+
+            clause_evaluator #(COLS_PER_ROW, LIT_WIDTH) evaluator (
+                .static_row(static_row[g]),
+                .dynamic_row(dyn_wdata[g]),
+                .conflict(conflict_detected[g])
+            );
+
+            unit_detector #(COLS_PER_ROW, LIT_WIDTH) u_det (
+                .static_row(static_row[g]),
+                .dynamic_row(dyn_wdata[g]),
+                .forced_literal(unit_forced_lit[g]),
+                .is_unit(unit_detected[g])
+            );
+
+            // Slot 0 is always visited, so an empty problem still reads row 0
+            assign slot_valid[g] = (g == 0) || (row_ptr + g < active_rows);
+        end
+    endgenerate
+
+    // Lane Arbiter: orders the beat's conflicts and implications by slot
+    logic [LANES-1:0] arb_commit;
+    logic [LANES-1:0] arb_imply;
+    logic arb_stop;
+    logic [SLOT_WIDTH-1:0] arb_stop_slot;
+
+    lane_arbiter #(LANES, NUM_VARS, LIT_WIDTH) arbiter (
+        .valid(slot_valid),
+        .conflict(conflict_detected),
+        .unit(unit_detected),
+        .forced_lit(unit_forced_lit),
+        .assigned(am_out_assigned),
+        .commit(arb_commit),
+        .imply(arb_imply),
+        .stop(arb_stop),
+        .stop_slot(arb_stop_slot)
     );
 
+    // The assignment manager and queue take one implication per cycle, so the
+    // unit stage commits the beat's implications lowest slot first and stays
+    // on the beat until imply_pending is drained
+    logic [LANES-1:0] imply_pending;
+    logic             imply_draining;
+    logic [LANES-1:0] imply_todo;
+    logic [LANES-1:0] imply_rest;
+    logic [SLOT_WIDTH-1:0] imply_slot;
+
+    always_comb begin
+        imply_todo = imply_draining ? imply_pending : arb_imply;
+        imply_rest = imply_todo & (imply_todo - 1); // Lowest set bit cleared
+        imply_slot = '0;
+        for (int i = LANES - 1; i >= 0; i--) begin
+            if (imply_todo[i]) imply_slot = i;
+        end
+    end
+
     // --- Helpers ---
     function logic [LIT_WIDTH-1:0] make_lit(input int v, input logic val);
         return (val) ? ((v << 1) + 1) : (v << 1); 
@@ -204,6 +264,8 @@ module sat_node #(
             pq_rst <= 0;
             pipeline_valid <= 0;
             queue_wait <= 0;
+            imply_pending <= 0;
+            imply_draining <= 0;
         end else begin
             am_assign <= 0;
             am_pop <= 0;
@@ -249,34 +311,41 @@ module sat_node #(
                         end
                     end else begin
                         if (!pipeline_valid) begin
-                            if (conflict_detected) begin
+                            // A conflict anywhere in the beat backtracks. The
+                            // slots before it are not committed: BACKTRACK
+                            // would pop their implications again anyway.
+                            if (arb_stop) begin
                                 st <= ST_BACKTRACK;
                                 prop_lit_valid <= 0;
                             end else begin
-                                dyn_we <= 1;
+                                dyn_we <= arb_commit;
                                 pipeline_valid <= 1;
                             end
                         end else begin
-                            if (unit_detected) begin
-                                logic [LIT_WIDTH-1:0] forced_L = unit_forced_lit;
+                            if (imply_todo != 0) begin
+                                logic [LIT_WIDTH-1:0] forced_L = unit_forced_lit[imply_slot];
                                 logic [LIT_WIDTH-1:0] false_L = negate_lit(forced_L);
                                 logic [$clog2(NUM_VARS+1)-1:0] u_var = forced_L >> 1;
                                 logic u_val = forced_L[0];
-                                if (!am_out_assigned[u_var]) begin
-                                    am_assign <= 1;
-                                    am_var <= u_var;
-                                    am_val <= u_val;
-                                    am_forced <= 1;
-                                    pq_push <= 1;
-                                    pq_din <= false_L;
-                                end
+                                am_assign <= 1;
+                                am_var <= u_var;
+                                am_val <= u_val;
+                                am_forced <= 1;
+                                pq_push <= 1;
+                                pq_din <= false_L;
                             end
                             
-                            if (row_ptr == NUM_ROWS - 1) begin
-                                prop_lit_valid <= 0;
+                            if (imply_rest != 0) begin
+                                imply_pending <= imply_rest;
+                                imply_draining <= 1;
                             end else begin
-                                row_ptr <= row_ptr + 1;
-                                pipeline_valid <= 0;
+                                imply_draining <= 0;
+                                if (row_ptr + LANES >= active_rows) begin
+                                    prop_lit_valid <= 0;
+                                end else begin
+                                    row_ptr <= row_ptr + LANES;
+                                    pipeline_valid <= 0;
+                                end
                             end
                         end
                     end
@@ -309,7 +378,7 @@ module sat_node #(
                 end
                 
                 ST_REBUILD_QUEUE: begin
-                    if (rebuild_ptr > NUM_VARS) begin
+                    if (rebuild_ptr > active_vars) begin
                         st <= ST_PROPAGATE;
                         prop_lit_valid <= 0;
                         queue_wait <= 1;
@@ -335,4 +404,57 @@ module sat_node #(
         end
     end
 
+`ifdef TRACE_MODE
+    // One line per cycle for verify_all.py, which rebuilds the Python model's
+    // counters from it: st = internal_state_t code, ev = what this cycle does,
+    // qd / sd = propagation queue / assignment stack depth. TRACE_STATE adds
+    // the assignments and queue contents for lockstep co-simulation.
+    logic [$clog2(NUM_VARS+1)-1:0] trace_unit_var;
+    assign trace_unit_var = unit_forced_lit[imply_slot] >> 1;
+
+    always @(posedge clk) begin
+        if (!rst) begin
+            $write("TRACE cyc=%0d st=%0d ", cycle_count, st);
+            case (st)
+                ST_DECIDE:
+                    if (h_valid) $write("ev=decide var=%0d lit=%0d", h_next_var, make_lit(h_next_var, 0));
+                    else         $write("ev=sat");
+                ST_PROPAGATE:
+                    if (!prop_lit_valid) begin
+                        if (queue_wait)    $write("ev=wait");
+                        else if (pq_empty) $write("ev=drained");
+                        else               $write("ev=lit lit=%0d", pq_dout);
+                    end else if (!pipeline_valid) begin
+                        if (arb_stop) $write("ev=conflict row=%0d lit=%0d", row_ptr + arb_stop_slot, current_prop_literal);
+                        else          $write("ev=read row=%0d lit=%0d", row_ptr, current_prop_literal);
+                    end else begin
+                        if (imply_todo != 0)
+                            $write("ev=imply row=%0d lit=%0d var=%0d", row_ptr + imply_slot, current_prop_literal, trace_unit_var);
+                        else
+                            $write("ev=row row=%0d lit=%0d", row_ptr, current_prop_literal);
+                        $write(" end=%0d", imply_rest == 0 && row_ptr + LANES >= active_rows);
+                    end
+                ST_BACKTRACK:
+                    if (am_stack_empty)     $write("ev=unsat");
+                    else if (am_pop_forced) $write("ev=unassign var=%0d", am_pop_var);
+                    else                    $write("ev=flip var=%0d", am_pop_var);
+                ST_FLIP_DECISION: $write("ev=assign var=%0d", bt_var);
+                ST_REBUILD_QUEUE: $write("ev=rebuild var=%0d", rebuild_ptr);
+                default:          $write("ev=idle");
+            endcase
+            $write(" qd=%0d sd=%0d", pq.count, am.stack_ptr);
+`ifdef TRACE_STATE
+            // Full architectural state for cosim.py: assigned / value bit
+            // vectors (hex, bit i = var i) and the queue from head to tail.
+            $write(" as=%h vs=%h q=", am_out_assigned, am_out_values);
+            for (int i = 0; i < pq.count; i++) begin
+                if (i) $write(",");
+                $write("%0d", pq.mem[(pq.head + i) % (NUM_VARS*2)]);
+            end
+`endif
+            $display("");
+        end
+    end
+`endif
+
 endmodule
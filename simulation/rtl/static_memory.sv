@@ -2,24 +2,41 @@ module static_memory #(
     parameter NUM_ROWS = 32,
     parameter COLS_PER_ROW = 4,
     parameter LIT_WIDTH = 6,
-    parameter INIT_FILE = "problem.hex"
+    parameter INIT_FILE = "problem.hex",
+    parameter LANES = 1,
+    // Rows per bank; row r is word r / LANES of bank r % LANES
+    parameter BANK_ROWS = (NUM_ROWS + LANES - 1) / LANES
 ) (
-    input  logic                               clk, // clk not used for async read
-    input  logic [$clog2(NUM_ROWS)-1:0]        addr,
-    output logic [COLS_PER_ROW*LIT_WIDTH-1:0]  row_out
+    input  logic                                          clk, // clk not used for async read
+    input  logic [$clog2(NUM_ROWS)-1:0]                   addr, // First row of the beat, a multiple of LANES
+    output logic [LANES-1:0][COLS_PER_ROW*LIT_WIDTH-1:0]  row_out // Slot i is row addr + i
 );
 
     logic [COLS_PER_ROW*LIT_WIDTH-1:0] memory [0:NUM_ROWS-1];
+    logic [COLS_PER_ROW*LIT_WIDTH-1:0] bank [0:LANES-1][0:BANK_ROWS-1];
+
+    // +HEX=<file> overrides INIT_FILE, so one compiled image can load any problem
+    string init_file;
 
     initial begin
         for (int i = 0; i < NUM_ROWS; i++) memory[i] = 0;
-        if (INIT_FILE != "") begin
-            $readmemh(INIT_FILE, memory);
-            $display("[RTL] StaticMemory loaded from %s. Row 0: %h", INIT_FILE, memory[0]);
+        if (!$value$plusargs("HEX=%s", init_file)) init_file = INIT_FILE;
+        if (init_file != "") begin
+            $readmemh(init_file, memory);
+            $display("[RTL] StaticMemory loaded from %s. Row 0: %h", init_file, memory[0]);
         end
+        // The hex file is dealt out over the banks, one read port each
+        for (int l = 0; l < LANES; l++)
+            for (int w = 0; w < BANK_ROWS; w++)
+                bank[l][w] = (w * LANES + l < NUM_ROWS) ? memory[w * LANES + l] : '0;
     end
 
-    // Async Read
-    assign row_out = memory[addr];
+    // Async Read: every bank reads the same word, so a beat gets LANES consecutive rows
+    genvar l;
+    generate
+        for (l = 0; l < LANES; l++) begin : g_bank
+            assign row_out[l] = bank[l][addr / LANES];
+        end
+    endgenerate
 
 endmodule
@@ -1,6 +1,8 @@
 module tb_sat_node;
 
-    // Parameters with defaults, overridable by compiler flags
+    // Maximum problem size, overridable by compiler flags. The actual size
+    // comes from +ROWS=<n> +VARS=<n> at runtime (default: the maximum) and
+    // the problem from +HEX=<file> (default: INIT_FILE).
     `ifdef NUM_ROWS
         localparam NUM_ROWS = `NUM_ROWS;
     `else
@@ -25,6 +27,13 @@ module tb_sat_node;
         localparam LIT_WIDTH = 6;
     `endif
 
+    // Rows visited per PROPAGATE beat
+    `ifdef LANES
+        localparam LANES = `LANES;
+    `else
+        localparam LANES = 1;
+    `endif
+
     `ifdef INIT_FILE
         localparam string INIT_FILE = `INIT_FILE;
     `else
@@ -41,6 +50,8 @@ module tb_sat_node;
     logic [NUM_VARS:1] values;
     logic [31:0] cycle_count;
     logic [2:0] state_out;
+    logic [$clog2(NUM_ROWS+1)-1:0] active_rows;
+    logic [$clog2(NUM_VARS+1)-1:0] active_vars;
 
     // Instantiate DUT
     sat_node #(
@@ -48,11 +59,14 @@ module tb_sat_node;
         .COLS_PER_ROW(COLS_PER_ROW),
         .NUM_VARS(NUM_VARS),
         .LIT_WIDTH(LIT_WIDTH),
-        .INIT_FILE(INIT_FILE)
+        .INIT_FILE(INIT_FILE),
+        .LANES(LANES)
     ) dut (
         .clk(clk),
         .rst_n(rst_n),
         .start(start),
+        .active_rows(active_rows),
+        .active_vars(active_vars),
         .done(done),
         .result_sat(result_sat),
         .assigned(assigned),
@@ -74,6 +88,20 @@ module tb_sat_node;
             $dumpvars(0, tb_sat_node);
         `endif
 
+        // Runtime problem size
+        begin
+            int rows_arg, vars_arg;
+            if (!$value$plusargs("ROWS=%d", rows_arg)) rows_arg = NUM_ROWS;
+            if (!$value$plusargs("VARS=%d", vars_arg)) vars_arg = NUM_VARS;
+            if (rows_arg > NUM_ROWS || vars_arg > NUM_VARS) begin
+                $display("RESULT: ERROR (problem %0d rows / %0d vars exceeds compiled %0d / %0d)",
+                         rows_arg, vars_arg, NUM_ROWS, NUM_VARS);
+                $finish;
+            end
+            active_rows = rows_arg;
+            active_vars = vars_arg;
+        end
+
         // Initialize
         rst_n = 0;
         start = 0;
@@ -98,7 +126,7 @@ module tb_sat_node;
         
         if (result_sat) begin
             $write("ASSIGNMENTS: ");
-            for (int i = 1; i <= NUM_VARS; i++) begin
+            for (int i = 1; i <= active_vars; i++) begin
                 $write("%b", values[i]);
             end
             $display(""); // Newline
@@ -1,5 +1,37 @@
+import os
+import time
 import numpy as np
 from typing import Tuple, List, Optional, Dict
+from counters import NodeCounters
+from checkpoint import read_checkpoint, write_checkpoint
+from cycle_trace import CycleTrace
+from heuristics import HEURISTICS, POLARITIES, HeuristicEngine, make_heuristic
+from learning import EVICTIONS, Analysis, ConflictAnalyzer, LearnedRegion
+from propagation_queue import OVERFLOWS, PropagationQueue
+
+# Row masks are packed one bit per slot into little-endian uint8 words: bit j of
+# word k is slot 8*k + j, so a row of up to 8 slots is a single word, exactly
+# like the RTL row_mask_t.
+POPCOUNT = np.array([bin(b).count("1") for b in range(256)], dtype=np.uint8)
+LOWEST_BIT = np.array([(b & -b).bit_length() - 1 for b in range(256)], dtype=np.int8)
+
+def pack_row_mask(bits: np.ndarray) -> np.ndarray:
+    """Packs a boolean (..., cols) slot mask into (..., ceil(cols/8)) uint8 words."""
+    return np.packbits(bits, axis=-1, bitorder='little')
+
+def unpack_row_mask(words: np.ndarray, num_cols: int) -> np.ndarray:
+    """Inverse of pack_row_mask, as a 0/1 int array (debug view)."""
+    return np.unpackbits(words, axis=-1, count=num_cols, bitorder='little').astype(int)
+
+# Block RAM estimates: (depth, width) shapes of a Xilinx RAMB36 in simple
+# dual-port mode. A memory takes the cheapest tiling of one shape.
+RAMB36_SHAPES = ((32768, 1), (16384, 2), (8192, 4), (4096, 9), (2048, 18), (1024, 36), (512, 72))
+
+def ramb36_blocks(depth: int, width: int) -> int:
+    """RAMB36 blocks holding a depth x width-bit memory."""
+    if depth <= 0 or width <= 0:
+        return 0
+    return min(-(-depth // d) * -(-width // w) for d, w in RAMB36_SHAPES)
 
 class StaticMemory:
     """
@@ -8,76 +40,438 @@ class StaticMemory:
     Stores a static representation of the entire problem (Array of Literal IDs).
     N Clauses per row, M rows.
     Literal encoding: 2*var for positive, 2*var + 1 for negative. 0 is padding.
+
+    At load time a literal -> row occurrence index is built in CSR form
+    (occurrence_offsets / occurrence_rows), mirroring an index RAM next to the
+    clause RAM. When a skip list is loaded, the row pointer becomes a skip
+    counter that walks only the listed rows instead of 0..active_rows-1.
+
+    With spare_rows > 0, that many empty rows follow the problem clauses and
+    add_rows() fills them with new clauses of up to spare_width literals (or
+    the problem's widest clause, if wider). With learned_rows > 0, that many
+    empty rows of at least learned_width slots are reserved after them for
+    learned clauses. problem_rows is the size of the clause region, spare
+    rows included, and clause_rows the part of it in use. A scan only visits
+    the clause rows and, once there are any, up to the last learned row.
+
+    With lanes = B > 1 the rows are interleaved over B banks (row r is word
+    r // B of bank r % B), each with its own dynamic memory slice,
+    comparator, clause evaluator and unit detector. Visits are still issued
+    in sweep order, but one cycle (a beat) takes consecutive visits as long
+    as they fall in distinct banks, at most B. A full scan therefore costs
+    ceil(rows / B) cycles; a skip list costs one beat per run of visits
+    without a bank collision. beats holds the beat of every skip list visit.
     """
-    def __init__(self, literal_matrix: np.ndarray):
+    def __init__(self, literal_matrix: np.ndarray, learned_rows: int = 0, learned_width: int = 0,
+                 spare_rows: int = 0, spare_width: int = 0, lanes: int = 1):
+        rows, cols = literal_matrix.shape
+        if learned_rows or spare_rows:
+            width = max(cols, learned_width if learned_rows else 0, spare_width if spare_rows else 0)
+            memory = np.zeros((rows + spare_rows + learned_rows, width), dtype=literal_matrix.dtype)
+            memory[:rows, :cols] = literal_matrix
+            literal_matrix = memory
         self.memory = literal_matrix
         self.num_rows, self.num_cols = literal_matrix.shape
+        self.problem_rows = self.num_rows - learned_rows
+        self.clause_rows = rows # Clause rows in use; the rest of the clause region is spare
+        self.active_rows = rows # Rows a full scan visits
         self.row_pointer = 0
+        self.skip_rows = None # Rows walked by the skip counter (None = full scan)
+        self.lanes = lanes
+        self.beats = None # Beat of each skip list visit (lanes > 1)
+        self.active_mask = pack_row_mask(literal_matrix != 0) # Non-padding slots
+        self._build_occurrence_index()
+
+    def _build_occurrence_index(self):
+        clauses = self.memory[:self.clause_rows]
+        rows, cols = np.nonzero(clauses)
+        lits = clauses[rows, cols].astype(np.int64)
+        # Sort by (literal, row) and drop repeated literals within a row
+        keys = np.unique(lits * max(self.num_rows, 1) + rows)
+        lits, rows = np.divmod(keys, max(self.num_rows, 1))
+        max_lit = int(lits.max()) if len(lits) else 1
+        counts = np.bincount(lits, minlength=max_lit + 1)
+        self.occurrence_offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.occurrence_rows = rows
+        # Single-literal rows are unit from the start and never contain a literal
+        # that is propagated as False, so every skip list must include them.
+        self.unit_rows = np.flatnonzero(np.count_nonzero(clauses, axis=1) == 1)
+
+    def occurrences(self, literal: int) -> np.ndarray:
+        """Rows containing `literal`, in ascending order."""
+        if not 0 <= literal < len(self.occurrence_offsets) - 1:
+            return self.occurrence_rows[:0]
+        lo, hi = self.occurrence_offsets[literal], self.occurrence_offsets[literal + 1]
+        return self.occurrence_rows[lo:hi]
+
+    def skip_list(self, literal: int) -> np.ndarray:
+        """Problem rows that must be visited when `literal` becomes False."""
+        rows = self.occurrences(literal)
+        if len(self.unit_rows):
+            rows = np.union1d(rows, self.unit_rows)
+        return rows
+
+    def batch_skip_list(self, literals: List[int]) -> np.ndarray:
+        """Problem rows that must be visited when all of `literals` become False."""
+        if len(literals) == 1:
+            return self.skip_list(literals[0])
+        return np.unique(np.concatenate([self.skip_list(literal) for literal in literals]))
+
+    def load_skip_list(self, literals: List[int]):
+        rows = self.batch_skip_list(literals)
+        if self.active_rows > self.problem_rows:
+            # Learned rows are matched directly, like a CAM next to the index RAM
+            learned = self.memory[self.problem_rows:self.active_rows]
+            rows = np.concatenate((rows, self.problem_rows + np.flatnonzero(np.isin(learned, literals).any(axis=1))))
+        self.skip_rows = rows
+        if self.lanes > 1:
+            self.beats = self.issue_beats(rows)
+        self.row_pointer = 0
+
+    def issue_beats(self, rows: np.ndarray) -> np.ndarray:
+        """Beat of every visit to `rows` in order: a bank already used in the beat starts the next one."""
+        beats = np.empty(len(rows), dtype=np.int64)
+        beat, used = 0, 0
+        for i, lane in enumerate((rows % self.lanes).tolist()):
+            if used >> lane & 1:
+                beat, used = beat + 1, 0
+            used |= 1 << lane
+            beats[i] = beat
+        return beats
+
+    def beat_of(self, position: int) -> int:
+        """Beat (cycle of the sweep) of visit `position`."""
+        if self.lanes == 1:
+            return position
+        if self.skip_rows is None:
+            return position // self.lanes
+        return int(self.beats[position])
+
+    def beat_start(self, position: int) -> int:
+        """First visit of the beat of visit `position` (or the sweep length past its end)."""
+        if self.lanes == 1 or position >= self.sweep_length():
+            return position
+        if self.skip_rows is None:
+            return position - position % self.lanes
+        return int(np.searchsorted(self.beats, self.beats[position]))
+
+    def beats_end(self, start: int, budget: int) -> int:
+        """End of the visits that `budget` beats from visit `start` (a beat start) cover."""
+        length = self.sweep_length()
+        if self.lanes == 1:
+            return min(length, start + budget)
+        if self.skip_rows is None:
+            return min(length, start + budget * self.lanes)
+        if start >= length:
+            return length
+        return int(np.searchsorted(self.beats, self.beats[start] + budget))
+
+    def sweep_beats(self, start: int, end: int) -> int:
+        """Cycles spent on visits [start, end) of the current sweep, start being a beat start."""
+        if end <= start:
+            return 0
+        return self.beat_of(end - 1) - self.beat_of(start) + 1
+
+    def count_beats(self, rows: Optional[np.ndarray] = None) -> int:
+        """Cycles one sweep over `rows` (None: a full scan) takes."""
+        if rows is None:
+            return -(-self.active_rows // self.lanes)
+        if self.lanes == 1 or not len(rows):
+            return len(rows)
+        return int(self.issue_beats(rows)[-1]) + 1
+
+    @staticmethod
+    def area_brams(num_rows: int, num_cols: int, lit_width: int, lanes: int = 1) -> int:
+        """RAMB36 estimate of the clause memory split into `lanes` banks."""
+        return lanes * ramb36_blocks(-(-num_rows // lanes), num_cols * lit_width)
+
+    def first_learned_visit(self) -> int:
+        """Position of the first visit past the clause rows (spare or learned) in the current sweep."""
+        if self.skip_rows is None:
+            return self.clause_rows
+        return int(np.searchsorted(self.skip_rows, self.clause_rows))
+
+    def add_rows(self, rows: List[List[int]]):
+        """Writes clauses (lists of literal codes) into the next spare rows and re-indexes."""
+        if self.clause_rows + len(rows) > self.problem_rows:
+            raise ValueError(f"{len(rows)} clauses do not fit in the "
+                             f"{self.problem_rows - self.clause_rows} spare rows left")
+        for literals in rows:
+            if len(literals) > self.num_cols:
+                raise ValueError(f"A clause has {len(literals)} literals but rows hold {self.num_cols}")
+        for literals in rows:
+            row_idx = self.clause_rows
+            self.memory[row_idx] = 0
+            self.memory[row_idx, :len(literals)] = literals
+            self.active_mask[row_idx] = pack_row_mask(self.memory[row_idx] != 0)
+            self.clause_rows += 1
+        self.active_rows = max(self.active_rows, self.clause_rows)
+        self._build_occurrence_index()
+
+    def write_row(self, row_idx: int, literals: List[int]):
+        """Writes a learned clause (or nothing, to free the row) into a learned row."""
+        self.memory[row_idx] = 0
+        self.memory[row_idx, :len(literals)] = literals
+        self.active_mask[row_idx] = pack_row_mask(self.memory[row_idx] != 0)
+        self.active_rows = max(self.active_rows, row_idx + 1)
+
+    def snapshot(self) -> Dict:
+        """Clause rows (learned and added ones included) and pointers, for a SatNode checkpoint."""
+        return {"memory": self.memory.copy(), "clause_rows": self.clause_rows, "active_rows": self.active_rows,
+                "row_pointer": self.row_pointer, "skip_rows": self.skip_rows, "beats": self.beats}
+
+    def restore(self, state: Dict):
+        """Inverse of snapshot(); the slot masks and occurrence index are rebuilt."""
+        self.memory = np.array(state["memory"], dtype=self.memory.dtype) # The problem may be a read-only memmap
+        self.clause_rows = state["clause_rows"]
+        self.active_rows = state["active_rows"]
+        self.row_pointer = state["row_pointer"]
+        self.skip_rows = state.get("skip_rows")
+        self.beats = state.get("beats")
+        self.active_mask = pack_row_mask(self.memory != 0)
+        self._build_occurrence_index()
+
+    def current_row(self) -> int:
+        if self.skip_rows is None:
+            return self.row_pointer
+        return int(self.skip_rows[self.row_pointer])
+
+    def sweep_length(self) -> int:
+        """Number of row visits in the current sweep."""
+        if self.skip_rows is None:
+            return self.active_rows
+        return len(self.skip_rows)
 
     def fetch_row(self, row_idx: int) -> np.ndarray:
         if 0 <= row_idx < self.num_rows:
             return self.memory[row_idx]
         return np.zeros(self.num_cols, dtype=int)
 
+    def fetch_active(self, row_idx: int) -> np.ndarray:
+        if 0 <= row_idx < self.num_rows:
+            return self.active_mask[row_idx]
+        return np.zeros(self.active_mask.shape[1], dtype=np.uint8)
+
     def advance_pointer(self):
         self.row_pointer += 1
         
     def reset_pointer(self):
         self.row_pointer = 0
 
-class ClauseEvaluator:
+class DynamicMemory:
     """
-    Component: Clause Evaluator
+    Component: Dynamic Memory
     
-    Checks if a clause (row) is False (Conflict).
-    A clause is False if ALL its active literals are 1 (False).
+    One "is False" bit per static memory slot, stored as packed uint8 row
+    words (see pack_row_mask). A 10^6 x 4 problem needs 1 MB instead of 32 MB.
     """
-    def evaluate(self, static_row: np.ndarray, dynamic_row: np.ndarray) -> bool:
-        # Literal 0 is padding and is never False.
-        # We only care about slots where static_row != 0.
-        active_mask = (static_row != 0)
-        if not np.any(active_mask):
-            return False # Empty row is not a conflict
-        
-        # A conflict occurs if all active literals are 1.
-        # (dynamic_row[mask] == 1) for all mask
-        is_conflict = np.all(dynamic_row[active_mask] == 1)
-        return is_conflict
+    def __init__(self, num_rows: int, num_cols: int):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.words = np.zeros((num_rows, (num_cols + 7) // 8), dtype=np.uint8)
+
+    @staticmethod
+    def area_brams(num_rows: int, num_cols: int, lanes: int = 1) -> int:
+        """RAMB36 estimate of the bit matrix split into `lanes` banks."""
+        return lanes * ramb36_blocks(-(-num_rows // lanes), num_cols)
+
+    def read(self, row_idx: int) -> np.ndarray:
+        return self.words[row_idx].copy()
 
-class HeuristicEngine:
+    def write(self, row_idx: int, row_word: np.ndarray):
+        self.words[row_idx] = row_word
+
+    def clear(self):
+        self.words.fill(0)
+
+    def as_matrix(self) -> np.ndarray:
+        """Debug view: the bit matrix as a (num_rows, num_cols) int array."""
+        return unpack_row_mask(self.words, self.num_cols)
+
+class UndoLog:
     """
-    Component: Heuristic Engine
+    Component: Undo Log
     
-    Predicts which variable assignment to make next.
+    Records, for every dynamic memory row word changed during PROPAGATE, the
+    bits that were newly set. A rollback clears exactly those bits in reverse
+    order, one entry per cycle. Each bit is set at most once between rollbacks,
+    so the log never holds more entries than there are literal slots.
+    """
+    def __init__(self):
+        self.row_blocks = []  # Row indices, one block per recorded sweep
+        self.mask_blocks = [] # Newly set bits for those rows
+        self.size = 0
+
+    def record(self, rows: np.ndarray, masks: np.ndarray):
+        if len(rows):
+            self.row_blocks.append(rows)
+            self.mask_blocks.append(masks)
+            self.size += len(rows)
+
+    def rollback(self, dynamic: DynamicMemory, mark: int, max_entries: Optional[int] = None) -> int:
+        """Undoes entries until size == mark (or max_entries). Returns entries undone."""
+        undone = 0
+        while self.size > mark and (max_entries is None or undone < max_entries):
+            rows, masks = self.row_blocks[-1], self.mask_blocks[-1]
+            take = min(len(rows), self.size - mark)
+            if max_entries is not None:
+                take = min(take, max_entries - undone)
+            dynamic.words[rows[-take:]] &= ~masks[-take:]
+            if take == len(rows):
+                self.row_blocks.pop()
+                self.mask_blocks.pop()
+            else:
+                self.row_blocks[-1] = rows[:-take]
+                self.mask_blocks[-1] = masks[:-take]
+            self.size -= take
+            undone += take
+        return undone
+
+    def snapshot(self) -> Dict:
+        """Logged entries and block lengths, for a SatNode checkpoint."""
+        if not self.size:
+            return {"rows": np.zeros(0, dtype=np.int64), "masks": None, "blocks": np.zeros(0, dtype=np.int64)}
+        return {"rows": np.concatenate(self.row_blocks), "masks": np.concatenate(self.mask_blocks),
+                "blocks": np.array([len(rows) for rows in self.row_blocks], dtype=np.int64)}
+
+    def restore(self, state: Dict):
+        """
+        Inverse of snapshot(). The blocks are split again: a row can appear in
+        several blocks, and one rollback write per row would clear only one of
+        its masks.
+        """
+        rows, masks = state["rows"], state.get("masks")
+        bounds = np.cumsum(state["blocks"])[:-1]
+        self.row_blocks = np.split(rows, bounds) if len(rows) else []
+        self.mask_blocks = np.split(masks, bounds) if len(rows) else []
+        self.size = len(rows)
+
+    def forget_row(self, row_idx: int):
+        """Neutralizes the entries of a row that is being reused; they still cost their cycle."""
+        for rows, masks in zip(self.row_blocks, self.mask_blocks):
+            masks[rows == row_idx] = 0
+
+# Decision stack entry: an assignment_manager.sv stack word plus the reason row
+STACK_ENTRY = np.dtype([('var', np.int32), ('value', np.bool_), ('forced', np.bool_), ('reason', np.int32)])
+
+class AssignmentManager:
+    """
+    Component: Assignment Manager
+
+    Mirrors rtl/assignment_manager.sv. `values` holds one int8 per variable,
+    1 True, -1 False and 0 unassigned, like the RTL's assigned/values bit
+    vectors. The decision stack is a preallocated structured array of (var,
+    value, forced, reason row) entries with `depth` in use; a variable is on
+    it at most once, so num_vars entries are enough. `position` is the stack
+    index of every assigned variable.
+
+    The trail is level-indexed: level_starts[k] is the stack index where
+    decision level k + 1 starts (used with learning), so the entries of
+    levels 0..L are stack[:level_end(L)].
     """
     def __init__(self, num_vars: int):
-        self.num_vars = num_vars
-        self.forced_next = None
+        self.values = np.zeros(num_vars + 1, dtype=np.int8)
+        self.position = np.zeros(num_vars + 1, dtype=np.int32)
+        self.stack = np.zeros(num_vars, dtype=STACK_ENTRY)
+        self.depth = 0
+        self.level_starts = np.zeros(num_vars + 1, dtype=np.int32)
+        self.levels = 0
+
+    def __len__(self) -> int:
+        return self.depth
+
+    def entries(self) -> np.ndarray:
+        """The stack entries in use, bottom first (a view)."""
+        return self.stack[:self.depth]
+
+    def entry(self, index: int) -> Tuple[int, bool, bool]:
+        var, val, forced, _ = self.stack[index].item()
+        return var, val, forced
 
-    def set_next_decision(self, var_id: int):
-        self.forced_next = var_id
+    def push(self, var: int, val: bool, forced: bool, reason: int = -1):
+        self.stack[self.depth] = (var, val, forced, reason)
+        self.position[var] = self.depth
+        self.depth += 1
+        self.values[var] = 1 if val else -1
 
-    def predict(self, assigned_vars: Dict[int, bool]) -> Optional[int]:
-        if self.forced_next is not None:
-            d = self.forced_next
-            self.forced_next = None
-            return d
+    def pop(self) -> Tuple[int, bool, bool]:
+        self.depth -= 1
+        var, val, forced, _ = self.stack[self.depth].item()
+        self.values[var] = 0
+        return var, val, forced
+
+    def reason(self, var: int) -> int:
+        """Row that implied var, or -1 (decisions, unassigned variables)."""
+        return int(self.stack['reason'][self.position[var]]) if self.values[var] else -1
+
+    def open_level(self):
+        self.level_starts[self.levels] = self.depth
+        self.levels += 1
+
+    def level_end(self, level: int) -> int:
+        """Stack index where the entries above decision level `level` start."""
+        return int(self.level_starts[level]) if level < self.levels else self.depth
+
+    def table(self) -> Dict[int, bool]:
+        entries = self.entries()
+        return dict(zip(entries['var'].tolist(), entries['value'].tolist()))
+
+    def clear(self):
+        self.values[self.entries()['var']] = 0
+        self.depth = 0
+        self.levels = 0
+
+    def snapshot(self) -> Dict:
+        """Stack entries and level starts, for a SatNode checkpoint."""
+        return {"stack": self.entries().copy(), "level_starts": self.level_starts[:self.levels].copy()}
+
+    def restore(self, state: Dict):
+        """Inverse of snapshot()."""
+        self.clear()
+        for var, val, forced, reason in state["stack"].tolist():
+            self.push(var, val, forced, reason)
+        self.levels = len(state["level_starts"])
+        self.level_starts[:self.levels] = state["level_starts"]
+
+class ClauseEvaluator:
+    """
+    Component: Clause Evaluator
+    
+    Checks if a clause (row) is False (Conflict).
+    A clause is False if ALL its active literals are 1 (False).
+    """
+    def evaluate(self, active_word: np.ndarray, dynamic_word: np.ndarray) -> bool:
+        # Literal 0 is padding and is never False, so only active slots count.
+        if not np.any(active_word):
+            return False # Empty row is not a conflict
         
-        # Simple heuristic: pick the first unassigned variable
-        for v in range(1, self.num_vars + 1):
-            if v not in assigned_vars:
-                return v
-        return None
+        # A conflict occurs if no active slot is still 0.
+        return not np.any(active_word & ~dynamic_word)
 
 class Comparator:
     """
     Component: Comparator
     
-    Generates a bitmask where problem_literal == target_literal.
+    Generates a packed bitmask where problem_literal == target_literal.
+    compare_any() is a bank of comparators per slot, one per target literal,
+    whose matches are OR-ed.
     """
     def compare(self, static_row: np.ndarray, target_literal: int) -> np.ndarray:
-        matches = (static_row == target_literal)
-        return matches.astype(int)
+        return pack_row_mask(static_row == target_literal)
+
+    def compare_any(self, static_row: np.ndarray, target_literals: List[int]) -> np.ndarray:
+        return pack_row_mask(np.isin(static_row, target_literals))
+
+    @staticmethod
+    def area_luts(lit_width: int, num_cols: int, width: int = 1) -> int:
+        """
+        LUT6 estimate for one row's comparators: `width` per slot, each a
+        lit_width-bit equality test (3 bit pairs per LUT, then an AND tree),
+        and an OR tree per slot over the `width` matches.
+        """
+        tree = lambda inputs: max(0, -(-(inputs - 1) // 5)) # 6-input LUTs to reduce `inputs` signals
+        groups = -(-lit_width // 3)
+        return num_cols * (width * (groups + tree(groups)) + tree(width))
 
 class BitwiseUpdate:
     """
@@ -95,42 +489,156 @@ class UnitDetector:
     Detects if a clause is Unit (all but one literals are False).
     Returns the literal that MUST be True.
     """
-    def detect(self, static_row: np.ndarray, dynamic_row: np.ndarray) -> Optional[int]:
-        active_mask = (static_row != 0)
-        # dynamic_row[j] == 1 means literal static_row[j] is False.
-        # A clause is Unit if exactly one active literal is 0 (True/Symbolic).
-        zero_indices = np.where((dynamic_row == 0) & active_mask)[0]
-        if len(zero_indices) == 1:
-            # One literal remains that could be True.
-            return static_row[zero_indices[0]]
-        return None
+    def detect(self, static_row: np.ndarray, active_word: np.ndarray,
+               dynamic_word: np.ndarray) -> Optional[int]:
+        # A clause is Unit if exactly one active slot is 0 (True/Symbolic).
+        candidates = active_word & ~dynamic_word
+        if POPCOUNT[candidates].sum() != 1:
+            return None
+        # One literal remains that could be True: locate its bit.
+        k = int(np.flatnonzero(candidates)[0])
+        return static_row[8 * k + LOWEST_BIT[candidates[k]]]
 
 class SatNode:
     """
     Top-Level Module: Computation Node
-    Fully functional SAT solver node with cycle-accurate simulation.
+    Fully functional SAT solver node with cycle-accurate simulation. The
+    options are described with the constructor arguments and in README.md.
     """
-    def __init__(self, literal_matrix: np.ndarray, num_vars: int):
-        self.static_memory = StaticMemory(literal_matrix)
-        self.num_rows, self.num_cols = literal_matrix.shape
-        self.dynamic_memory = np.zeros_like(literal_matrix, dtype=int)
+    STATES = ('IDLE', 'DECIDE', 'PROPAGATE', 'BACKTRACK', 'UNDO', 'SAT', 'UNSAT', 'ANALYZE')
+    MODES = ('cycle', 'fast', 'event')
+    PROPAGATIONS = ('scan', 'indexed')
+    BACKTRACKS = ('rebuild', 'trail')
+    HEURISTICS = HEURISTICS
+    POLARITIES = POLARITIES
+    EVICTIONS = EVICTIONS
+    OVERFLOWS = OVERFLOWS
+
+    def __init__(self, literal_matrix: np.ndarray, num_vars: int,
+                 mode: str = 'cycle',            # cycle: one clock per step(); fast/event: same results, batched
+                 propagation: str = 'scan',      # scan: visit every row; indexed: only rows with the literal
+                 backtrack: str = 'rebuild',     # rebuild: re-propagate the stack; trail: undo log
+                 timers: bool = False,           # Wall-clock timers per component and state
+                 heuristic: str = 'first',       # first, occurrence or vsids (heuristics.py)
+                 phase_saving: bool = False,     # Decide each variable to its last value
+                 learning: bool = False,         # First-UIP clause learning and backjumping (learning.py)
+                 learned_rows: int = 256,        # Rows reserved for learned clauses
+                 learned_width: int = 16,        # Slots per learned row; longer clauses are not stored
+                 eviction: str = 'lbd',          # Learned row to replace when full: lbd or activity
+                 sweep_width: int = 1,           # Queued literals propagated per sweep
+                 queue_depth: Optional[int] = None, # Propagation queue bound, None: unbounded
+                 queue_overflow: str = 'stall',  # Push into a full queue: stall, drop or spill
+                 queue_dedup: bool = True,       # Suppress pushes of an already queued literal
+                 spare_rows: int = 0,            # Empty rows for add_clause()
+                 spare_width: int = 16,          # Slots per spare row
+                 lanes: int = 1,                 # Interleaved memory banks visited in parallel
+                 polarity: str = 'false',        # First value of a fresh decision: false, true or random
+                 seed: Optional[int] = None):    # Random polarity and variable renumbering seed
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown mode '{mode}', expected one of {self.MODES}")
+        if propagation not in self.PROPAGATIONS:
+            raise ValueError(f"Unknown propagation '{propagation}', expected one of {self.PROPAGATIONS}")
+        if backtrack not in self.BACKTRACKS:
+            raise ValueError(f"Unknown backtrack '{backtrack}', expected one of {self.BACKTRACKS}")
+        if sweep_width < 1:
+            raise ValueError(f"sweep_width must be at least 1, got {sweep_width}")
+        if lanes < 1:
+            raise ValueError(f"lanes must be at least 1, got {lanes}")
+        self.mode = mode
+        # Everything but the problem and the host-side mode/timers, as saved in checkpoints
+        self.options = dict(propagation=propagation, backtrack=backtrack, heuristic=heuristic,
+                            phase_saving=phase_saving, learning=learning, learned_rows=learned_rows,
+                            learned_width=learned_width, eviction=eviction, sweep_width=sweep_width,
+                            queue_depth=queue_depth, queue_overflow=queue_overflow, queue_dedup=queue_dedup,
+                            spare_rows=spare_rows, spare_width=spare_width, lanes=lanes, polarity=polarity,
+                            seed=seed)
+        self.propagation = propagation
+        self.backtrack = backtrack
+        self.sweep_width = sweep_width
+        self.lanes = lanes
+        self.learning = learning
+        self.static_memory = StaticMemory(literal_matrix, learned_rows if learning else 0, learned_width,
+                                          spare_rows, spare_width, lanes)
+        self.num_rows, self.num_cols = self.static_memory.memory.shape
+        # Row 0 exists even without clauses: an empty sweep still reads it, as the RTL does
+        self.dynamic = DynamicMemory(max(self.num_rows, 1), self.num_cols)
         
         self.num_vars = num_vars
-        self.assignment_table = {} # var_id -> value (True/False)
-        self.decision_stack = []    # list of (var_id, value, is_forced)
+        self.assignments = AssignmentManager(num_vars) # Assignment array and decision stack
         
-        self.state = 'IDLE' # IDLE, DECIDE, PROPAGATE, BACKTRACK, SAT, UNSAT
-        self.propagation_queue = [] # List of literals that are now FALSE
+        self.state = 'IDLE' # IDLE, DECIDE, PROPAGATE, BACKTRACK, UNDO, SAT, UNSAT, ANALYZE
+        # Literals that are now FALSE
+        self.propagation_queue = PropagationQueue(num_vars, queue_depth, queue_overflow, queue_dedup)
         self.current_prop_literal = None
+        self.current_prop_batch = [] # Literals of the current sweep, current_prop_literal first
+        self._event_visits = None # Non-idle visits of the current sweep (step_event)
+        
+        self.undo_log = UndoLog()
+        self.level_marks = [] # Undo log size at each unforced decision (each level with learning)
+        self.undo_target = 0
+        self.backtrack_stats = {"flips": 0, "undo_cycles": 0, "rebuild_cycles": 0}
+
+        # Clause learning state (learning=True)
+        self.conflict_analyzer = ConflictAnalyzer()
+        self.learned_region = LearnedRegion(self.static_memory.problem_rows,
+                                            self.num_rows - self.static_memory.problem_rows, eviction)
+        self.var_level = np.full(num_vars + 1, -1, dtype=np.int64)  # -1: unassigned
+        self._analysis = None       # Analysis of the conflict being handled
+        self._analyze_remaining = 0 # ANALYZE cycles left for it
+        self._learned_row = -1      # Row its clause was written to, -1 if not stored
+        self._init_entries = []     # (undo log position, row) of learned row initializations
+        self._reinit_rows = []      # Learned rows to re-initialize at the end of UNDO
+
+        # Assumptions of the current solve() (DIMACS literals)
+        self._assumptions = None # None: not solving under assumptions
+        self._assumed = {}       # var -> assumed value
+        self._conflict_deps = set() # Roots (assumptions, open decisions) of the current refutation
+        self._flip_deps = {}        # Flipped decision -> roots that refuted its first value
+        self.core = None # Assumptions of the last UNSAT answer under assumptions
         
         self.clause_evaluator = ClauseEvaluator()
-        self.heuristic_engine = HeuristicEngine(num_vars)
+        self.heuristic_engine = make_heuristic(heuristic, num_vars, literal_matrix, phase_saving, polarity, seed)
+        self._decide_wait = 0 # DECIDE cycles spent on the current decision so far
         self.comparator = Comparator()
         self.bitwise_updater = BitwiseUpdate()
         self.unit_detector = UnitDetector()
         
         self.cycle_count = 0
         self.max_cycles = 5000 # Increased for more complex problems
+        
+        self.counters = NodeCounters(self.STATES, timers=timers)
+        self.counters.queue = self.propagation_queue
+        self._sweep_visits = 0 # Row visits of the current literal so far
+        if timers:
+            t = self.counters.timers
+            t.instrument(self.static_memory, "StaticMemory", ("fetch_row", "fetch_active", "load_skip_list"))
+            t.instrument(self.dynamic, "DynamicMemory", ("read", "write", "clear"))
+            t.instrument(self.undo_log, "UndoLog", ("record", "rollback"))
+            t.instrument(self.clause_evaluator, "ClauseEvaluator", ("evaluate",))
+            t.instrument(self.heuristic_engine, "HeuristicEngine", ("predict",))
+            t.instrument(self.comparator, "Comparator", ("compare", "compare_any"))
+            t.instrument(self.bitwise_updater, "BitwiseUpdate", ("update",))
+            t.instrument(self.unit_detector, "UnitDetector", ("detect",))
+            t.instrument(self.conflict_analyzer, "ConflictAnalyzer", ("analyze",))
+            # Batched PROPAGATE work of the fast and event modes
+            t.instrument(self, "step_fast:PROPAGATE", ("_sweep_rows",))
+            t.instrument(self, "step_event:scan", ("_eventful_visits",))
+
+    @property
+    def assignment_table(self) -> Dict[int, bool]:
+        """Current assignments as {var: value}, in decision stack order."""
+        return self.assignments.table()
+
+    @property
+    def decision_stack(self) -> List[Tuple[int, bool, bool]]:
+        """Debug view of the decision stack as (var, value, is_forced) tuples, bottom first."""
+        entries = self.assignments.entries()
+        return list(zip(entries['var'].tolist(), entries['value'].tolist(), entries['forced'].tolist()))
+
+    @property
+    def dynamic_memory(self) -> np.ndarray:
+        """Debug view of the packed dynamic memory as an int bit matrix."""
+        return self.dynamic.as_matrix()
 
     def negate_literal(self, literal: int) -> int:
         if literal == 0: return 0
@@ -151,6 +659,23 @@ class SatNode:
         """
         Executes one cycle of the SAT node state machine.
         """
+        state = self.state
+        self.counters.state_cycles[state] += 1
+        timers = self.counters.timers
+        if timers is None:
+            info = self._step()
+        else:
+            t = time.perf_counter()
+            info = self._step()
+            timers.add(f"step:{state}", time.perf_counter() - t)
+        self.counters.track_depths(len(self.propagation_queue), len(self.assignments))
+        return info
+
+    def _end_sweep(self):
+        self.counters.rows_per_literal.add(self._sweep_visits)
+        self._sweep_visits = 0
+
+    def _step(self):
         self.cycle_count += 1
         
         if self.state == 'IDLE':
@@ -158,17 +683,32 @@ class SatNode:
             return {"state": self.state}
 
         elif self.state == 'DECIDE':
-            var = self.heuristic_engine.predict(self.assignment_table)
+            if self._decide_wait + 1 < self.heuristic_engine.decide_cycles:
+                # Multi-cycle heuristic still computing its choice
+                self._decide_wait += 1
+                return {"state": self.state}
+            self._decide_wait = 0
+            assumed = self._next_assumption() if self._assumptions else None
+            if assumed is False:
+                self.state = 'UNSAT' # An assumption is already False
+                return {"state": self.state}
+            var = self.heuristic_engine.predict(self.assignments.values)
             if var is None:
                 self.state = 'SAT'
             else:
-                # Decision: Set variable to False (literal 2*var becomes False)
-                val = False
-                self.assignment_table[var] = val
-                self.decision_stack.append((var, val, False))
-                self.propagation_queue.append(2 * var)
+                # Decision: Set variable to its phase, False by default (literal 2*var becomes False)
+                forced = assumed is not None
+                val = self._assumed[var] if forced else self.heuristic_engine.phase(var)
+                if self.learning:
+                    self.assignments.open_level()
+                    self.var_level[var] = self.assignments.levels
+                self.assignments.push(var, val, forced)
+                if self.backtrack == 'trail' and (self.learning or not forced):
+                    self.level_marks.append(self.undo_log.size)
+                self.propagation_queue.push(2 * var + val)
                 self.state = 'PROPAGATE'
                 self.static_memory.reset_pointer()
+                self.counters.decisions += 1
             return {"state": self.state, "decision_var": var}
 
         elif self.state == 'PROPAGATE':
@@ -176,81 +716,70 @@ class SatNode:
                 if not self.propagation_queue:
                     self.state = 'DECIDE'
                     return {"state": self.state}
-                self.current_prop_literal = self.propagation_queue.pop(0)
-                self.static_memory.reset_pointer()
-
-            # Process one row per cycle
-            row_idx = self.static_memory.row_pointer
-            static_row = self.static_memory.fetch_row(row_idx)
-            dynamic_row = self.dynamic_memory[row_idx]
-            
-            # 1. Update dynamic memory with current propagation
-            mask = self.comparator.compare(static_row, self.current_prop_literal)
-            new_dynamic_row = self.bitwise_updater.update(dynamic_row, mask)
-            self.dynamic_memory[row_idx] = new_dynamic_row
-            
-            # 2. Check for conflict
-            if self.clause_evaluator.evaluate(static_row, new_dynamic_row):
-                self.state = 'BACKTRACK'
-                self.current_prop_literal = None
-                return {"state": self.state, "conflict_row": row_idx}
-            
-            # 3. BCP: Unit Clause Detection
-            forced_true_literal = self.unit_detector.detect(static_row, new_dynamic_row)
-            if forced_true_literal:
-                forced_var, forced_val = self.get_var_and_val(self.negate_literal(forced_true_literal))
-                # Wait, if forced_true_literal must be True, then its negation must be False.
-                # get_var_and_val(literal) returns the (var, value) assignment that makes 'literal' False.
-                # So if literal L is False, get_var_and_val(L) is what we want.
-                # The literal that is now False is negate_literal(forced_true_literal).
-                false_literal = self.negate_literal(forced_true_literal)
-                var, val = self.get_var_and_val(false_literal)
-                
-                if var in self.assignment_table:
-                    if self.assignment_table[var] != val:
-                        # Conflict! Forced assignment contradicts existing one.
-                        self.state = 'BACKTRACK'
+                self._pop_batch()
+                if self.propagation == 'indexed':
+                    # Index RAM lookup cycle: load the skip list for the sweep's literals
+                    self.static_memory.load_skip_list(self.current_prop_batch)
+                    lit = self.current_prop_literal
+                    if self.static_memory.sweep_length() == 0:
                         self.current_prop_literal = None
-                        return {"state": self.state, "bcp_conflict_var": var}
-                else:
-                    self.assignment_table[var] = val
-                    self.decision_stack.append((var, val, True)) # forced
-                    self.propagation_queue.append(false_literal)
-            
-            # Advance pointer
-            self.static_memory.advance_pointer()
-            if self.static_memory.row_pointer >= self.num_rows:
-                # Finished propagating this literal
-                self.current_prop_literal = None
-            
-            return {"state": 'PROPAGATE', "row": row_idx, "lit": self.current_prop_literal}
+                        self._end_sweep()
+                    return {"state": 'PROPAGATE', "lit": lit, "skip_rows": self.static_memory.sweep_length()}
+
+            # Process one row per cycle (one beat of up to `lanes` rows when banked)
+            beat = self.static_memory.beat_of(self.static_memory.row_pointer)
+            info = self._visit_row()
+            while (self.lanes > 1 and self.current_prop_literal and self.state == 'PROPAGATE'
+                   and self.static_memory.beat_of(self.static_memory.row_pointer) == beat):
+                info = self._visit_row()
+            return info
+
+        elif self.state == 'ANALYZE':
+            self._analyze_remaining -= 1
+            if self._analyze_remaining > 0:
+                return {"state": self.state} # Still walking the decision stack
+            return self._learn()
 
         elif self.state == 'BACKTRACK':
-            if not self.decision_stack:
+            if self.learning:
+                return self._backjump()
+            if not self.assignments.depth:
                 self.state = 'UNSAT'
+                if self._assumptions is not None:
+                    self.core = self._assumption_core(self._conflict_deps)
                 return {"state": self.state}
             
-            var, val, is_forced = self.decision_stack.pop()
-            del self.assignment_table[var]
+            var, val, is_forced = self.assignments.pop()
+            self._unassign(var, val)
+            self.counters.backtrack_pops += 1
+            if self._assumptions:
+                self._track_flip_deps(var, is_forced)
             
             if not is_forced:
-                # Try the other value (True)
+                # Try the other value
                 # If variable x is True, literal 2*x + 1 is False.
-                new_val = True
-                self.assignment_table[var] = new_val
-                self.decision_stack.append((var, new_val, True)) # Now it's forced
+                new_val = not val
+                self.backtrack_stats["flips"] += 1
+                self.counters.flips += 1
+                self.backtrack_stats["rebuild_cycles"] += self._rebuild_cost()
+                self.assignments.push(var, new_val, True) # Now it's forced
+                self.current_prop_literal = None
+                self.static_memory.reset_pointer()
+                
+                if self.backtrack == 'trail':
+                    # Roll the dynamic memory back to the decision, then only
+                    # the flipped literal needs propagating.
+                    self.undo_target = self.level_marks.pop()
+                    self.propagation_queue.reset([2 * var + new_val])
+                    self.state = self._enter_undo()
+                    return {"state": self.state}
                 
                 # Re-propagate EVERYTHING from the stack
                 # In this simple simulation, we clear dynamic memory and re-propagate
-                self.dynamic_memory.fill(0)
-                self.propagation_queue = []
-                for v, v_val, _ in self.decision_stack:
-                    lit_is_false = (2 * v) if v_val == False else (2 * v + 1)
-                    self.propagation_queue.append(lit_is_false)
+                self.dynamic.clear()
+                self.propagation_queue.reset(self._stack_false_literals().tolist())
                 
                 self.state = 'PROPAGATE'
-                self.current_prop_literal = None
-                self.static_memory.reset_pointer()
             else:
                 # Already tried both values for this decision, keep backtracking
                 # Re-run backtrack in next cycle or recursively?
@@ -259,12 +788,800 @@ class SatNode:
             
             return {"state": self.state}
 
+        elif self.state == 'UNDO':
+            # Restore one undo log entry (or re-initialize one learned row) per cycle
+            self._undo(1)
+            return {"state": self.state, "undo_remaining": self._undo_remaining()}
+
+        return {"state": self.state}
+
+    def _visit_row(self):
+        """
+        One row visit of the current sweep. With lanes > 1 the visits of a
+        beat run in parallel banks, and the lane arbiter commits their
+        updates, implications and conflicts in visit order; a conflict
+        squashes the visits after it.
+        """
+        self._sweep_visits += 1
+        row_idx = self.static_memory.current_row()
+        static_row = self.static_memory.fetch_row(row_idx)
+        active_word = self.static_memory.fetch_active(row_idx)
+        dynamic_word = self.dynamic.read(row_idx)
+        
+        # 1. Update dynamic memory with current propagation
+        mask = self._compare(static_row)
+        new_dynamic_word = self.bitwise_updater.update(dynamic_word, mask)
+        self.dynamic.write(row_idx, new_dynamic_word)
+        if self.backtrack == 'trail' and np.any(mask & ~dynamic_word):
+            self.undo_log.record(np.array([row_idx]), (mask & ~dynamic_word)[None])
+        
+        # 2. Check for conflict
+        if self.clause_evaluator.evaluate(active_word, new_dynamic_word):
+            self.state = self._conflict(row_idx)
+            self.current_prop_literal = None
+            self.counters.conflicts += 1
+            self._end_sweep()
+            return {"state": self.state, "conflict_row": row_idx}
+        
+        # 3. BCP: Unit Clause Detection
+        forced_true_literal = self.unit_detector.detect(static_row, active_word, new_dynamic_word)
+        if forced_true_literal:
+            forced_var, forced_val = self.get_var_and_val(self.negate_literal(forced_true_literal))
+            # Wait, if forced_true_literal must be True, then its negation must be False.
+            # get_var_and_val(literal) returns the (var, value) assignment that makes 'literal' False.
+            # So if literal L is False, get_var_and_val(L) is what we want.
+            # The literal that is now False is negate_literal(forced_true_literal).
+            false_literal = self.negate_literal(forced_true_literal)
+            var, val = self.get_var_and_val(false_literal)
+            
+            value = self.assignments.values[var]
+            if value:
+                if (value > 0) != val:
+                    # Conflict! Forced assignment contradicts existing one.
+                    self.state = self._conflict(row_idx)
+                    self.current_prop_literal = None
+                    self.counters.bcp_conflicts += 1
+                    self._end_sweep()
+                    return {"state": self.state, "bcp_conflict_var": var}
+            else:
+                self._imply(var, val, false_literal, row_idx)
+        
+        # Advance pointer
+        self.static_memory.advance_pointer()
+        if self.static_memory.row_pointer >= self.static_memory.sweep_length():
+            # Finished propagating this literal
+            self.current_prop_literal = None
+            self._end_sweep()
+        
+        return {"state": 'PROPAGATE', "row": row_idx, "lit": self.current_prop_literal}
+
+    def _imply(self, var: int, val: bool, false_literal: int, row_idx: int):
+        """Records the assignment forced by unit row row_idx."""
+        self.assignments.push(var, val, True, row_idx) # forced
+        self.propagation_queue.push(false_literal)
+        self.counters.implications += 1
+        if self.learning:
+            self.var_level[var] = self.assignments.levels
+
+    def _unassign(self, var: int, val: bool):
+        self.heuristic_engine.unassign(var, val)
+        if self.learning or self._assumptions:
+            self.var_level[var] = -1
+
+    def _conflict(self, row_idx: int) -> str:
+        """State a conflict on row_idx leads to. With learning, the analysis is done here."""
+        self.heuristic_engine.on_conflict(self.static_memory.memory[row_idx])
+        if not self.learning:
+            if self._assumptions:
+                self._conflict_deps = self._trace_roots(self.static_memory.memory[row_idx].tolist())
+            return 'BACKTRACK'
+        self._analysis = self.conflict_analyzer.analyze(row_idx, self.static_memory.memory,
+                                                        self.assignments.entries(), self.var_level)
+        self._analyze_remaining = self._analysis.cycles if self._analysis else 1
+        return 'ANALYZE'
+
+    def _next_assumption(self):
+        """
+        Queues the first unassigned assumption as the next decision and
+        returns its variable. Returns None once every assumption holds, and
+        False (with `core` set) if one is already assigned the other value.
+        """
+        values = self.assignments.values
+        for literal in self._assumptions:
+            var = abs(literal)
+            if not values[var]:
+                self.heuristic_engine.set_next_decision(var)
+                return var
+            if (values[var] > 0) != self._assumed[var]:
+                self.core = self._assumption_core(self._trace_roots([2 * var]) | {var})
+                return False
+        return None
+
+    def _trace_roots(self, literals: List[int]) -> set:
+        """
+        Variables the assignments of `literals` rest on: assumptions and
+        decisions, found by following implication reasons. A flipped decision
+        stands for the roots that refuted its first value. With learning, a
+        UIP asserted without a stored clause stands for every assumption at or
+        below its level.
+        """
+        roots, seen = set(), set()
+        work = [lit >> 1 for lit in literals if lit]
+        while work:
+            var = work.pop()
+            if var in seen or not self.assignments.values[var]:
+                continue
+            seen.add(var)
+            reason = self.assignments.reason(var)
+            if reason >= 0:
+                work += [lit >> 1 for lit in self.static_memory.memory[reason].tolist() if lit and lit >> 1 != var]
+            elif var in self._flip_deps:
+                roots |= self._flip_deps[var]
+            elif var in self._assumed or not self.learning:
+                roots.add(var)
+            else:
+                level = self.var_level[var]
+                roots |= {v for v in self._assumed if 0 <= self.var_level[v] <= level}
+        return roots
+
+    def _track_flip_deps(self, var: int, is_forced: bool):
+        """Updates the refutation roots as chronological backtracking pops `var`."""
+        deps = self._conflict_deps
+        if var in self._flip_deps:
+            # Both values of a flipped decision are refuted
+            flipped = self._flip_deps.pop(var)
+            if var in deps:
+                deps.discard(var)
+                deps |= flipped
+        elif not is_forced:
+            # The decision's first value is refuted; its flip inherits the roots
+            self._flip_deps[var] = deps - {var}
+            self._conflict_deps = set()
+
+    def _assumption_core(self, roots: set) -> List[int]:
+        return [literal for literal in self._assumptions if abs(literal) in roots]
+
+    def _learn(self):
+        """Last ANALYZE cycle: writes the learned clause into the learned region."""
+        analysis = self._analysis
+        if analysis is None:
+            self.state = 'UNSAT' # Conflict without any decision
+            if self._assumptions is not None:
+                self.core = []
+            return {"state": self.state}
+        self.learned_region.bump(analysis.rows)
+        row = None
+        if 1 < len(analysis.literals) <= self.num_cols:
+            # Rows that stay reasons after the backjump cannot be evicted
+            reasons = self.assignments.entries()['reason'][:self.assignments.level_end(analysis.level)]
+            locked = np.unique(reasons[reasons >= self.static_memory.problem_rows])
+            row, evicted = self.learned_region.allocate(analysis.lbd, locked)
+            if evicted is not None:
+                self._free_learned_row(evicted)
+                self.counters.evictions += 1
+        if row is None:
+            self._learned_row = -1
+        else:
+            self.static_memory.write_row(row, analysis.literals)
+            self.dynamic.words[row] = 0
+            if self.backtrack == 'trail':
+                self._reinit_rows.append(row) # Its False literals are set once the rollback is done
+            self.counters.learned_clauses += 1
+            self._learned_row = row
+        self.state = 'BACKTRACK'
+        return {"state": self.state, "learned_row": self._learned_row, "uip": analysis.literals[0],
+                "lbd": analysis.lbd}
+
+    def _free_learned_row(self, row: int):
+        self.static_memory.write_row(row, [])
+        self.dynamic.words[row] = 0
+        self.undo_log.forget_row(row)
+        self._init_entries = [(pos, r) for pos, r in self._init_entries if r != row]
+        if row in self._reinit_rows:
+            self._reinit_rows.remove(row)
+
+    def _backjump(self):
+        """
+        One BACKTRACK cycle with learning: pops one decision_stack entry. The
+        cycle that reaches the assertion level also asserts the UIP literal.
+        """
+        analysis = self._analysis
+        assignments = self.assignments
+        var, val, _ = assignments.pop()
+        self._unassign(var, val)
+        self.counters.backtrack_pops += 1
+        if assignments.depth > assignments.level_end(analysis.level):
+            return {"state": self.state}
+
+        self.counters.backjump_levels += assignments.levels - analysis.level - 1
+        assignments.levels = analysis.level
+        if self.backtrack == 'trail':
+            self.undo_target = self.level_marks[analysis.level]
+            del self.level_marks[analysis.level:]
+
+        literal = analysis.literals[0] ^ 1 # UIP literal, False before the jump, is now True
+        var, val = self.get_var_and_val(literal)
+        if self._learned_row < 0 and len(analysis.literals) > 1:
+            # Clause not stored: nothing forces the UIP, so it starts its own level
+            assignments.open_level()
+            if self.backtrack == 'trail':
+                self.level_marks.append(self.undo_target)
+        assignments.push(var, val, True, self._learned_row)
+        self.var_level[var] = assignments.levels
+        self.current_prop_literal = None
+        self.static_memory.reset_pointer()
+
+        if self.backtrack == 'trail':
+            self.propagation_queue.reset([literal])
+            self.state = self._enter_undo()
+        else:
+            self.dynamic.clear()
+            self.propagation_queue.reset(self._stack_false_literals().tolist())
+            self.state = 'PROPAGATE'
         return {"state": self.state}
 
-    def solve(self):
-        """Helper to run the simulation until it finishes."""
+    def _enter_undo(self) -> str:
+        """Starts rolling the undo log back to undo_target; returns the next state."""
+        target = self.undo_target
+        if self._init_entries and self._init_entries[-1][0] >= target:
+            # Initializations after the target are undone and must be redone
+            self._reinit_rows += [row for pos, row in self._init_entries if pos >= target]
+            self._init_entries = [(pos, row) for pos, row in self._init_entries if pos < target]
+        return 'UNDO' if self.undo_log.size > target or self._reinit_rows else 'PROPAGATE'
+
+    def _undo_remaining(self) -> int:
+        return self.undo_log.size - self.undo_target + len(self._reinit_rows)
+
+    def _undo(self, budget: int) -> int:
+        """Runs up to `budget` UNDO cycles: log entries first, then learned row re-initializations."""
+        undone = self.undo_log.rollback(self.dynamic, self.undo_target, max_entries=budget)
+        self.backtrack_stats["undo_cycles"] += undone
+        cycles = undone
+        if self.undo_log.size <= self.undo_target:
+            while self._reinit_rows and cycles < budget:
+                self._init_learned_row(self._reinit_rows.pop(0))
+                cycles += 1
+            if not self._reinit_rows:
+                self.state = 'PROPAGATE'
+        return cycles
+
+    def _init_learned_row(self, row: int):
+        """Sets the bits of a learned row's literals that are False and already propagated."""
+        pending = self.propagation_queue
+        literals = self.static_memory.memory[row].astype(np.int64)
+        # Literal 2v is False when x_v is False, 2v+1 when x_v is True
+        false = (literals != 0) & (self.assignments.values[literals >> 1] == 2 * (literals & 1) - 1)
+        false &= np.array([lit not in pending for lit in literals.tolist()])
+        new_bits = pack_row_mask(false) & ~self.dynamic.words[row]
+        if new_bits.any():
+            self._init_entries.append((self.undo_log.size, row))
+            self.undo_log.record(np.array([row]), new_bits[None])
+            self.dynamic.words[row] |= new_bits
+
+    def donate_subtree(self) -> Optional[List[Tuple[int, bool]]]:
+        """
+        Gives away the untried branch of the lowest open decision.
+
+        Returns the assignment prefix a neighbor needs to explore it: every
+        decision_stack entry below that decision, followed by the decision with
+        the opposite value. The decision becomes forced here, so this node will
+        never flip it. Returns None if no decision is open.
+        """
+        entries = self.assignments.entries()
+        open_decisions = np.flatnonzero(~entries['forced'])
+        if not len(open_decisions):
+            return None
+        k = int(open_decisions[0])
+        entries['forced'][k] = True
+        if self.backtrack == 'trail' and not self.learning:
+            self.level_marks.pop(0) # Lowest open decision owns the oldest mark
+        prefix = list(zip(entries['var'][:k].tolist(), entries['value'][:k].tolist()))
+        var, val = int(entries['var'][k]), bool(entries['value'][k])
+        return prefix + [(var, not val)]
+
+    def _clear_search(self):
+        """Unassigns everything and empties the dynamic memory, undo log and queue."""
+        self.dynamic.clear()
+        self.undo_log = UndoLog()
+        self.level_marks = []
+        entries = self.assignments.entries()
+        for var, val in zip(entries['var'].tolist(), entries['value'].tolist()):
+            self.heuristic_engine.unassign(var, val)
+        self.heuristic_engine.forced_next = None
+        self.assignments.clear()
+        self._decide_wait = 0
+        self.var_level.fill(-1)
+        self._init_entries = []
+        self._reinit_rows = []
+        self.propagation_queue.clear()
+        self.current_prop_literal = None
+        self.current_prop_batch = []
+        self._event_visits = None
+        self._sweep_visits = 0
+        self.static_memory.reset_pointer()
+        self._assumptions = None
+        self._assumed = {}
+        self._conflict_deps = set()
+        self._flip_deps = {}
+        self.core = None
+
+    def reset_search(self):
+        """
+        Returns to IDLE for a new solve() on the same node: the search state,
+        cycle_count and counters are cleared, while the clause memory, learned
+        clauses and heuristic state (activities, saved phases) are kept.
+        """
+        self._clear_search()
+        self.state = 'IDLE'
+        self.cycle_count = 0
+        self.backtrack_stats = {"flips": 0, "undo_cycles": 0, "rebuild_cycles": 0}
+        self.counters.reset()
+
+    def add_clause(self, clause: List[int]):
+        """Adds a DIMACS clause (signed variable indices) in the next spare row."""
+        self.add_clauses([clause])
+
+    def add_clauses(self, clauses: List[List[int]]):
+        """
+        Adds DIMACS clauses in the next spare rows and resets the search
+        (reset_search()). Learned clauses stay valid: the formula only grows.
+        """
+        rows = []
+        for clause in clauses:
+            if not clause:
+                raise ValueError("Cannot add an empty clause")
+            for literal in clause:
+                if not 1 <= abs(literal) <= self.num_vars:
+                    raise ValueError(f"Literal {literal} is outside variables 1..{self.num_vars}")
+            rows.append([2 * literal if literal > 0 else 2 * -literal + 1 for literal in clause])
+        self.static_memory.add_rows(rows)
+        self.reset_search()
+
+    def load_subtree(self, prefix: List[Tuple[int, bool]]):
+        """
+        Clears the search state and pins `prefix` as forced entries at the
+        bottom of decision_stack. The node then explores only that subtree and
+        reaches UNSAT once it is exhausted. cycle_count keeps running.
+        """
+        self._clear_search()
+        if self.learning:
+            # Learned clauses drop level 0 literals, so they only hold under the old prefix
+            for row in self.learned_region.rows().tolist():
+                self.static_memory.write_row(row, [])
+            self.learned_region.reset()
+            self.static_memory.active_rows = self.static_memory.clause_rows
+            self.var_level[[var for var, _ in prefix]] = 0
+        for var, val in prefix:
+            self.assignments.push(var, val, True)
+            self.propagation_queue.push((2 * var + 1) if val else (2 * var))
+        self.state = 'PROPAGATE'
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        The complete node state, one section per component: the checkpoint
+        contents (see save_checkpoint()). Host-side settings (mode, timers,
+        max_cycles) are not part of it.
+        """
+        analysis = self._analysis
+        node = {
+            "num_vars": self.num_vars, "options": self.options, "state": self.state,
+            "cycle_count": self.cycle_count, "backtrack_stats": dict(self.backtrack_stats),
+            "current_prop_batch": [int(lit) for lit in self.current_prop_batch],
+            "current_prop_literal": self.current_prop_literal,
+            "sweep_visits": self._sweep_visits, "decide_wait": self._decide_wait,
+            "level_marks": self.level_marks, "undo_target": self.undo_target,
+            "var_level": self.var_level,
+            "analysis": None if analysis is None else analysis._asdict(),
+            "analyze_remaining": self._analyze_remaining, "learned_row": self._learned_row,
+            "init_entries": self._init_entries, "reinit_rows": self._reinit_rows,
+            "assumptions": self._assumptions, "assumed": list(self._assumed.items()),
+            "conflict_deps": sorted(self._conflict_deps),
+            "flip_deps": [(var, sorted(deps)) for var, deps in self._flip_deps.items()], "core": self.core,
+        }
+        return {"node": node, "assignments": self.assignments.snapshot(),
+                "static": self.static_memory.snapshot(), "dynamic": {"words": self.dynamic.words},
+                "undo": self.undo_log.snapshot(), "queue": self.propagation_queue.snapshot(),
+                "heuristic": self.heuristic_engine.snapshot(), "learned": self.learned_region.snapshot(),
+                "counters": self.counters.snapshot()}
+
+    def restore(self, sections: Dict[str, Dict]):
+        """
+        Inverse of snapshot(), into a node built for the same problem with the
+        same options (the execution mode may differ: all modes share the state).
+        """
+        node = sections["node"]
+        memory = sections["static"]["memory"]
+        if node["num_vars"] != self.num_vars or memory.shape != self.static_memory.memory.shape:
+            raise ValueError(f"Checkpoint is for {node['num_vars']} variables and {memory.shape} rows x slots, "
+                             f"not {self.num_vars} and {self.static_memory.memory.shape}")
+        if node["options"] != self.options:
+            differ = sorted(k for k in self.options if node["options"].get(k) != self.options[k])
+            raise ValueError(f"Checkpoint was taken with different options: {', '.join(differ)}")
+        original_rows = self.static_memory.problem_rows - self.options["spare_rows"]
+        if not np.array_equal(memory[:original_rows], self.static_memory.memory[:original_rows]):
+            raise ValueError("Checkpoint is for a different problem")
+
+        self.static_memory.restore(sections["static"])
+        self.dynamic.words[:] = sections["dynamic"]["words"]
+        self.assignments.restore(sections["assignments"])
+        self.undo_log.restore(sections["undo"])
+        self.propagation_queue.restore(sections["queue"])
+        self.heuristic_engine.restore(sections["heuristic"])
+        self.learned_region.restore(sections["learned"])
+        self.counters.restore(sections["counters"])
+
+        self.state = node["state"]
+        self.cycle_count = node["cycle_count"]
+        self.backtrack_stats = dict(node["backtrack_stats"])
+        self.current_prop_batch = list(node["current_prop_batch"])
+        self.current_prop_literal = node["current_prop_literal"]
+        self._event_visits = None # step_event() rescans the rest of the sweep, so any mode can resume
+        self._sweep_visits = node["sweep_visits"]
+        self._decide_wait = node["decide_wait"]
+        self.level_marks = list(node["level_marks"])
+        self.undo_target = node["undo_target"]
+        self.var_level[:] = node["var_level"]
+        self._analysis = None if node["analysis"] is None else Analysis(**node["analysis"])
+        self._analyze_remaining = node["analyze_remaining"]
+        self._learned_row = node["learned_row"]
+        self._init_entries = [tuple(entry) for entry in node["init_entries"]]
+        self._reinit_rows = list(node["reinit_rows"])
+        self._assumptions = node["assumptions"]
+        self._assumed = {var: val for var, val in node["assumed"]}
+        self._conflict_deps = set(node["conflict_deps"])
+        self._flip_deps = {var: set(deps) for var, deps in node["flip_deps"]}
+        self.core = node["core"]
+
+    def save_checkpoint(self, path: str):
+        """Writes snapshot() to a compressed .npz checkpoint (see checkpoint.py)."""
+        write_checkpoint(path, self.snapshot())
+
+    def load_checkpoint(self, path: str):
+        """Continues from a checkpoint of the same problem and options; cycle_count resumes from it."""
+        self.restore(read_checkpoint(path))
+
+    @classmethod
+    def from_checkpoint(cls, path: str, mode: str = 'cycle', timers: bool = False) -> 'SatNode':
+        """
+        Rebuilds a node from a checkpoint alone: the clause rows and options
+        are part of it, so a run can move to another machine without the CNF.
+        """
+        sections = read_checkpoint(path)
+        node = sections["node"]
+        static = sections["static"]
+        original_rows = len(static["memory"]) - node["options"]["spare_rows"] - \
+            (node["options"]["learned_rows"] if node["options"]["learning"] else 0)
+        sat_node = cls(static["memory"][:original_rows].copy(), node["num_vars"], mode=mode, timers=timers,
+                       **node["options"])
+        sat_node.restore(sections)
+        return sat_node
+
+    def _pop_batch(self):
+        """Starts a sweep with the next sweep_width literals of the queue."""
+        self.current_prop_batch = self.propagation_queue.pop_batch(self.sweep_width)
+        self.current_prop_literal = self.current_prop_batch[0]
+        self.static_memory.reset_pointer()
+
+    def _compare(self, static_rows: np.ndarray) -> np.ndarray:
+        """Update mask of the current sweep's literals for one or many rows."""
+        if len(self.current_prop_batch) == 1:
+            return self.comparator.compare(static_rows, self.current_prop_literal)
+        return self.comparator.compare_any(static_rows, self.current_prop_batch)
+
+    def _sweep_cost(self, literals: List[int]) -> int:
+        """Cycles one full propagation sweep of `literals` takes without events."""
+        if self.propagation == 'scan':
+            return self.static_memory.count_beats()
+        return 1 + self.static_memory.count_beats(self.static_memory.batch_skip_list(literals))
+
+    def _stack_false_literals(self) -> np.ndarray:
+        """The literal each decision stack entry made False, bottom first."""
+        entries = self.assignments.entries()
+        return 2 * entries['var'].astype(np.int64) + entries['value']
+
+    def _rebuild_cost(self) -> int:
+        """Cycles a rebuild would spend re-sweeping the decision stack literals."""
+        literals = self._stack_false_literals().tolist()
+        return sum(self._sweep_cost(literals[i:i + self.sweep_width])
+                   for i in range(0, len(literals), self.sweep_width))
+
+    def step_fast(self):
+        """
+        Advances the FSM by one event instead of one cycle.
+
+        IDLE, DECIDE and BACKTRACK are delegated to step() one cycle at a time.
+        In PROPAGATE, the rest of the current literal's sweep is done in
+        one batched pass (see _sweep_rows) and cycle_count is advanced by the
+        number of rows the per-row FSM would have visited. UNDO restores all
+        remaining log entries at once and charges one cycle per entry, and
+        ANALYZE charges its stack walk at once.
+        """
+        budget = max(1, self.max_cycles - self.cycle_count)
+        if self.state == 'UNDO':
+            cycles = self._undo(budget)
+            self.cycle_count += cycles
+            self.counters.state_cycles['UNDO'] += cycles
+            return {"state": self.state, "undo_remaining": self._undo_remaining()}
+
+        if self.state == 'ANALYZE' and self._analyze_remaining > 1:
+            cycles = min(self._analyze_remaining - 1, budget) # The last cycle writes the clause
+            self._analyze_remaining -= cycles
+            self.cycle_count += cycles
+            self.counters.state_cycles['ANALYZE'] += cycles
+            return {"state": self.state}
+
+        if self.state != 'PROPAGATE':
+            return self.step()
+
+        if not self.current_prop_literal:
+            if not self.propagation_queue or self.propagation == 'indexed':
+                return self.step() # Empty queue or index lookup: a single cycle
+            self._pop_batch()
+
+        # Never run past max_cycles, so a truncated solve stops on the same row
+        start = self.static_memory.row_pointer
+        end = self.static_memory.beats_end(start, budget)
+        if start == end:
+            return self.step() # Empty sweep: the FSM still spends a cycle on row 0
+        return self._sweep_rows(start, end)
+
+    def _sweep_rows(self, start: int, end: int):
+        """
+        Propagates the current sweep's literals over row visits [start, end) in one pass.
+        Visits are rows start..end-1 in a full scan, or entries of the loaded
+        skip list in indexed propagation.
+
+        The dynamic memory update, conflict check and unit check are computed
+        for every row at once as mask/popcount operations on the packed row
+        words. Only unit rows are then walked in row order,
+        since each forced assignment can turn a later unit row into a BCP
+        conflict. Rows after the first conflict are left untouched, exactly as
+        if the FSM had stopped there.
+        """
+        skip_rows = self.static_memory.skip_rows
+        rows = np.s_[start:end] if skip_rows is None else skip_rows[start:end]
+        static_rows = self.static_memory.memory[rows]
+        active = self.static_memory.active_mask[rows]
+        new_dynamic = self.bitwise_updater.update(self.dynamic.words[rows], self._compare(static_rows))
+
+        free = active & ~new_dynamic
+        free_count = POPCOUNT[free].sum(axis=1)
+        conflicts = np.flatnonzero(active.any(axis=1) & (free_count == 0))
+        stop = int(conflicts[0]) if len(conflicts) else None
+
+        info = {}
+        units = np.flatnonzero(free_count == 1)
+        if stop is not None:
+            units = units[units < stop]
+            info = {"conflict_row": self._visited_row(start + stop)}
+
+        forced_literals = self._unit_literals(static_rows, free, units)
+        # Values before the sweep, one gather; implications of this sweep are tracked on the side
+        values = self.assignments.values[forced_literals >> 1].tolist()
+        implied = {}
+        counters = self.counters
+        for i, forced_true_literal, value in zip(units.tolist(), forced_literals.tolist(), values):
+            false_literal = self.negate_literal(forced_true_literal)
+            var, val = self.get_var_and_val(false_literal)
+            value = value or implied.get(var, 0)
+            if value:
+                if (value > 0) != val:
+                    stop = i
+                    info = {"bcp_conflict_var": var}
+                    break
+            else:
+                self._imply(var, val, false_literal, self._visited_row(start + i))
+                implied[var] = 1 if val else -1
+        counters.track_depths(len(self.propagation_queue), len(self.assignments))
+
+        if stop is not None:
+            prefix = np.s_[start:start + stop + 1] if skip_rows is None else skip_rows[start:start + stop + 1]
+            self._record_undo(start, stop + 1, new_dynamic[:stop + 1])
+            self.dynamic.words[prefix] = new_dynamic[:stop + 1]
+            cycles = self.static_memory.sweep_beats(start, start + stop + 1)
+            self.cycle_count += cycles
+            counters.state_cycles['PROPAGATE'] += cycles
+            if "conflict_row" in info:
+                counters.conflicts += 1
+            else:
+                counters.bcp_conflicts += 1
+            self._sweep_visits += stop + 1
+            self._end_sweep()
+            self.static_memory.row_pointer = start + stop
+            self.state = self._conflict(self._visited_row(start + stop))
+            self.current_prop_literal = None
+            return {"state": self.state, **info}
+
+        self._record_undo(start, end - start, new_dynamic)
+        self.dynamic.words[rows] = new_dynamic
+        cycles = self.static_memory.sweep_beats(start, end)
+        self.cycle_count += cycles
+        counters.state_cycles['PROPAGATE'] += cycles
+        self._sweep_visits += end - start
+        self.static_memory.row_pointer = end
+        if end >= self.static_memory.sweep_length():
+            self.current_prop_literal = None
+            self._end_sweep()
+        return {"state": 'PROPAGATE', "rows": (start, end), "lit": self.current_prop_literal}
+
+    def _unit_literals(self, static_rows: np.ndarray, free: np.ndarray, units: np.ndarray) -> np.ndarray:
+        """Unit detector on many rows at once: the literal in each unit row's single free slot."""
+        unit_free = free[units]
+        word = np.argmax(unit_free != 0, axis=1)
+        bit = LOWEST_BIT[unit_free[np.arange(len(units)), word]]
+        return static_rows[units, 8 * word + bit]
+
+    def _record_undo(self, start: int, count: int, new_dynamic: np.ndarray):
+        """Logs the bits a sweep is about to set on visits [start, start+count)."""
+        if self.backtrack != 'trail':
+            return
+        skip_rows = self.static_memory.skip_rows
+        rows = np.arange(start, start + count) if skip_rows is None else skip_rows[start:start + count]
+        set_bits = new_dynamic & ~self.dynamic.words[rows]
+        changed = np.flatnonzero(set_bits.any(axis=1))
+        self.undo_log.record(rows[changed], set_bits[changed])
+
+    def _visited_row(self, position: int) -> int:
+        skip_rows = self.static_memory.skip_rows
+        return position if skip_rows is None else int(skip_rows[position])
+
+    def step_event(self, trace: Optional[CycleTrace] = None):
+        """
+        Advances the FSM to the next observable cycle.
+
+        A PROPAGATE row visit is idle when it sets no new dynamic memory bit,
+        is not a conflict, and is either not unit or forces a variable that
+        already has the forced value. Idle visits only move the row pointer,
+        so a run of them is skipped in one call. Every other cycle is executed
+        by step() itself. With a `trace`, executed cycles are recorded as
+        events and skipped runs as spans.
+        """
+        if self.state == 'PROPAGATE' and not self.current_prop_literal:
+            self._event_visits = None
+            if self.propagation_queue and self.propagation == 'scan':
+                # The pop shares its cycle with the visit of row 0, which may be idle
+                self._pop_batch()
+        if self.state != 'PROPAGATE' or not self.current_prop_literal:
+            return self._traced_step(trace)
+
+        start = self.static_memory.row_pointer
+        if self._event_visits is None:
+            self._event_visits = self._eventful_visits(start)
+        k = np.searchsorted(self._event_visits, start)
+        next_event = int(self._event_visits[k]) if k < len(self._event_visits) else self.static_memory.sweep_length()
+        # Never run past max_cycles, so a truncated solve stops on the same row.
+        # With lanes, the beat holding the next event is executed as a whole.
+        end = min(self.static_memory.beat_start(next_event),
+                  self.static_memory.beats_end(start, max(1, self.max_cycles - self.cycle_count)))
+        if end == start:
+            return self._traced_step(trace)
+
+        if trace is not None:
+            trace.add_span(self.cycle_count + 1, end - start, self.current_prop_literal, start,
+                           self.current_prop_batch)
+        cycles = self.static_memory.sweep_beats(start, end)
+        self.cycle_count += cycles
+        self.counters.state_cycles['PROPAGATE'] += cycles
+        self._sweep_visits += end - start
+        self.static_memory.row_pointer = end
+        if end >= self.static_memory.sweep_length():
+            self.current_prop_literal = None
+            self._end_sweep()
+        return {"state": 'PROPAGATE', "rows": (start, end), "lit": self.current_prop_literal}
+
+    def _eventful_visits(self, start: int) -> np.ndarray:
+        """
+        Positions >= start in the current sweep whose visit is not idle.
+
+        A row's dynamic word only changes at its own visit, so the update,
+        conflict and unit checks of the whole sweep can be evaluated up front.
+        Assignments only grow until the next BACKTRACK, so a unit row whose
+        variable already holds the forced value stays idle for the sweep.
+        """
+        skip_rows = self.static_memory.skip_rows
+        end = self.static_memory.sweep_length()
+        rows = np.s_[start:end] if skip_rows is None else skip_rows[start:end]
+        static_rows = self.static_memory.memory[rows]
+        active = self.static_memory.active_mask[rows]
+        dynamic = self.dynamic.words[rows]
+        new_dynamic = self.bitwise_updater.update(dynamic, self._compare(static_rows))
+
+        free = active & ~new_dynamic
+        free_count = POPCOUNT[free].sum(axis=1)
+        eventful = (new_dynamic != dynamic).any(axis=1) | (active.any(axis=1) & (free_count == 0))
+        units = np.flatnonzero((free_count == 1) & ~eventful)
+        if len(units):
+            forced_literals = self._unit_literals(static_rows, free, units).astype(np.int64)
+            forced_vars = forced_literals // 2
+            # A forced-true literal 2v makes x_v True (1), 2v+1 makes it False (-1)
+            eventful[units] = self.assignments.values[forced_vars] != 1 - 2 * (forced_literals % 2)
+        if self.learning:
+            learned = self.static_memory.first_learned_visit()
+            if learned < end:
+                # Learned row visits are always executed, so spans stay within the fixed
+                # problem rows and never end right before them (see record_trace)
+                eventful[max(learned - 1 - start, 0):] = True
+        return np.flatnonzero(eventful) + start
+
+    def _traced_step(self, trace: Optional[CycleTrace]):
+        if trace is None:
+            return self.step()
+        prev_state = self.state
+        literal = self.current_prop_literal
+        assignments = self.assignments
+        depth = len(assignments)
+        top = assignments.entry(depth - 1) if depth else None
+        info = self.step()
+
+        # Assignment changes follow from how step() moved the decision stack
+        if len(assignments) >= depth and (depth == 0 or assignments.entry(depth - 1) == top):
+            start = depth
+        else:
+            # BACKTRACK popped the top entry, and pushed its flip if it was a decision
+            start = depth - 1
+        entries = assignments.entries()[start:]
+        delta = list(zip(entries['var'].tolist(), entries['value'].tolist()))
+        if start < depth:
+            delta.insert(0, (top[0], None))
+        trace.add_event(self.cycle_count, prev_state, info, delta, literal)
+        return info
+
+    def record_trace(self) -> CycleTrace:
+        """
+        Runs to completion (or max_cycles) with step_event() and returns the
+        columnar cycle trace: one fixed-width record per executed cycle or
+        skipped run of idle rows, plus assignment deltas. CycleTrace.dense()
+        expands it to exactly what step() would have returned on every cycle.
+        Spans count row visits, so the trace needs a single lane.
+        """
+        if self.lanes > 1:
+            raise ValueError("record_trace() records one row visit per cycle and needs lanes=1")
+        trace = CycleTrace(self.static_memory, indexed=self.propagation == 'indexed',
+                           num_rows=self.static_memory.clause_rows)
+        while self.state not in ['SAT', 'UNSAT'] and self.cycle_count < self.max_cycles:
+            self.step_event(trace)
+        return trace
+
+    def solve(self, assumptions: Optional[List[int]] = None, checkpoint: Optional[str] = None,
+              checkpoint_every: Optional[int] = None):
+        """
+        Helper to run the simulation until it finishes (or max_cycles).
+
+        With `assumptions` (DIMACS literals), the search is reset first and
+        the formula is solved under them; see `core` for an UNSAT answer.
+
+        With `checkpoint` (a file path), the run resumes from that checkpoint
+        if it exists, saves one every `checkpoint_every` cycles, and saves the
+        final state when it stops, so a run that hits max_cycles or is killed
+        continues where it left off. Resuming keeps the checkpoint's
+        assumptions; passing different ones raises ValueError.
+        """
+        if assumptions is not None:
+            assumed = {}
+            for literal in assumptions:
+                var = abs(literal)
+                if not 1 <= var <= self.num_vars:
+                    raise ValueError(f"Assumption {literal} is outside variables 1..{self.num_vars}")
+                if assumed.get(var, literal > 0) != (literal > 0):
+                    raise ValueError(f"Assumptions contain both {var} and -{var}")
+                assumed[var] = literal > 0
+        if checkpoint is not None and os.path.exists(checkpoint):
+            self.load_checkpoint(checkpoint)
+            if assumptions is not None and self._assumptions != list(dict.fromkeys(assumptions)):
+                raise ValueError(f"{checkpoint} was taken under assumptions {self._assumptions}, not {assumptions}")
+        elif assumptions is not None:
+            self.reset_search()
+            self._assumptions = list(dict.fromkeys(assumptions))
+            self._assumed = assumed
+        advance = {'cycle': self.step, 'fast': self.step_fast, 'event': self.step_event}[self.mode]
+        next_save = self.cycle_count + checkpoint_every if checkpoint is not None and checkpoint_every else None
         while self.state not in ['SAT', 'UNSAT'] and self.cycle_count < self.max_cycles:
-            self.step()
+            advance()
+            if next_save is not None and self.cycle_count >= next_save:
+                self.save_checkpoint(checkpoint)
+                next_save = self.cycle_count + checkpoint_every
+        if checkpoint is not None:
+            self.save_checkpoint(checkpoint)
         return self.state, self.assignment_table
 
 if __name__ == "__main__":
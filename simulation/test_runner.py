@@ -1,82 +1,29 @@
 import os
+import tempfile
+from functools import partial
 import numpy as np
 import pandas as pd
 from sat_node import SatNode
+from dimacs import load_dimacs, matrix_to_clauses
+from batch import run_batch
+from preprocess import preprocess
+from reference import REFERENCE_NAME, reference_verdict
 
-# Try to import a standard solver, fallback to a simple DPLL if not available
-try:
-    from pysat.solvers import Glucose3
-    USE_PYSAT = True
-except ImportError:
-    USE_PYSAT = False
+# Hardware variants checked against the reference, reported as extra cycle columns
+VARIANTS = {
+    "Skip Cycles": {"propagation": "indexed"},
+    "Trail Cycles": {"backtrack": "trail"},
+    "VSIDS Cycles": {"heuristic": "vsids", "phase_saving": True},
+    "CDCL Cycles": {"learning": True},
+    "W=4 Cycles": {"sweep_width": 4},
+}
 
-def solve_ground_truth(num_vars, clauses):
-    """Provides a reference result using pysat or a simple DPLL fallback."""
-    if USE_PYSAT:
-        with Glucose3() as solver:
-            for clause in clauses:
-                solver.add_clause(clause)
-            return "SAT" if solver.solve() else "UNSAT"
-    else:
-        # Simple DPLL Fallback for small problems
-        return dpll_fallback(clauses, {})
-
-def dpll_fallback(clauses, assignment):
-    """Extremely simple recursive DPLL for reference when pysat is missing."""
-    # 1. Simplify clauses
-    new_clauses = []
-    for c in clauses:
-        resolved = False
-        new_c = []
-        for lit in c:
-            val = assignment.get(abs(lit))
-            if val is not None:
-                if (lit > 0 and val == True) or (lit < 0 and val == False):
-                    resolved = True # Clause is satisfied
-                    break
-            else:
-                new_c.append(lit)
-        if not resolved:
-            if not new_c: return "UNSAT" # Empty clause
-            new_clauses.append(new_c)
-    
-    if not new_clauses: return "SAT" # All clauses satisfied
-    
-    # 2. Pick a variable
-    var = abs(new_clauses[0][0])
-    
-    # 3. Branch
-    for val in [True, False]:
-        res = dpll_fallback(new_clauses, {**assignment, var: val})
-        if res == "SAT": return "SAT"
-    
-    return "UNSAT"
-
-def parse_dimacs(file_path):
-    with open(file_path, 'r') as f:
-        content = f.read()
-    clauses = []
-    num_vars = 0
-    for line in content.splitlines():
-        line = line.strip()
-        if not line or line.startswith('c'): continue
-        if line.startswith('p cnf'):
-            parts = line.split()
-            num_vars = int(parts[2])
-            continue
-        parts = [int(x) for x in line.split()]
-        if parts and parts[-1] == 0: parts.pop()
-        if parts: clauses.append(parts)
-    return num_vars, clauses
-
-def clauses_to_matrix(clauses, num_vars):
-    if not clauses: return np.zeros((0, 0), dtype=int)
-    max_len = max(len(c) for c in clauses)
-    matrix = np.zeros((len(clauses), max_len), dtype=int)
-    for i, clause in enumerate(clauses):
-        for j, lit in enumerate(clause):
-            matrix[i, j] = (2 * lit) if lit > 0 else (2 * abs(lit) + 1)
-    return matrix
+# DIMACS loader cases: indented comment and header lines, CRLF line endings
+LOADER_CASES = {
+    "indented": "c comment\n  c indented comment\n p cnf 4 3\n1 2 0\n\t c tab\n-1 3 0\n-3 4 -2 0\n",
+    "crlf": "c comment\r\np cnf 4 3\r\n1 2 0\r\n  c indented comment\r\n-1 3 0\r\n-3 4 -2 0\r\n",
+}
+LOADER_MATRIX = np.array([[2, 4, 0], [3, 6, 0], [7, 8, 5]])
 
 def verify_assignment(clauses, assignment):
     for clause in clauses:
@@ -90,48 +37,151 @@ def verify_assignment(clauses, assignment):
         if not satisfied: return False, clause
     return True, None
 
-def run_tests():
-    if not os.path.exists("tests"):
-        print("No 'tests' directory found.")
+def modes_agree(matrix, num_vars, node, **options):
+    """True if every other execution mode ends in the same state, assignment and cycle as node."""
+    for mode in SatNode.MODES:
+        if mode == node.mode:
+            continue
+        other = SatNode(matrix, num_vars, mode=mode, **options)
+        other.solve()
+        if (other.state, other.assignment_table, other.cycle_count) != (node.state, node.assignment_table, node.cycle_count):
+            return False
+    return True
+def check_loader():
+    """
+    Loads every LOADER_CASES file without the cache, then twice with a fresh
+    one (the first load writes it, the second reads it). Returns (case, status) pairs.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, text in LOADER_CASES.items():
+            path = os.path.join(tmp, name + ".cnf")
+            with open(path, "w", newline="") as f:
+                f.write(text)
+            for cache in (False, True, True):
+                try:
+                    num_vars, matrix = load_dimacs(path, cache=cache, cache_dir=os.path.join(tmp, "cache"))
+                    ok = num_vars == 4 and np.array_equal(matrix, LOADER_MATRIX)
+                    status = "PASS" if ok else "FAIL (Wrong Matrix)"
+                except ValueError as e:
+                    status = f"FAIL ({e})"
+                results.append((f"{name} cache={cache}", status))
+    return results
+
+def run_test_file(path, simplify=False, verdict_cache=True, cache_dir=None):
+    """
+    Checks one CNF against the reference. Returns (result row, restore-cost
+    row). With simplify, the nodes solve the preprocessed formula and their
+    models are extended back before being checked against the original.
+    With verdict_cache, the reference verdict is read from (or saved to) the
+    verdict cache in cache_dir.
+    """
+    filename = os.path.basename(path)
+    num_vars, matrix = load_dimacs(path)
+    clauses = matrix_to_clauses(matrix)
+    
+    # 1. Get Reference Truth
+    ground_truth, _, source = reference_verdict(num_vars, matrix, cache=verdict_cache, cache_dir=cache_dir)
+    extend = dict
+    if simplify:
+        num_vars, matrix, pre = preprocess(num_vars, matrix)
+        extend = pre.extend
+    
+    # 2. Run our SatNode
+    node = SatNode(matrix, num_vars, mode="fast")
+    node_result, assignment = node.solve()
+    
+    # 3. Run the hardware variants of the same node
+    variant_nodes = {}
+    for column, options in VARIANTS.items():
+        variant_nodes[column] = SatNode(matrix, num_vars, mode="fast", **options)
+        variant_nodes[column].solve()
+    
+    # 4. Validation
+    status = "PASS"
+    for result, assign in [(node_result, assignment)] + [(n.state, n.assignment_table) for n in variant_nodes.values()]:
+        if result != ground_truth:
+            status = f"FAIL (Mismatch)"
+        elif result == "SAT":
+            is_valid, _ = verify_assignment(clauses, extend(assign))
+            if not is_valid: status = "FAIL (Invalid Logic)"
+    if not (modes_agree(matrix, num_vars, node) and
+            all(modes_agree(matrix, num_vars, variant_nodes[column], **options) for column, options in VARIANTS.items())):
+        status = "FAIL (Mode Mismatch)"
+    
+    row = {
+        "File": filename,
+        "SatNode": node_result,
+        "Reference": ground_truth,
+        "Status": status,
+        "Cycles": node.cycle_count,
+        "Reference Source": source
+    }
+    row.update({column: n.cycle_count for column, n in variant_nodes.items()})
+    if simplify:
+        row["Rows"] = f"{pre.stats['rows_in']}->{pre.stats['rows_out']}"
+    
+    stats = variant_nodes["Trail Cycles"].backtrack_stats
+    flips = max(stats["flips"], 1)
+    restore = {
+        "File": filename,
+        "Flips": stats["flips"],
+        "Rebuild Cyc/Flip": round(stats["rebuild_cycles"] / flips, 1),
+        "Undo Cyc/Flip": round(stats["undo_cycles"] / flips, 1)
+    }
+    return row, restore
+
+def run_tests(tests_dir="tests", jobs=None, timeout=None, simplify=False, verdict_cache=True, cache_dir=None):
+    if not os.path.exists(tests_dir):
+        print(f"No '{tests_dir}' directory found.")
         return
-    test_files = sorted([f for f in os.listdir("tests") if f.endswith(".cnf")])
+    test_files = sorted([f for f in os.listdir(tests_dir) if f.endswith(".cnf")])
     if not test_files:
-        print("No .cnf files found in 'tests/'.")
+        print(f"No .cnf files found in '{tests_dir}/'.")
         return
 
+    print("DIMACS loader:")
+    for case, status in check_loader():
+        print(f"  {case:<30} {status}")
+    print()
+
     results = []
-    print(f"Running {len(test_files)} tests (Reference: {'pysat' if USE_PYSAT else 'DPLL Fallback'})...\n")
+    restore = []
+    print(f"Running {len(test_files)} tests (Reference: {REFERENCE_NAME}"
+          f"{', cached verdicts' if verdict_cache else ''})...\n")
     
-    for filename in test_files:
-        path = os.path.join("tests", filename)
-        num_vars, clauses = parse_dimacs(path)
-        
-        # 1. Get Reference Truth
-        ground_truth = solve_ground_truth(num_vars, clauses)
-        
-        # 2. Run our SatNode
-        matrix = clauses_to_matrix(clauses, num_vars)
-        node = SatNode(matrix, num_vars)
-        node_result, assignment = node.solve()
-        
-        # 3. Validation
-        status = "PASS"
-        if node_result != ground_truth:
-            status = f"FAIL (Mismatch)"
-        elif node_result == "SAT":
-            is_valid, _ = verify_assignment(clauses, assignment)
-            if not is_valid: status = "FAIL (Invalid Logic)"
-        
-        results.append({
-            "File": filename,
-            "SatNode": node_result,
-            "Reference": ground_truth,
-            "Status": status,
-            "Cycles": node.cycle_count
-        })
+    # Stream one line per instance as workers finish, then print the sorted tables
+    paths = [os.path.join(tests_dir, f) for f in test_files]
+    run = partial(run_test_file, simplify=simplify, verdict_cache=verdict_cache, cache_dir=cache_dir)
+    for path, outcome, error in run_batch(run, paths, jobs=jobs, timeout=timeout):
+        if error:
+            row = {"File": os.path.basename(path), "Status": error}
+        else:
+            row, restore_row = outcome
+            restore.append(restore_row)
+        results.append(row)
+        print(f"  {row['File']:<30} {row['Status']}")
+    print()
 
-    df = pd.DataFrame(results)
+    columns = ["File", "SatNode", "Reference", "Status", "Cycles"] + list(VARIANTS) + (["Rows"] if simplify else [])
+    df = pd.DataFrame(results, columns=columns).sort_values("File")
     print(df.to_string(index=False))
+    sources = [row["Reference Source"] for row in results if "Reference Source" in row]
+    print(f"\nReference verdicts: {sources.count('cache')} cached, {len(sources) - sources.count('cache')} solved")
+    
+    if restore:
+        print("\nDynamic memory restore cost per decision flip (rebuild vs undo log):\n")
+        print(pd.DataFrame(restore).sort_values("File").to_string(index=False))
 
 if __name__ == "__main__":
-    run_tests()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Check SatNode against a reference solver on tests/*.cnf.")
+    parser.add_argument("--tests-dir", default="tests")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--timeout", type=float, default=None, help="per-instance timeout in seconds")
+    parser.add_argument("--preprocess", action="store_true", help="solve the preprocessed formulas")
+    parser.add_argument("--no-verdict-cache", action="store_true", help="always run the reference solver")
+    parser.add_argument("--verdict-cache-dir", default=None, help="verdict cache directory (default: ~/.cache/fpgangster/verdicts)")
+    args = parser.parse_args()
+    run_tests(args.tests_dir, jobs=args.jobs, timeout=args.timeout, simplify=args.preprocess,
+              verdict_cache=not args.no_verdict_cache, cache_dir=args.verdict_cache_dir)
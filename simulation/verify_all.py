@@ -1,60 +1,146 @@
+import fcntl
+import hashlib
+import json
+import math
 import os
 import subprocess
 import re
 import shutil
+import sys
+import tempfile
+import time
 from sat_node import SatNode
+from batch import run_batch
+from counters import NodeCounters
+from dimacs import load_dimacs
 
-def parse_dimacs(file_path):
-    with open(file_path, 'r') as f:
-        content = f.read()
-    clauses = []
-    num_vars = 0
-    for line in content.splitlines():
-        line = line.strip()
-        if not line or line.startswith('c'): continue
-        if line.startswith('p cnf'):
-            parts = line.split()
-            num_vars = int(parts[2])
-            continue
-        parts = [int(x) for x in line.split()]
-        if parts and parts[-1] == 0: parts.pop()
-        if parts: clauses.append(parts)
-    return num_vars, clauses
-
-def run_python_model(num_vars, clauses):
-    # Convert clauses to matrix format expected by SatNode
-    max_len = max(len(c) for c in clauses) if clauses else 0
-    import numpy as np
-    matrix = np.zeros((len(clauses), max_len), dtype=int)
-    for i, clause in enumerate(clauses):
-        for j, lit in enumerate(clause):
-            matrix[i, j] = (2 * lit) if lit > 0 else (2 * abs(lit) + 1)
-            
-    node = SatNode(matrix, num_vars)
+# rtl/ is not a package: put it on the path to share the hex writer of cnf_to_hex.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "rtl"))
+from cnf_to_hex import write_hex
+
+def run_python_model(num_vars, matrix, timers=False):
+    node = SatNode(matrix, num_vars, mode="fast", timers=timers)
+    t = time.perf_counter()
     res, assign = node.solve()
-    return res, assign, node.cycle_count
+    counters = node.counters.to_dict(host_seconds=round(time.perf_counter() - t, 6))
+    return res, assign, node.cycle_count, counters
+
+# sat_node.sv internal_state_t, in encoding order (the TRACE "st" field)
+RTL_STATES = ("IDLE", "DECIDE", "PROPAGATE", "BACKTRACK", "FLIP_DECISION", "REBUILD_QUEUE", "SAT", "UNSAT")
+
+def parse_rtl_counters(output):
+    """
+    Rebuilds NodeCounters from the per-cycle TRACE lines sat_node.sv prints
+    under TRACE_MODE. The RTL spends two cycles per row (read, then
+    write/unit check), so only the second counts as a row visit.
+    """
+    counters = NodeCounters(RTL_STATES)
+    visits = 0
+    for line in output.splitlines():
+        if not line.startswith("TRACE "):
+            continue
+        fields = dict(item.split("=", 1) for item in line.split()[1:])
+        counters.state_cycles[RTL_STATES[int(fields["st"])]] += 1
+        counters.track_depths(int(fields["qd"]), int(fields["sd"]))
+        ev = fields["ev"]
+        if ev == "decide":
+            counters.decisions += 1
+        elif ev in ("row", "imply", "conflict"):
+            visits += 1
+            if ev == "imply":
+                counters.implications += 1
+            if ev == "conflict":
+                counters.conflicts += 1
+            if ev == "conflict" or fields.get("end") == "1":
+                counters.rows_per_literal.add(visits)
+                visits = 0
+        elif ev in ("unassign", "flip"):
+            counters.backtrack_pops += 1
+            if ev == "flip":
+                counters.flips += 1
+    return counters
+
+RTL_SOURCES = [
+    "sat_pkg.sv", "comparator.sv", "clause_evaluator.sv", "unit_detector.sv",
+    "heuristic_engine.sv", "propagation_queue.sv", "assignment_manager.sv",
+    "static_memory.sv", "dynamic_memory.sv", "lane_arbiter.sv", "sat_node.sv", "tb_sat_node.sv",
+]
+RTL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rtl")
+SIM_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+                             "fpgangster", "rtl")
+
+def size_bucket(num_rows, num_vars, num_cols=4):
+    """
+    Smallest compiled size (powers of two, at least the testbench defaults)
+    that fits the problem: (NUM_ROWS, NUM_VARS, LIT_WIDTH, COLS_PER_ROW).
+    """
+    max_rows = max(32, 1 << max(num_rows - 1, 0).bit_length())
+    max_vars = max(16, 1 << max(num_vars - 1, 0).bit_length())
+    lit_width = max(6, math.ceil(math.log2(2 * max_vars + 2)))
+    cols = max(4, 1 << max(num_cols - 1, 0).bit_length())
+    return max_rows, max_vars, lit_width, cols
+
+def rtl_source_hash():
+    h = hashlib.sha256()
+    for name in RTL_SOURCES:
+        with open(os.path.join(RTL_DIR, name), "rb") as f:
+            h.update(name.encode() + b"\0" + f.read())
+    return h.hexdigest()[:16]
+
+def compiled_simulator(num_rows, num_vars, num_cols=4, trace=False, cache_dir=SIM_CACHE_DIR, state=False):
+    """
+    Returns the path of a vvp image big enough for the problem, compiling it
+    only if no image exists yet for this (size bucket, trace flags, RTL hash).
+    The problem itself is supplied at runtime through plusargs. state=True
+    also defines TRACE_STATE (assignments and queue on every TRACE line).
+    """
+    max_rows, max_vars, lit_width, cols = size_bucket(num_rows, num_vars, num_cols)
+    flags = ("_trace" if trace else "") + ("_state" if trace and state else "")
+    key = f"r{max_rows}_v{max_vars}_w{lit_width}_c{cols}{flags}_{rtl_source_hash()}"
+    sim_exe = os.path.join(cache_dir, key, "sat_sim")
+    if os.path.exists(sim_exe):
+        return sim_exe
+
+    os.makedirs(os.path.dirname(sim_exe), exist_ok=True)
+    with open(sim_exe + ".lock", "w") as lock:
+        # Parallel workers hitting the same new bucket compile it only once
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if not os.path.exists(sim_exe):
+            tmp_exe = f"{sim_exe}.{os.getpid()}.tmp"
+            cmd_compile = ["iverilog", "-g2012", "-D", f"NUM_ROWS={max_rows}", "-D", f"NUM_VARS={max_vars}",
+                           "-D", f"LIT_WIDTH={lit_width}", "-D", f"COLS_PER_ROW={cols}", "-o", tmp_exe]
+            if trace:
+                cmd_compile += ["-D", "TRACE_MODE"]
+                if state:
+                    cmd_compile += ["-D", "TRACE_STATE"]
+            cmd_compile += [os.path.join(RTL_DIR, name) for name in RTL_SOURCES]
+            subprocess.run(cmd_compile, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            os.replace(tmp_exe, sim_exe)
+    return sim_exe
+
+def write_problem_hex(test_path, work_dir, lit_width, cols):
+    """Converts a CNF into work_dir/problem.hex in the bucket's literal and row width."""
+    hex_path = os.path.join(work_dir, "problem.hex")
+    num_vars, matrix = load_dimacs(test_path)
+    write_hex(matrix, num_vars, hex_path, cols=cols, lit_width=lit_width)
+    return hex_path
 
-def run_rtl_model(test_path, num_vars, num_rows, lit_width=6, debug=False):
-    # 1. Convert to Hex
-    hex_path = "rtl/problem.hex"
-    cmd_hex = f"python3 rtl/cnf_to_hex.py {test_path} {hex_path}"
-    subprocess.run(cmd_hex, shell=True, check=True)
+def run_rtl_model(test_path, num_vars, num_rows, debug=False, work_dir=".", counters=None, num_cols=4):
+    # Every instance gets its own hex file under work_dir, so several instances
+    # can run at once; the simulator image is shared through the compile cache.
+    # 1. Compiled simulator for this size bucket
+    sim_exe = compiled_simulator(num_rows, num_vars, num_cols, trace=debug)
+    _, _, lit_width, cols = size_bucket(num_rows, num_vars, num_cols)
     
-    # 2. Compile RTL
-    sim_exe = "sat_sim"
-    trace_flag = "-D TRACE_MODE" if debug else ""
-    cmd_compile = (
-        f"iverilog -g2012 {trace_flag} -D NUM_ROWS={num_rows} -D NUM_VARS={num_vars} "
-        f"-D LIT_WIDTH={lit_width} -D INIT_FILE='\"rtl/problem.hex\"' -o {sim_exe} "
-        "rtl/sat_pkg.sv rtl/comparator.sv rtl/clause_evaluator.sv rtl/unit_detector.sv "
-        "rtl/heuristic_engine.sv rtl/propagation_queue.sv rtl/assignment_manager.sv "
-        "rtl/static_memory.sv rtl/dynamic_memory.sv rtl/sat_node.sv rtl/tb_sat_node.sv"
-    )
-    subprocess.run(cmd_compile, shell=True, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # 2. Convert to Hex, in the bucket's literal and row width
+    hex_path = write_problem_hex(test_path, work_dir, lit_width, cols)
     
-    # 3. Run RTL
-    cmd_run = f"vvp {sim_exe}"
-    result = subprocess.run(cmd_run, shell=True, capture_output=True, text=True)
+    # 3. Run RTL with the problem size passed as plusargs
+    cmd_run = ["vvp", "-n", sim_exe, f"+HEX={hex_path}", f"+ROWS={num_rows}", f"+VARS={num_vars}"]
+    t = time.perf_counter()
+    result = subprocess.run(cmd_run, capture_output=True, text=True)
+    if counters is not None:
+        counters["host_seconds"] = round(time.perf_counter() - t, 6)
     
     # Parse Output
     output = result.stdout
@@ -75,55 +161,112 @@ def run_rtl_model(test_path, num_vars, num_rows, lit_width=6, debug=False):
                 
     return rtl_res, rtl_assign, rtl_cycles, output
 
-def verify_all():
-    tests_dir = "tests"
+def verify_file(path, timers=False):
+    """Runs one CNF through both models. Returns a result dict for the report."""
+    n_vars, matrix = load_dimacs(path)
+    n_rows = len(matrix)
+    
+    # Python Run
+    py_res, py_assign, py_cyc, py_counters = run_python_model(n_vars, matrix, timers=timers)
+    
+    # RTL Run
+    rtl_host = {}
+    with tempfile.TemporaryDirectory(prefix="sat_verify_") as work_dir:
+        rtl_res, rtl_assign, rtl_cyc, rtl_out = run_rtl_model(path, n_vars, n_rows, debug=True,
+                                                              work_dir=work_dir, counters=rtl_host,
+                                                              num_cols=matrix.shape[1])
+    rtl_counters = parse_rtl_counters(rtl_out).to_dict(**rtl_host)
+    
+    # Compare
+    match = (py_res == rtl_res)
+    if match and py_res == "SAT":
+        for v, val in py_assign.items():
+            if v in rtl_assign and rtl_assign[v] != val:
+                match = False
+                break
+    
+    return {
+        "py_res": py_res, "py_assign": py_assign, "py_cyc": py_cyc,
+        "rtl_res": rtl_res, "rtl_assign": rtl_assign, "rtl_cyc": rtl_cyc,
+        "rtl_out": rtl_out, "match": match,
+        "py_counters": py_counters, "rtl_counters": rtl_counters,
+    }
+
+def verify_file_timed(path):
+    return verify_file(path, timers=True)
+
+def print_counters(py_counters, rtl_counters):
+    """Side-by-side Python / RTL counters; state names differ, so states are listed per model."""
+    print(f"  {'Counter':<22} {'Python':>12} {'RTL':>12}")
+    for field in ("cycles",) + NodeCounters.FIELDS + ("host_seconds",):
+        print(f"  {field:<22} {py_counters.get(field, '-'):>12} {rtl_counters.get(field, '-'):>12}")
+    for label, counters in (("Python", py_counters), ("RTL", rtl_counters)):
+        states = ", ".join(f"{s}={n}" for s, n in counters["state_cycles"].items() if n)
+        rows = counters["rows_per_literal"]
+        print(f"  {label} cycles/state: {states}")
+        print(f"  {label} rows/literal: mean {rows['mean']}, max {rows['max']}, {rows['buckets']}")
+    if "timers" in py_counters:
+        print("  Python host time: " + ", ".join(f"{name} {t['seconds'] * 1e3:.2f} ms"
+                                                 for name, t in py_counters["timers"].items()))
+
+def verify_all(tests_dir="tests", jobs=None, timeout=None, counters=False, timers=False, counters_json=None,
+               cosim=False):
     if not os.path.exists(tests_dir):
         print("Tests directory not found.")
         return
 
     test_files = sorted([f for f in os.listdir(tests_dir) if f.endswith(".cnf")])
+    paths = [os.path.join(tests_dir, t) for t in test_files]
     
     print(f"{'Test File':<25} | {'Py Res':<6} | {'RTL Res':<6} | {'Match':<5} | {'Py Cyc':<6} | {'RTL Cyc':<6}")
     print("-" * 80)
     
-    for t in test_files:
-        path = os.path.join(tests_dir, t)
-        n_vars, clauses = parse_dimacs(path)
-        n_rows = len(clauses)
-        
-        # Python Run
-        py_res, py_assign, py_cyc = run_python_model(n_vars, clauses)
-        
-        # RTL Run
-        import math
-        req_width = math.ceil(math.log2(2 * n_vars + 2))
-        lit_width = max(6, req_width)
-        
-        rtl_res, rtl_assign, rtl_cyc, rtl_out = run_rtl_model(path, n_vars, n_rows, lit_width, debug=True)
-        
-        # Compare
-        match = (py_res == rtl_res)
-        if match and py_res == "SAT":
-            for v, val in py_assign.items():
-                if v in rtl_assign and rtl_assign[v] != val:
-                    match = False
-                    break
+    # Rows are printed as instances finish, not in file order
+    all_counters = {}
+    for path, r, error in run_batch(verify_file_timed if timers else verify_file, paths, jobs=jobs, timeout=timeout):
+        t = os.path.basename(path)
+        if error:
+            print(f"{t:<25} | {error}")
+            continue
         
-        match_str = "PASS" if match else "FAIL"
+        match_str = "PASS" if r["match"] else "FAIL"
         
-        print(f"{t:<25} | {py_res:<6} | {rtl_res:<6} | {match_str:<5} | {py_cyc:<6} | {rtl_cyc:<6}")
-        if not match:
-            print(f"  > Python Assign: {py_assign}")
-            print(f"  > RTL Assign:    {rtl_assign}")
+        print(f"{t:<25} | {r['py_res']:<6} | {r['rtl_res']:<6} | {match_str:<5} | {r['py_cyc']:<6} | {r['rtl_cyc']:<6}")
+        all_counters[t] = {"python": r["py_counters"], "rtl": r["rtl_counters"]}
+        if counters or timers:
+            print_counters(r["py_counters"], r["rtl_counters"])
+        if not r["match"]:
+            print(f"  > Python Assign: {r['py_assign']}")
+            print(f"  > RTL Assign:    {r['rtl_assign']}")
+            if cosim:
+                # Rerun in lockstep and show only where the two models part ways
+                from cosim import print_cosim, run_cosim
+                print_cosim(run_cosim(path))
+                print("-" * 40)
+                continue
             print("  > RTL Full Log:")
-            for line in rtl_out.splitlines():
+            for line in r["rtl_out"].splitlines():
                 if "TRACE" in line or "Conflict" in line or "DEBUG" in line:
                     print(f"    {line}")
             print("-" * 40)
 
-    # Cleanup
-    if os.path.exists("sat_sim"): os.remove("sat_sim")
-    if os.path.exists("rtl/problem.hex"): os.remove("rtl/problem.hex")
+    if counters_json:
+        with open(counters_json, "w") as f:
+            json.dump(dict(sorted(all_counters.items())), f, indent=2)
+        print(f"\nCounters written to {counters_json}")
 
 if __name__ == "__main__":
-    verify_all()
+    import argparse
+    parser = argparse.ArgumentParser(description="Compare the Python model against the RTL on tests/*.cnf.")
+    parser.add_argument("--tests-dir", default="tests")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--timeout", type=float, default=None, help="per-instance timeout in seconds")
+    parser.add_argument("--counters", action="store_true", help="print Python and RTL counters per instance")
+    parser.add_argument("--timers", action="store_true", help="also time the Python model's components")
+    parser.add_argument("--counters-json", help="write all counters to this JSON file")
+    parser.add_argument("--cosim", action="store_true",
+                        help="on a mismatch, co-simulate in lockstep and print the divergence window "
+                             "instead of the full RTL log")
+    args = parser.parse_args()
+    verify_all(args.tests_dir, jobs=args.jobs, timeout=args.timeout, counters=args.counters,
+               timers=args.timers, counters_json=args.counters_json, cosim=args.cosim)